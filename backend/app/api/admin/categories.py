@@ -6,6 +6,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.core.admin_auth import get_current_admin
+from app.core.response_cache import get_response_cache
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryAdmin
 from app.schemas.common import PaginationParams
 from app.services.category_service import CategoryService
@@ -78,6 +79,7 @@ async def create_admin_category(
     category_data["created_by"] = str(current_admin.id)
     
     category = await category_service.create(category_data)
+    get_response_cache().invalidate("categories")
     category_dict = category.model_dump()
     category_dict["id"] = str(category.id)
     # Remove any slug field if present (legacy data cleanup)
@@ -98,6 +100,7 @@ async def update_admin_category(
     
     if not updated_category:
         raise HTTPException(status_code=404, detail="Category not found")
+    get_response_cache().invalidate("categories")
     
     category_dict = updated_category.model_dump()
     category_dict["id"] = str(updated_category.id)
@@ -116,6 +119,7 @@ async def delete_admin_category(
     success = await category_service.delete(category_id)
     if not success:
         raise HTTPException(status_code=404, detail="Category not found")
+    get_response_cache().invalidate("categories")
     return {"message": "Category deleted successfully"}
 
 
@@ -134,6 +138,7 @@ async def toggle_category_status(
         category_id, 
         {"is_active": not category.is_active}
     )
+    get_response_cache().invalidate("categories")
     
     category_dict = updated_category.model_dump()
     category_dict["id"] = str(updated_category.id)
@@ -3,9 +3,10 @@ Admin Panel Prompts Management Endpoints
 Handles CRUD operations for prompts and image uploads in admin panel
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from app.core.admin_auth import get_current_admin
+from app.core.response_cache import get_response_cache
 from app.schemas.prompt import PromptCreate, PromptUpdate, PromptAdmin
 from app.schemas.common import PaginationParams, ImageUploadResponse
 from app.services.prompt_service import PromptService
@@ -78,6 +79,7 @@ async def create_admin_prompt(
     prompt_data["created_by"] = str(current_admin.id)
 
     prompt = await prompt_service.create(prompt_data)
+    get_response_cache().invalidate("prompts")
     prompt_dict = prompt.model_dump()
     prompt_dict["id"] = str(prompt.id)
     return PromptAdmin.model_validate(prompt_dict)
@@ -96,6 +98,7 @@ async def update_admin_prompt(
     
     if not updated_prompt:
         raise HTTPException(status_code=404, detail="Prompt not found")
+    get_response_cache().invalidate("prompts")
     
     prompt_dict = updated_prompt.model_dump()
     prompt_dict["id"] = str(updated_prompt.id)
@@ -112,12 +115,36 @@ async def delete_admin_prompt(
     success = await prompt_service.delete(prompt_id)
     if not success:
         raise HTTPException(status_code=404, detail="Prompt not found")
+    get_response_cache().invalidate("prompts")
     return {"message": "Prompt deleted successfully"}
 
 
-@router.post("/upload-temp-image", response_model=ImageUploadResponse, tags=["Admin Prompts"])
+# Uploads are streamed from the request body rather than declared as UploadFile
+# parameters (which buffer the whole file first), so the body is documented here
+IMAGE_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"]
+                }
+            }
+        }
+    }
+}
+
+
+@router.post(
+    "/upload-temp-image",
+    response_model=ImageUploadResponse,
+    tags=["Admin Prompts"],
+    openapi_extra=IMAGE_UPLOAD_BODY
+)
 async def upload_temp_image(
-    file: UploadFile = File(...),
+    request: Request,
     current_admin = Depends(get_current_admin),
     file_manager = Depends(get_file_upload_manager)
 ):
@@ -125,26 +152,20 @@ async def upload_temp_image(
     Upload temporary image for preview (Admin only)
     Images are stored in temp directory and cleaned up after use
     """
-    # Validate file type
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="File must be an image")
+    upload = await file_manager.receive_file(request)
+    result = await file_manager.save_temp_image(upload)
     
-    result = await file_manager.save_temp_image(file)
-    
-    return ImageUploadResponse(
-        filename=result["filename"],
-        url=result["url"],
-        thumbnail_url=result["thumbnail_url"],
-        size=result["size"],
-        content_type=result["content_type"],
-        width=result["width"],
-        height=result["height"]
-    )
-
-
-@router.post("/upload-image", response_model=ImageUploadResponse, tags=["Admin Prompts"])
+    return ImageUploadResponse(**result)
+
+
+@router.post(
+    "/upload-image",
+    response_model=ImageUploadResponse,
+    tags=["Admin Prompts"],
+    openapi_extra=IMAGE_UPLOAD_BODY
+)
 async def upload_prompt_image(
-    file: UploadFile = File(...),
+    request: Request,
     current_admin = Depends(get_current_admin),
     file_manager = Depends(get_file_upload_manager)
 ):
@@ -152,18 +173,7 @@ async def upload_prompt_image(
     Upload final image for prompt (Admin only)
     Each prompt has exactly 1 image
     """
-    # Validate file type
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="File must be an image")
-    
-    result = await file_manager.save_image(file)
+    upload = await file_manager.receive_file(request)
+    result = await file_manager.save_image(upload)
     
-    return ImageUploadResponse(
-        filename=result["filename"],
-        url=result["url"],
-        thumbnail_url=result["thumbnail_url"],
-        size=result["size"],
-        content_type=result["content_type"],
-        width=result["width"],
-        height=result["height"]
-    )
+    return ImageUploadResponse(**result)
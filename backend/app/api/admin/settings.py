@@ -5,6 +5,7 @@ Handles application settings management for admin panel
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.core.admin_auth import get_current_admin
+from app.core.response_cache import get_response_cache
 from app.schemas.settings import (
     AppSettingsResponse, 
     AppSettingsUpdate,
@@ -40,6 +41,7 @@ async def update_app_settings(
     
     try:
         updated_settings = await settings_service.update_app_settings(update_data)
+        get_response_cache().invalidate("app_settings")
         
         # Convert to response format
         settings_dict = updated_settings.model_dump()
@@ -65,6 +67,7 @@ async def create_app_settings(
         # This will update existing settings or create new ones
         create_data = settings_data.model_dump()
         updated_settings = await settings_service.update_app_settings(create_data)
+        get_response_cache().invalidate("app_settings")
         
         # Convert to response format
         settings_dict = updated_settings.model_dump()
@@ -85,6 +88,7 @@ async def reset_app_settings(current_admin = Depends(get_current_admin)):
     
     try:
         reset_settings = await settings_service.reset_to_default()
+        get_response_cache().invalidate("app_settings")
         
         # Convert to response format
         settings_dict = reset_settings.model_dump()
@@ -6,6 +6,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.core.admin_auth import get_current_admin
+from app.core.response_cache import get_response_cache
 from app.schemas.social_link import (
     SocialLinkResponse, 
     SocialLinkCreate,
@@ -67,6 +68,7 @@ async def create_social_link(
     try:
         await social_link_service.validate_create(link_data)
         new_link = await social_link_service.create(link_data)
+        get_response_cache().invalidate("social_links")
         
         # Convert to response format
         link_dict = new_link.model_dump()
@@ -95,6 +97,7 @@ async def bulk_update_social_links(
     
     try:
         updated_links = await social_link_service.bulk_update_social_links(bulk_data.links)
+        get_response_cache().invalidate("social_links")
         
         # Convert to response format
         response_links = []
@@ -133,6 +136,7 @@ async def update_social_link(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Social link not found"
             )
+        get_response_cache().invalidate("social_links")
         
         # Convert to response format
         link_dict = updated_link.model_dump()
@@ -166,6 +170,7 @@ async def delete_social_link(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Social link not found"
             )
+        get_response_cache().invalidate("social_links")
         
         return {"message": "Social link deleted successfully"}
         
@@ -183,6 +188,7 @@ async def reset_social_links(current_admin = Depends(get_current_admin)):
     
     try:
         default_links = await social_link_service.reset_to_default()
+        get_response_cache().invalidate("social_links")
         
         # Convert to response format
         response_links = []
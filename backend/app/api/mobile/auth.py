@@ -93,13 +93,13 @@ async def anonymous_login(
     
     # Create anonymous session token
     device_token = create_device_token(device_user)
+    quota = await device_service.get_quota_status(device_user)
     rate_limits = RateLimitInfo(
-        daily_limit=100,  # Generous limits for anonymous users
-        daily_used=device_user.daily_requests,
-        monthly_limit=1000,
-        monthly_used=0,
+        daily_limit=quota.limit,
+        daily_used=quota.used,
         is_premium=False,
-        can_upgrade=False
+        can_upgrade=False,
+        reset_time=quota.reset_time
     )
     
     return ApiKeyResponse(
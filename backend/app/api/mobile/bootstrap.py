@@ -0,0 +1,36 @@
+"""
+Mobile Bootstrap Endpoint
+Single launch payload: shared catalog snapshot plus per-device data
+"""
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.core.catalog_snapshot import get_catalog_snapshot
+from app.core.device_auth import get_authenticated_device_user
+from app.core.http_cache import make_etag, etag_matches, not_modified, cache_headers
+from app.schemas.bootstrap import BootstrapResponse
+from app.services.favorite_service import FavoriteService
+
+router = APIRouter()
+
+
+@router.get("", response_model=BootstrapResponse, tags=["Mobile Bootstrap"])
+async def get_bootstrap(
+    request: Request,
+    device_user = Depends(get_authenticated_device_user)
+):
+    """
+    Get categories, app settings, social links and the first prompts page
+    in one call, with the device's favorite prompt ids
+    """
+    snapshot = await get_catalog_snapshot().get()
+    favorite_ids = await FavoriteService().get_favorite_prompt_ids(device_user.device_id)
+    
+    etag = make_etag("bootstrap", snapshot.version, *favorite_ids)
+    if etag_matches(request, etag):
+        return not_modified(etag, "bootstrap")
+    
+    return Response(
+        content=snapshot.render(favorite_ids=favorite_ids),
+        media_type="application/json",
+        headers=cache_headers(etag, "bootstrap")
+    )
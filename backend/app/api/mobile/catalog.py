@@ -0,0 +1,68 @@
+"""
+Mobile Catalog Bundle Endpoints
+Manifest and download of the offline catalog bundle, and catalog change events
+"""
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.catalog_bundle import BUNDLE_PREFIX, BUNDLE_SUFFIX, get_catalog_bundle
+from app.core.catalog_events import get_catalog_events
+from app.core.http_cache import make_etag, etag_matches, not_modified, cache_headers, CACHE_POLICIES
+from app.core.serialization import json_response
+from app.utils.range_file import range_file_response
+
+router = APIRouter()
+
+
+@router.get("/manifest", tags=["Mobile Catalog"])
+async def get_catalog_manifest(request: Request):
+    """Get the current catalog bundle version and download URL"""
+    manifest = get_catalog_bundle().get_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="Catalog bundle not available yet")
+    
+    etag = make_etag("catalog_manifest", manifest["version"])
+    if etag_matches(request, etag):
+        return not_modified(etag, "catalog_manifest")
+    
+    return json_response(
+        {**manifest, "url": f"/api/mobile/catalog/bundle/{manifest['filename']}"},
+        headers=cache_headers(etag, "catalog_manifest")
+    )
+
+
+@router.api_route("/bundle/{filename}", methods=["GET", "HEAD"], tags=["Mobile Catalog"])
+async def download_catalog_bundle(filename: str, request: Request):
+    """Download a catalog bundle (gzip-compressed JSON); supports Range for resuming"""
+    catalog_bundle = get_catalog_bundle()
+    path = catalog_bundle.bundle_path(filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Catalog bundle not found")
+    
+    # Bundles are content-addressed: the name is the version
+    version = filename[len(BUNDLE_PREFIX):-len(BUNDLE_SUFFIX)]
+    return range_file_response(
+        request,
+        path,
+        media_type="application/gzip",
+        etag=f'"{version}"',
+        headers={"Cache-Control": CACHE_POLICIES["catalog_bundle"]}
+    )
+
+
+@router.get("/events", tags=["Mobile Catalog"])
+async def catalog_events_stream(
+    version: Optional[str] = Query(None, description="Catalog version the app already has"),
+    last_event_id: Optional[str] = Header(None)
+):
+    """Server-sent events with the catalog version, sent whenever prompts or categories change"""
+    stream = await get_catalog_events().open(last_event_id or version)
+    if stream is None:
+        raise HTTPException(status_code=503, detail="Too many event streams, retry later")
+    
+    return StreamingResponse(
+        stream,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
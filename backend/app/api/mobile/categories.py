@@ -2,25 +2,28 @@
 Mobile App Categories Endpoints
 Handles category listing for mobile app
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
+from app.core.http_cache import make_etag
+from app.core.response_cache import cache_key, get_response_cache
+from app.core.serialization import validate_as
 from app.schemas.category import CategoryResponse
 from app.services.category_service import CategoryService
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[CategoryResponse], tags=["Mobile Categories"])
-async def get_categories():
-    """Get all active categories for mobile app"""
+async def _build_categories():
+    """Active categories in response format, with their ETag"""
     category_service = CategoryService()
+    etag = make_etag("categories", await category_service.get_active_version())
     categories = await category_service.get_active_categories()
-    
-    # Convert to response format
-    category_responses = []
-    for category in categories:
-        category_dict = category.model_dump()
-        category_dict["id"] = str(category.id)
-        category_responses.append(CategoryResponse.model_validate(category_dict))
-    
-    return category_responses
+    return validate_as(list[CategoryResponse], categories), etag
+
+
+@router.get("", response_model=list[CategoryResponse], tags=["Mobile Categories"])
+async def get_categories(request: Request):
+    """Get all active categories for mobile app"""
+    response_cache = get_response_cache()
+    cached = await response_cache.get_or_build("categories", cache_key(request), _build_categories)
+    return response_cache.respond(request, cached, "categories")
@@ -3,9 +3,12 @@ Mobile App Favorites Endpoints
 Handles favorites management for mobile app
 """
 from typing import List
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from app.core.device_auth import get_authenticated_device_user
+from app.core.serialization import json_response, validate_as
+from app.schemas.common import PaginationParams, PaginatedResponse
+from app.schemas.favorite import FavoritesSyncRequest, FavoritesSyncResponse
 from app.schemas.prompt import PromptSummary
 from app.services.favorite_service import FavoriteService
 
@@ -16,16 +19,42 @@ router = APIRouter()
 async def get_favorites(device_user = Depends(get_authenticated_device_user)):
     """Get device's favorite prompts"""
     favorite_service = FavoriteService()
-    favorites = await favorite_service.get_device_favorites_with_prompts(device_user.device_id)
+    prompts = await favorite_service.get_favorite_summaries(device_user.device_id)
     
-    # Convert to response format
-    favorite_prompts = []
-    for fav in favorites:
-        prompt_dict = fav.prompt.model_dump()
-        prompt_dict["id"] = str(fav.prompt.id)
-        favorite_prompts.append(PromptSummary.model_validate(prompt_dict))
+    items = validate_as(List[PromptSummary], prompts)
+    for item in items:
+        item.is_favorited = True
+    return json_response(items, List[PromptSummary])
+
+
+@router.get("/paginated", response_model=PaginatedResponse[PromptSummary], tags=["Mobile Favorites"])
+async def get_favorites_paginated(
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=50),
+    device_user = Depends(get_authenticated_device_user)
+):
+    """Get device's favorite prompts a page at a time, newest first"""
+    pagination = PaginationParams(page=page, size=limit)
+    prompts, total = await FavoriteService().get_favorites_page(
+        device_user.device_id,
+        skip=pagination.skip,
+        limit=pagination.limit
+    )
     
-    return favorite_prompts
+    items = validate_as(List[PromptSummary], prompts)
+    for item in items:
+        item.is_favorited = True
+    return json_response(PaginatedResponse[PromptSummary].create(items, total, pagination))
+
+
+@router.post("/sync", response_model=FavoritesSyncResponse, tags=["Mobile Favorites"])
+async def sync_favorites(
+    sync_in: FavoritesSyncRequest,
+    device_user = Depends(get_authenticated_device_user)
+):
+    """Apply favorites added or removed offline in one request; returns the merged favorites"""
+    favorite_ids, applied = await FavoriteService().sync_favorites(device_user.device_id, sync_in.operations)
+    return json_response(FavoritesSyncResponse(favorite_ids=favorite_ids, applied=applied))
 
 
 @router.post("/{prompt_id}", tags=["Mobile Favorites"])
@@ -36,11 +65,6 @@ async def toggle_favorite(
     """Toggle favorite status (heart icon in mobile UI)"""
     favorite_service = FavoriteService()
     
-    is_favorited = await favorite_service.is_favorited(device_user.device_id, prompt_id)
-    
-    if is_favorited:
-        await favorite_service.remove_favorite(device_user.device_id, prompt_id)
-        return {"message": "Removed from favorites", "is_favorited": False}
-    else:
-        await favorite_service.add_favorite(device_user.device_id, prompt_id)
+    if await favorite_service.toggle_favorite(device_user.device_id, prompt_id):
         return {"message": "Added to favorites", "is_favorited": True}
+    return {"message": "Removed from favorites", "is_favorited": False}
@@ -2,25 +2,47 @@
 Mobile App Prompts Endpoints
 Handles prompt browsing, details, unlocking for mobile app
 """
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
 from app.core.device_auth import get_authenticated_device_user
-from app.schemas.prompt import PromptSummary, PromptDetail
+from app.core.config import settings
+from app.core.http_cache import make_etag, etag_matches, request_etags, not_modified, cache_headers, CACHE_POLICIES
+from app.core.serialization import json_response, validate_as
+from app.schemas.prompt import (
+    PromptSummary, PromptDetail, PromptResponse, PromptBatchItem, PromptBatchResponse
+)
 from app.schemas.common import PaginationParams, PaginatedResponse
-from app.services.prompt_service import PromptService
+from app.services.prompt_service import PromptService, SUMMARY_FIELDS
 from app.services.favorite_service import FavoriteService
 
 router = APIRouter()
 
 
+async def _with_favorites(device_id: str, prompts: List[dict]) -> List[PromptSummary]:
+    """Summaries with is_favorited set for the whole page at once"""
+    favorited = await FavoriteService().get_favorited_ids(
+        device_id,
+        [str(prompt["id"]) for prompt in prompts]
+    )
+    items = validate_as(List[PromptSummary], prompts)
+    for item in items:
+        item.is_favorited = item.id in favorited
+    return items
+
+
+def _detail_etag(prompt_id, updated_at, likes_count, is_unlocked: bool, is_favorited: bool) -> str:
+    # The favorite flag is per device, so it is part of the validator
+    return make_etag("prompt", prompt_id, updated_at, likes_count, is_unlocked, is_favorited)
+
+
 # Guest browsing removed - anonymous login provides same functionality
 @router.get("", response_model=PaginatedResponse[PromptSummary], tags=["Mobile Prompts"])
 async def browse_prompts(
     category_id: Optional[str] = Query(None, description="Category ID to filter prompts"),
     search: Optional[str] = Query(None, description="Search term to filter prompts"),
     page: int = Query(1, ge=1),
-    limit: int = Query(20, le=50),
+    limit: int = Query(20, ge=1, le=50),
     device_user = Depends(get_authenticated_device_user)
 ):
     """
@@ -28,36 +50,92 @@ async def browse_prompts(
     Supports filtering by category_id and search terms
     """
     prompt_service = PromptService()
-    pagination = PaginationParams(skip=(page-1)*limit, limit=limit)
+    pagination = PaginationParams(page=page, size=limit)
+    
+    # Filter by category ID, then by search term, else all published prompts.
+    # Rows come back as projected dicts: no documents are built for a list
+    prompts, total = await prompt_service.browse_summaries(
+        category_id=category_id,
+        search=search,
+        skip=pagination.skip,
+        limit=pagination.limit
+    )
+    
+    items = await _with_favorites(device_user.device_id, prompts)
+    return json_response(PaginatedResponse[PromptSummary].create(items, total, pagination))
+
+
+@router.get("/most-favorited", response_model=PaginatedResponse[PromptSummary], tags=["Mobile Prompts"])
+async def most_favorited_prompts(
+    category_id: Optional[str] = Query(None, description="Category ID for a per-category leaderboard"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=50),
+    device_user = Depends(get_authenticated_device_user)
+):
+    """Most favorited prompts, globally or within a category"""
+    pagination = PaginationParams(page=page, size=limit)
+    prompts, total = await PromptService().browse_most_favorited(
+        category_id=category_id,
+        skip=pagination.skip,
+        limit=pagination.limit
+    )
+    
+    items = await _with_favorites(device_user.device_id, prompts)
+    return json_response(PaginatedResponse[PromptSummary].create(items, total, pagination))
+
+
+@router.get("/batch", response_model=PromptBatchResponse, tags=["Mobile Prompts"])
+async def get_prompts_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated prompt IDs"),
+    summary: bool = Query(False, description="Return summaries instead of full details"),
+    device_user = Depends(get_authenticated_device_user)
+):
+    """
+    Fetch many prompts by id in one request (refilling the app's prompt cache)
+    Each item carries the ETag its detail (or summary) would have; send
+    known ETags in If-None-Match to get those ids back as not modified.
+    """
+    prompt_ids = list(dict.fromkeys(prompt_id.strip().lower() for prompt_id in ids.split(",") if prompt_id.strip()))
+    if len(prompt_ids) > settings.MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {settings.MAX_PAGE_SIZE} ids per request")
     
-    if category_id:
-        # Filter prompts by category ID
-        prompts = await prompt_service.get_by_category(category_id, limit=limit)
-        total = len(prompts)
-    elif search:
-        # Search prompts by search term
-        prompts = await prompt_service.search(search, limit=limit)
-        total = len(prompts)
-    else:
-        # Get all published prompts
-        result = await prompt_service.get_multi(pagination, {"status": "published"})
-        prompts = result.items
-        total = result.total
+    fields = SUMMARY_FIELDS + ("updated_at",) if summary else tuple(PromptResponse.model_fields)
+    # Only what the list endpoints show; hidden prompts are reported as missing
+    prompts = await PromptService().get_raw_by_ids(prompt_ids, fields, published_only=True)
+    favorited = await FavoriteService().get_favorited_ids(device_user.device_id, list(prompts))
+    known_etags = request_etags(request)
     
-    # Add unlock status for mobile app
-    items_with_status = []
-    for prompt in prompts:
-        prompt_dict = prompt.model_dump()
-        prompt_dict["id"] = str(prompt.id)
-        prompt_dict["is_unlocked"] = device_user.has_unlocked_prompt(str(prompt.id))
-        items_with_status.append(PromptSummary.model_validate(prompt_dict))
+    response = PromptBatchResponse(items=[])
+    for prompt_id in prompt_ids:
+        prompt = prompts.get(prompt_id)
+        if prompt is None:
+            response.missing_ids.append(prompt_id)
+            continue
+        
+        is_favorited = prompt_id in favorited
+        if summary:
+            etag = make_etag("prompt_summary", prompt["id"], prompt["updated_at"], prompt["likes_count"], is_favorited)
+        else:
+            etag = _detail_etag(
+                prompt["id"], prompt["updated_at"], prompt["likes_count"],
+                device_user.has_unlocked_prompt(prompt_id), is_favorited
+            )
+        if etag in known_etags:
+            response.not_modified_ids.append(prompt_id)
+            continue
+        
+        item = validate_as(PromptSummary if summary else PromptDetail, prompt)
+        item.is_favorited = is_favorited
+        response.items.append(PromptBatchItem(etag=etag, prompt=item))
     
-    return PaginatedResponse.create(items_with_status, total, pagination)
+    return json_response(response, headers={"Cache-Control": CACHE_POLICIES["prompt_detail"]})
 
 
 @router.get("/{prompt_id}", response_model=PromptDetail, tags=["Mobile Prompts"])
 async def get_prompt_detail(
     prompt_id: str,
+    request: Request,
     device_user = Depends(get_authenticated_device_user)
 ):
     """Get prompt detail for mobile app prompt screen"""
@@ -74,12 +152,13 @@ async def get_prompt_detail(
     # Increment view count
     await prompt_service.increment_view(prompt_id)
     
-    prompt_dict = prompt.model_dump()
-    prompt_dict["id"] = str(prompt.id)
-    prompt_dict["is_unlocked"] = is_unlocked
-    prompt_dict["is_favorited"] = is_favorited
+    etag = _detail_etag(prompt.id, prompt.updated_at, prompt.likes_count, is_unlocked, is_favorited)
+    if etag_matches(request, etag):
+        return not_modified(etag, "prompt_detail")
     
-    return PromptDetail.model_validate(prompt_dict)
+    detail = validate_as(PromptDetail, prompt)
+    detail.is_favorited = is_favorited
+    return json_response(detail, headers=cache_headers(etag, "prompt_detail"))
 
 
 @router.post("/{prompt_id}/unlock", tags=["Mobile Prompts"])
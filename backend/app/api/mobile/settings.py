@@ -2,19 +2,30 @@
 Mobile Settings API Endpoints
 Public settings endpoints for mobile app
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 
+from app.core.http_cache import make_etag
+from app.core.response_cache import cache_key, get_response_cache
+from app.core.serialization import validate_as
 from app.schemas.settings import AppSettingsPublic
 from app.services.settings_service import SettingsService
 
 router = APIRouter()
 
 
-@router.get("/app", response_model=AppSettingsPublic, tags=["Mobile Settings"])
-async def get_public_app_settings():
-    """Get public app settings for mobile app"""
+async def _build_app_settings():
+    """Public app settings with their ETag"""
     settings_service = SettingsService()
     settings = await settings_service.get_app_settings()
     
     # Return only public fields
-    return AppSettingsPublic.model_validate(settings.model_dump())
\ No newline at end of file
+    etag = make_etag("app_settings", settings.id, settings.updated_at)
+    return validate_as(AppSettingsPublic, settings), etag
+
+
+@router.get("/app", response_model=AppSettingsPublic, tags=["Mobile Settings"])
+async def get_public_app_settings(request: Request):
+    """Get public app settings for mobile app"""
+    response_cache = get_response_cache()
+    cached = await response_cache.get_or_build("app_settings", cache_key(request), _build_app_settings)
+    return response_cache.respond(request, cached, "app_settings")
@@ -2,17 +2,20 @@
 Mobile Social Links API Endpoints
 Public endpoints for social media links
 """
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from app.core.http_cache import make_etag
+from app.core.response_cache import cache_key, get_response_cache
 from app.schemas.social_link import SocialLinksPublicListResponse, SocialLinkPublic
 from app.services.social_link_service import SocialLinkService
 
 router = APIRouter()
 
 
-@router.get("/", response_model=SocialLinksPublicListResponse, tags=["Mobile Social Links"])
-async def get_public_social_links():
-    """Get active social links for public display"""
+async def _build_social_links():
+    """Active social links in public format, with their ETag"""
     social_link_service = SocialLinkService()
+    etag = make_etag("social_links", await social_link_service.get_active_version())
     links = await social_link_service.get_active_social_links()
     
     # Convert to public format (no sensitive data)
@@ -28,4 +31,12 @@ async def get_public_social_links():
     return SocialLinksPublicListResponse(
         items=response_links,
         total=len(response_links)
-    )
+    ), etag
+
+
+@router.get("/", response_model=SocialLinksPublicListResponse, tags=["Mobile Social Links"])
+async def get_public_social_links(request: Request):
+    """Get active social links for public display"""
+    response_cache = get_response_cache()
+    cached = await response_cache.get_or_build("social_links", cache_key(request), _build_social_links)
+    return response_cache.respond(request, cached, "social_links")
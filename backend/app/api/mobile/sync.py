@@ -0,0 +1,30 @@
+"""
+Mobile Sync Endpoint
+Delta sync for clients that keep a local catalog
+"""
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.core.device_auth import get_authenticated_device_user
+from app.core.serialization import json_response, validate_as
+from app.schemas.sync import SyncResponse
+from app.services.sync_service import SyncService, decode_sync_token
+
+router = APIRouter()
+
+
+@router.get("", response_model=SyncResponse, tags=["Mobile Sync"])
+async def sync_catalog(
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit for a full sync"),
+    device_user = Depends(get_authenticated_device_user)
+):
+    """Get prompts and categories created, updated, unpublished or deleted since a token"""
+    since_time, after_id = None, None
+    if since:
+        try:
+            since_time, after_id = decode_sync_token(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+    
+    changes = await SyncService().get_changes(since_time, after_id)
+    return json_response(validate_as(SyncResponse, changes))
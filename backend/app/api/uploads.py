@@ -0,0 +1,101 @@
+"""
+Uploaded Image Endpoints
+Uploaded images, resized and converted on request; everything else under /uploads is static
+"""
+import mimetypes
+import os
+from bisect import bisect_left
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.core.config import settings
+from app.core.http_cache import CACHE_POLICIES, etag_matches, make_etag, not_modified
+from app.core.image_processing import ImageProcessingError, variant_formats
+from app.core.image_resize_cache import get_image_resize_cache
+from app.utils.range_file import range_file_response
+from app.utils.static_files import CONTENT_ADDRESSED_NAME
+
+router = APIRouter()
+
+RESIZE_MEDIA_TYPES = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "jpeg": "image/jpeg",
+    "png": "image/png",
+}
+
+# Output format when only a size is asked for: the source's own
+SOURCE_FORMATS = {".jpg": "jpeg", ".jpeg": "jpeg", ".png": "png", ".webp": "webp"}
+
+# Sizes that can be made: each one is a resize job and a cache entry
+RESIZE_BUCKETS = sorted({
+    size for size in settings.IMAGE_RESIZE_BUCKETS if 0 < size < settings.IMAGE_RESIZE_MAX_DIMENSION
+} | {settings.IMAGE_RESIZE_MAX_DIMENSION})
+
+
+def resize_bucket(size: Optional[int]) -> Optional[int]:
+    """Smallest resize bucket that is at least size"""
+    if size is None:
+        return None
+    return RESIZE_BUCKETS[bisect_left(RESIZE_BUCKETS, size)]
+
+
+@router.api_route("/images/{filename}", methods=["GET", "HEAD"], tags=["Uploads"])
+async def get_uploaded_image(
+    filename: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=settings.IMAGE_RESIZE_MAX_DIMENSION, description="Maximum width"),
+    h: Optional[int] = Query(None, ge=1, le=settings.IMAGE_RESIZE_MAX_DIMENSION, description="Maximum height"),
+    fmt: Optional[str] = Query(None, pattern="^(webp|avif|jpeg|png)$", description="Output format")
+):
+    """
+    Get an uploaded image, optionally resized to fit w x h and/or converted to fmt
+    w and h are rounded up to the next resize bucket, so only a bounded set
+    of copies can be asked for. Resized copies are made once and then served
+    from a disk cache; they never change, so clients and CDNs may cache them
+    forever.
+    """
+    if os.path.basename(filename) != filename or filename.startswith("."):
+        raise HTTPException(status_code=404, detail="Image not found")
+    source_path = os.path.join(settings.upload_dir_path, "images", filename)
+    try:
+        source = os.stat(source_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    if w is None and h is None and fmt is None:
+        headers = {}
+        if CONTENT_ADDRESSED_NAME.match(filename):
+            headers["Cache-Control"] = CACHE_POLICIES["image_asset"]
+        return range_file_response(
+            request,
+            source_path,
+            mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            make_etag(filename, source.st_mtime_ns, source.st_size),
+            headers
+        )
+
+    w, h = resize_bucket(w), resize_bucket(h)
+    fmt = fmt or SOURCE_FORMATS.get(os.path.splitext(filename)[1].lower(), "jpeg")
+    if fmt == "avif" and "avif" not in variant_formats():
+        raise HTTPException(status_code=400, detail="AVIF output is not available")
+
+    # Known before the copy exists, so revalidation never triggers a resize
+    etag = make_etag(filename, source.st_mtime_ns, w, h, fmt)
+    if etag_matches(request, etag):
+        return not_modified(etag, "image_asset")
+
+    try:
+        path = await get_image_resize_cache().get(source_path, filename, w, h, fmt)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid image file")
+    except ImageProcessingError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return range_file_response(
+        request,
+        path,
+        RESIZE_MEDIA_TYPES[fmt],
+        etag,
+        {"Cache-Control": CACHE_POLICIES["image_asset"]}
+    )
@@ -0,0 +1,249 @@
+"""
+Catalog Bundle
+Offline catalog file (published prompts and active categories), rebuilt on admin changes
+"""
+import asyncio
+import fcntl
+import gzip
+import hashlib
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.response_cache import ResponseCache, response_cache
+from app.core.serialization import to_json, validate_as
+
+logger = logging.getLogger(__name__)
+
+# Response cache namespaces whose invalidation changes the bundle
+BUNDLE_NAMESPACES = ("prompts", "categories")
+
+MANIFEST_NAME = "manifest.json"
+BUNDLE_PREFIX = "catalog-"
+BUNDLE_SUFFIX = ".json.gz"
+
+
+class CatalogBundleBuilder:
+    """
+    Writes content-hashed, gzip-compressed catalog bundles plus a manifest
+    Admin changes schedule a rebuild once no further change arrived for the
+    debounce delay, so a burst of edits produces one bundle. Workers
+    serialize writes with a file lock and drop a bundle when another worker
+    already wrote a newer one.
+    Older bundles are kept for a while so downloads in progress can finish.
+    """
+
+    def __init__(self, cache: ResponseCache, directory: str, debounce: float, keep: int):
+        self.directory = directory
+        self.debounce = debounce
+        self.keep = keep
+        self._requested_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._manifest: Optional[Dict[str, Any]] = None
+        self._manifest_mtime = 0.0
+        cache.watch(*BUNDLE_NAMESPACES)
+        cache.add_listener(self._on_invalidate)
+
+    def schedule(self) -> None:
+        """Rebuild once changes have been quiet for the debounce delay"""
+        self._requested_at = datetime.utcnow()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._debounced_build())
+
+    def start(self) -> None:
+        """Build a first bundle when none exists yet"""
+        if self.get_manifest() is None:
+            self.schedule()
+
+    async def stop(self) -> None:
+        """Cancel a pending rebuild"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def get_manifest(self) -> Optional[Dict[str, Any]]:
+        """Current manifest, re-read only when the file changed"""
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
+
+        if self._manifest is None or mtime != self._manifest_mtime:
+            with open(path, "rb") as f:
+                self._manifest = json.loads(f.read())
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def bundle_path(self, filename: str) -> Optional[str]:
+        """Path of a bundle file, if it is one of ours and still exists"""
+        if not (filename.startswith(BUNDLE_PREFIX) and filename.endswith(BUNDLE_SUFFIX)):
+            return None
+        if os.path.basename(filename) != filename:
+            return None
+        path = os.path.join(self.directory, filename)
+        return path if os.path.isfile(path) else None
+
+    async def build(self, requested_at: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Read the catalog and write a new bundle; returns the new manifest"""
+        from app.db.base import MongoRepository
+        from app.models.category import Category
+        from app.models.prompt import Prompt, PromptStatus
+        from app.schemas.category import CategoryResponse
+        from app.schemas.prompt import PromptResponse
+
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = self.get_manifest()
+        if requested_at is not None and manifest is not None:
+            if datetime.fromisoformat(manifest["generated_at"]) >= requested_at:
+                # Another worker built after this change was made
+                return manifest
+
+        # The catalog is read without the lock; only writing the files takes it
+        generated_at = datetime.utcnow()
+        prompts = await MongoRepository(Prompt).find_raw(
+            {"status": PromptStatus.PUBLISHED.value, "is_active": True},
+            tuple(PromptResponse.model_fields),
+            sort=[("_id", 1)]
+        )
+        categories = await MongoRepository(Category).find_raw(
+            {"is_active": True},
+            tuple(CategoryResponse.model_fields),
+            sort=[("order", 1), ("_id", 1)]
+        )
+        body = to_json({
+            "categories": validate_as(List[CategoryResponse], categories),
+            "prompts": validate_as(List[PromptResponse], prompts),
+        })
+        manifest, written = await asyncio.to_thread(
+            self._write_locked, body, generated_at, len(prompts), len(categories)
+        )
+
+        if written:
+            logger.info(f"📦 Catalog bundle {manifest['version']} written ({manifest['size']} bytes)")
+        return manifest
+
+    def _write_locked(
+        self,
+        body: bytes,
+        generated_at: datetime,
+        prompts: int,
+        categories: int
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Write the bundle under the cross-process lock (runs in a thread)
+        The thread takes and releases the lock itself, so a build cancelled
+        while waiting cannot leave it held. A bundle read before another
+        worker's newer one is dropped; returns the manifest and whether
+        this call wrote it.
+        """
+        with self._locked():
+            manifest = self.get_manifest()
+            if manifest is not None and datetime.fromisoformat(manifest["generated_at"]) >= generated_at:
+                return manifest, False
+            return self._write(body, generated_at, prompts, categories), True
+
+    def _write(self, body: bytes, generated_at: datetime, prompts: int, categories: int) -> Dict[str, Any]:
+        """Compress and write the bundle and manifest atomically (with the lock held)"""
+        version = hashlib.sha256(body).hexdigest()[:16]
+        filename = f"{BUNDLE_PREFIX}{version}{BUNDLE_SUFFIX}"
+        path = os.path.join(self.directory, filename)
+
+        if os.path.exists(path):
+            # Same content as an earlier bundle (e.g. an edit was reverted)
+            with open(path, "rb") as f:
+                data = f.read()
+        else:
+            # mtime=0 keeps the compressed bytes identical for identical content
+            data = gzip.compress(body, compresslevel=9, mtime=0)
+            self._atomic_write(path, data)
+
+        manifest = {
+            "version": version,
+            "filename": filename,
+            "size": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "prompts": prompts,
+            "categories": categories,
+            "generated_at": generated_at.isoformat(),
+        }
+        self._atomic_write(os.path.join(self.directory, MANIFEST_NAME), json.dumps(manifest).encode())
+        self._prune(filename)
+        return manifest
+
+    def _prune(self, current: str) -> None:
+        """Delete all but the newest bundles"""
+        bundles = [
+            entry for entry in os.scandir(self.directory)
+            if entry.name.startswith(BUNDLE_PREFIX) and entry.name.endswith(BUNDLE_SUFFIX)
+        ]
+        bundles.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        for entry in bundles[self.keep:]:
+            if entry.name != current:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes) -> None:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the cross-process build lock (blocking, so only from a thread)"""
+        with open(os.path.join(self.directory, ".lock"), "a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _on_invalidate(self, namespace: str) -> None:
+        if namespace not in BUNDLE_NAMESPACES:
+            return
+        try:
+            self.schedule()
+        except RuntimeError:
+            # No running loop (e.g. scripts); the next change will schedule it
+            pass
+
+    async def _debounced_build(self) -> None:
+        while True:
+            requested_at = self._requested_at
+            await asyncio.sleep(self.debounce)
+            if self._requested_at != requested_at:
+                # Another change arrived while waiting
+                continue
+
+            try:
+                await self.build(requested_at)
+            except Exception as e:
+                logger.error(f"Failed to build catalog bundle: {e}")
+            if self._requested_at == requested_at:
+                return
+
+
+# Global catalog bundle instance
+catalog_bundle = CatalogBundleBuilder(
+    response_cache,
+    directory=os.path.join(settings.upload_dir_path, "catalog"),
+    debounce=settings.CATALOG_BUNDLE_DEBOUNCE,
+    keep=settings.CATALOG_BUNDLE_KEEP
+)
+
+
+def get_catalog_bundle() -> CatalogBundleBuilder:
+    """Get catalog bundle instance"""
+    return catalog_bundle
@@ -0,0 +1,158 @@
+"""
+Catalog Events
+Server-sent events telling connected apps that the catalog changed
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+from app.core.response_cache import ResponseCache, response_cache
+
+logger = logging.getLogger(__name__)
+
+# Response cache namespaces whose invalidation changes the catalog version
+EVENT_NAMESPACES = ("prompts", "categories")
+
+# Reconnect delay suggested to clients (milliseconds)
+RETRY_MS = 5000
+
+PING = b": ping\n\n"
+
+
+class CatalogEventBroadcaster:
+    """
+    Fans catalog version changes out to every open event stream in this worker
+    All streams wait on one shared future, which is resolved when the version
+    changes and on each heartbeat tick, so an idle connection costs a
+    suspended generator and no timer of its own. The version is built from
+    the shared invalidation generations, so every worker reports the same
+    one once its response cache has synced.
+    """
+
+    def __init__(self, cache: ResponseCache, heartbeat: float, max_connections: int):
+        self.cache = cache
+        self.heartbeat = heartbeat
+        self.max_connections = max_connections
+        self.connections = 0
+        self._published: Optional[str] = None
+        self._next: Optional[asyncio.Future] = None
+        self._publish_scheduled = False
+        self._ticker: Optional[asyncio.Task] = None
+        cache.watch(*EVENT_NAMESPACES)
+        cache.add_listener(self._on_invalidate)
+
+    @property
+    def version(self) -> str:
+        """Current catalog version (opaque; compare for equality only)"""
+        return "-".join(str(self.cache.generation(namespace)) for namespace in EVENT_NAMESPACES)
+
+    @property
+    def full(self) -> bool:
+        return self.connections >= self.max_connections
+
+    def start(self) -> None:
+        """Start the shared heartbeat"""
+        if self._ticker is None:
+            self._published = self.version
+            self._ticker = asyncio.create_task(self._tick_loop())
+
+    async def stop(self) -> None:
+        """Stop the heartbeat and end open streams"""
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+        self._wake(False)
+
+    async def open(self, last_version: Optional[str] = None) -> Optional[AsyncIterator[bytes]]:
+        """
+        Admit one client and return its event stream, or None when every slot is taken
+        The slot is taken here, before the response starts, so a burst of
+        connects cannot overshoot max_connections. The stream is already
+        running, so its slot is freed when it ends, even if it is never read.
+        """
+        stream = self._stream(last_version)
+        try:
+            await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+        return stream
+
+    async def _stream(self, last_version: Optional[str]) -> AsyncIterator[bytes]:
+        """Event stream for one client; starts with the current version unless it already has it"""
+        if self.full:
+            return
+        self.connections += 1
+        try:
+            # Admission marker, consumed by open()
+            yield b""
+            yield f"retry: {RETRY_MS}\n\n".encode()
+            while True:
+                version = self.version
+                if version != last_version:
+                    last_version = version
+                    yield self._event(version)
+
+                woken = await asyncio.shield(self._wait())
+                if woken is False:
+                    return
+                if woken is None:
+                    yield PING
+        finally:
+            self.connections -= 1
+
+    def publish(self) -> None:
+        """Wake every stream if the version changed since the last publish"""
+        self._publish_scheduled = False
+        version = self.version
+        if version != self._published:
+            self._published = version
+            self._wake(version)
+
+    @staticmethod
+    def _event(version: str) -> bytes:
+        return f'id: {version}\nevent: catalog\ndata: {{"version":"{version}"}}\n\n'.encode()
+
+    def _wait(self) -> asyncio.Future:
+        if self._next is None:
+            self._next = asyncio.get_running_loop().create_future()
+        return self._next
+
+    def _wake(self, value) -> None:
+        # The version for a change, None for a heartbeat, False to close
+        waiter, self._next = self._next, None
+        if waiter is not None and not waiter.done():
+            waiter.set_result(value)
+
+    def _on_invalidate(self, namespace: str) -> None:
+        if namespace not in EVENT_NAMESPACES or self._publish_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # One admin write can invalidate several namespaces: publish once
+        self._publish_scheduled = True
+        loop.call_soon(self.publish)
+
+    async def _tick_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            self._wake(None)
+
+
+# Global catalog event broadcaster instance
+catalog_events = CatalogEventBroadcaster(
+    response_cache,
+    heartbeat=settings.CATALOG_EVENTS_HEARTBEAT,
+    max_connections=settings.CATALOG_EVENTS_MAX_CONNECTIONS
+)
+
+
+def get_catalog_events() -> CatalogEventBroadcaster:
+    """Get catalog event broadcaster instance"""
+    return catalog_events
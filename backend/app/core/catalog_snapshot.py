@@ -0,0 +1,161 @@
+"""
+Catalog Snapshot
+Versioned, pre-serialized shared data for the mobile bootstrap payload
+"""
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.response_cache import ResponseCache, response_cache
+from app.core.serialization import to_json, validate_as
+
+logger = logging.getLogger(__name__)
+
+# Response cache namespaces the snapshot is built from
+SNAPSHOT_NAMESPACES = ("categories", "app_settings", "social_links", "prompts")
+
+
+class CatalogSnapshot:
+    """Shared bootstrap data serialized once, with a content version"""
+
+    __slots__ = ("version", "prefix", "expires_at")
+
+    def __init__(self, version: str, prefix: bytes, expires_at: float):
+        self.version = version
+        # JSON object without its closing brace, ready for per-device fields
+        self.prefix = prefix
+        self.expires_at = expires_at
+
+    def render(self, **overlay: Any) -> bytes:
+        """Complete JSON payload with per-device fields appended"""
+        parts = [self.prefix]
+        for key, value in overlay.items():
+            parts.append(b',"' + key.encode() + b'":' + to_json(value))
+        parts.append(b"}")
+        return b"".join(parts)
+
+
+class CatalogSnapshotManager:
+    """
+    Holds the current catalog snapshot for this worker
+    Invalidations of any namespace the snapshot depends on (including those
+    made by other workers, through the response cache) discard it and start
+    a rebuild in the background; concurrent requests share a single build.
+    """
+
+    def __init__(self, cache: ResponseCache, ttl: int, page_size: int):
+        self.cache = cache
+        self.ttl = ttl
+        self.page_size = page_size
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._building: Optional[asyncio.Future] = None
+        self._epoch = 0
+        cache.watch(*SNAPSHOT_NAMESPACES)
+        cache.add_listener(self._on_invalidate)
+
+    async def get(self) -> CatalogSnapshot:
+        """Current snapshot, building it when missing or expired"""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.expires_at > time.monotonic():
+            return snapshot
+
+        if self._building is not None:
+            return await asyncio.shield(self._building)
+
+        self._building = asyncio.get_running_loop().create_future()
+        epoch = self._epoch
+        try:
+            snapshot = await self._build()
+            if self._epoch == epoch:
+                self._snapshot = snapshot
+            self._building.set_result(snapshot)
+            return snapshot
+        except BaseException as e:
+            self._building.set_exception(e)
+            self._building.exception()
+            raise
+        finally:
+            self._building = None
+
+    def invalidate(self) -> None:
+        """Discard the snapshot in this worker"""
+        self._epoch += 1
+        self._snapshot = None
+
+    def _on_invalidate(self, namespace: str) -> None:
+        if namespace not in SNAPSHOT_NAMESPACES:
+            return
+
+        self.invalidate()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # Rebuild now so the next launch does not pay for it
+        loop.create_task(self._refresh())
+
+    async def _refresh(self) -> None:
+        try:
+            await self.get()
+        except Exception as e:
+            logger.error(f"Failed to rebuild catalog snapshot: {e}")
+
+    async def _build(self) -> CatalogSnapshot:
+        """Read the shared catalog and serialize it once"""
+        from app.schemas.category import CategoryResponse
+        from app.schemas.common import PaginatedResponse, PaginationParams
+        from app.schemas.prompt import PromptSummary
+        from app.schemas.settings import AppSettingsPublic
+        from app.schemas.social_link import SocialLinkPublic, SocialLinksPublicListResponse
+        from app.services.category_service import CategoryService
+        from app.services.prompt_service import PromptService
+        from app.services.settings_service import SettingsService
+        from app.services.social_link_service import SocialLinkService
+
+        categories, app_settings, links, (prompts, total) = await asyncio.gather(
+            CategoryService().get_active_categories(),
+            SettingsService().get_app_settings(),
+            SocialLinkService().get_active_social_links(),
+            PromptService().browse_summaries(limit=self.page_size)
+        )
+
+        social_links: List[SocialLinkPublic] = [
+            SocialLinkPublic(
+                platform=link.platform,
+                url=str(link.url),
+                is_active=link.is_active,
+                display_order=link.display_order
+            )
+            for link in links
+        ]
+        shared: Dict[str, Any] = {
+            "categories": validate_as(List[CategoryResponse], categories),
+            "settings": validate_as(AppSettingsPublic, app_settings),
+            "social_links": SocialLinksPublicListResponse(items=social_links, total=len(social_links)),
+            "prompts": PaginatedResponse[PromptSummary].create(
+                validate_as(List[PromptSummary], prompts),
+                total,
+                PaginationParams(page=1, size=self.page_size)
+            ),
+        }
+
+        body = to_json(shared)
+        version = hashlib.blake2b(body, digest_size=8).hexdigest()
+        prefix = b'{"version":"' + version.encode() + b'",' + body[1:-1]
+        return CatalogSnapshot(version, prefix, time.monotonic() + self.ttl)
+
+
+# Global catalog snapshot instance
+catalog_snapshot = CatalogSnapshotManager(
+    response_cache,
+    ttl=settings.CACHE_TTL,
+    page_size=settings.DEFAULT_PAGE_SIZE
+)
+
+
+def get_catalog_snapshot() -> CatalogSnapshotManager:
+    """Get catalog snapshot instance"""
+    return catalog_snapshot
@@ -1,5 +1,5 @@
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -33,11 +33,22 @@ class Settings(BaseSettings):
     # File Upload Configuration
     UPLOAD_DIR: str = Field(default="uploads", env="UPLOAD_DIR")
     MAX_FILE_SIZE: int = Field(default=10 * 1024 * 1024, env="MAX_FILE_SIZE")  # 10MB
+    UPLOAD_CHUNK_SIZE: int = Field(default=64 * 1024, env="UPLOAD_CHUNK_SIZE")  # bytes buffered per disk write
     ALLOWED_FILE_TYPES: List[str] = Field(
         default=["image/jpeg", "image/png", "image/webp"], 
         env="ALLOWED_FILE_TYPES"
     )
     
+    # Image Processing (decode, validation and thumbnails run in a process pool)
+    IMAGE_WORKERS: int = Field(default=2, env="IMAGE_WORKERS")  # processes per API worker; 0 runs jobs in a thread
+    IMAGE_MAX_CONCURRENCY: int = Field(default=4, env="IMAGE_MAX_CONCURRENCY")  # jobs in the pool per API worker
+    IMAGE_TIMEOUT: float = Field(default=30.0, env="IMAGE_TIMEOUT")  # seconds, including the wait for a slot
+    IMAGE_VARIANT_WIDTHS: List[int] = Field(default=[320, 640, 1080], env="IMAGE_VARIANT_WIDTHS")  # resized copies per image
+    IMAGE_VARIANT_QUALITY: int = Field(default=75, env="IMAGE_VARIANT_QUALITY")  # WebP / AVIF quality
+    IMAGE_RESIZE_CACHE_MAX_BYTES: int = Field(default=512 * 1024 * 1024, env="IMAGE_RESIZE_CACHE_MAX_BYTES")  # on-demand resizes kept on disk
+    IMAGE_RESIZE_MAX_DIMENSION: int = Field(default=2048, env="IMAGE_RESIZE_MAX_DIMENSION")  # largest w / h accepted
+    IMAGE_RESIZE_BUCKETS: List[int] = Field(default=[64, 128, 256, 320, 480, 640, 800, 1080, 1280, 1600], env="IMAGE_RESIZE_BUCKETS")  # w / h are rounded up to one of these (or the maximum)
+    
     # Docker Environment Detection
     DOCKER_ENV: bool = Field(default=False, env="DOCKER_ENV")
     
@@ -50,6 +61,48 @@ class Settings(BaseSettings):
     
     # Cache Configuration
     CACHE_TTL: int = Field(default=300, env="CACHE_TTL")  # 5 minutes
+    CACHE_SYNC_INTERVAL: float = Field(default=1.0, env="CACHE_SYNC_INTERVAL")  # seconds
+    
+    # Delta Sync
+    SYNC_PAGE_SIZE: int = Field(default=500, env="SYNC_PAGE_SIZE")  # prompts per sync response
+    SYNC_SAFETY_WINDOW: int = Field(default=5, env="SYNC_SAFETY_WINDOW")  # seconds of overlap between syncs
+    
+    # Offline Catalog Bundle (written under UPLOAD_DIR/catalog)
+    CATALOG_BUNDLE_DEBOUNCE: float = Field(default=10.0, env="CATALOG_BUNDLE_DEBOUNCE")  # seconds
+    CATALOG_BUNDLE_KEEP: int = Field(default=3, env="CATALOG_BUNDLE_KEEP")  # bundles kept for downloads in progress
+    
+    # Favorites Cache (favorite prompt ids of recently active devices, per worker)
+    FAVORITES_CACHE_DEVICES: int = Field(default=10000, env="FAVORITES_CACHE_DEVICES")
+    FAVORITES_CACHE_TTL: int = Field(default=600, env="FAVORITES_CACHE_TTL")  # seconds
+    FAVORITES_CACHE_CHECK_INTERVAL: float = Field(default=1.0, env="FAVORITES_CACHE_CHECK_INTERVAL")  # seconds between generation checks per device
+    FAVORITES_CACHE_PROMPTS: int = Field(default=100000, env="FAVORITES_CACHE_PROMPTS")  # prompt ids known before the cache is rebuilt
+    
+    # Catalog Events (server-sent events)
+    CATALOG_EVENTS_HEARTBEAT: float = Field(default=15.0, env="CATALOG_EVENTS_HEARTBEAT")  # seconds between keep-alive comments
+    CATALOG_EVENTS_MAX_CONNECTIONS: int = Field(default=5000, env="CATALOG_EVENTS_MAX_CONNECTIONS")  # per worker
+    
+    # Response Compression (gzip always; br and zstd when brotli / zstandard are installed)
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1000, env="COMPRESSION_MINIMUM_SIZE")  # bytes
+    
+    # Rate Limiting (per client IP, and per device when it can be identified)
+    RATE_LIMIT_CALLS: int = Field(default=100, env="RATE_LIMIT_CALLS")
+    RATE_LIMIT_PERIOD: int = Field(default=60, env="RATE_LIMIT_PERIOD")  # seconds
+    RATE_LIMIT_DEVICE_CALLS: int = Field(default=120, env="RATE_LIMIT_DEVICE_CALLS")
+    
+    # Daily Device Quotas (requests per UTC day, by device type)
+    DEVICE_DAILY_QUOTAS: Dict[str, int] = Field(
+        default={"android": 5000, "ios": 5000, "web": 2000},
+        env="DEVICE_DAILY_QUOTAS"
+    )
+    DEFAULT_DAILY_QUOTA: int = Field(default=2000, env="DEFAULT_DAILY_QUOTA")
+    QUOTA_FLUSH_INTERVAL: int = Field(default=10, env="QUOTA_FLUSH_INTERVAL")  # seconds
+    
+    # Shared Counter Backend for rate limits and quotas: memory, shared_memory or redis
+    COUNTER_BACKEND: str = Field(default="memory", env="COUNTER_BACKEND")
+    COUNTER_FLUSH_INTERVAL: float = Field(default=0.05, env="COUNTER_FLUSH_INTERVAL")  # seconds
+    REDIS_URL: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
+    SHARED_COUNTERS_PATH: str = Field(default="/dev/shm/royalprompts-counters", env="SHARED_COUNTERS_PATH")
+    SHARED_COUNTERS_SLOTS: int = Field(default=65536, env="SHARED_COUNTERS_SLOTS")
     
     # Environment
     ENVIRONMENT: str = Field(default="development", env="ENVIRONMENT")
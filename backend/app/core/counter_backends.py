@@ -0,0 +1,448 @@
+"""
+Counter Backends
+Storage for expiring integer counters shared by the rate limiter and device quotas
+"""
+import asyncio
+import fcntl
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# (key, amount, ttl seconds)
+CounterIncrement = Tuple[str, int, int]
+
+
+class TimerWheel:
+    """
+    Hashed timer wheel for amortized key expiry
+    Keys are dropped into the slot of their expiry tick; advancing the wheel
+    only touches the slots that elapsed since the last call.
+    """
+
+    def __init__(self, slots: int = 128, resolution: float = 1.0):
+        self.resolution = resolution
+        self._slots: List[Set[str]] = [set() for _ in range(slots)]
+        self._tick = int(time.time() / resolution)
+
+    def schedule(self, key: str, expires_at: float) -> None:
+        """Schedule key to fire at (or after) expires_at"""
+        tick = int(math.ceil(expires_at / self.resolution))
+        # Keys further out than one revolution fire early and get rescheduled
+        tick = min(max(tick, self._tick + 1), self._tick + len(self._slots))
+        self._slots[tick % len(self._slots)].add(key)
+
+    def advance(self, now: float) -> List[str]:
+        """Advance the wheel to now and return keys whose slot elapsed"""
+        target = int(now / self.resolution)
+        if target <= self._tick:
+            return []
+
+        fired: List[str] = []
+        steps = min(target - self._tick, len(self._slots))
+        for offset in range(1, steps + 1):
+            slot = self._slots[(self._tick + offset) % len(self._slots)]
+            if slot:
+                fired.extend(slot)
+                slot.clear()
+
+        self._tick = target
+        return fired
+
+
+class ExpiringCounters:
+    """
+    In-process integer counters with per-key TTL
+    Like Redis, the TTL is fixed when a key is created and increments keep it.
+    """
+
+    def __init__(self, wheel_slots: int = 128):
+        # key -> [value, expires at]
+        self._values: Dict[str, list] = {}
+        self._wheel = TimerWheel(slots=wheel_slots)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: str, now: Optional[float] = None) -> int:
+        """Current value of key (0 when missing or expired)"""
+        now = self._expire(now)
+        entry = self._values.get(key)
+        if entry is None or entry[1] <= now:
+            return 0
+        return entry[0]
+
+    def incr(self, key: str, amount: int, ttl: int, now: Optional[float] = None) -> int:
+        """Add amount to key, creating it with ttl when missing"""
+        now = self._expire(now)
+        entry = self._values.get(key)
+        if entry is None or entry[1] <= now:
+            entry = self._create(key, 0, now + ttl)
+        entry[0] += amount
+        return entry[0]
+
+    def set(self, key: str, value: int, ttl: int, now: Optional[float] = None) -> None:
+        """Overwrite key with value and a fresh ttl"""
+        now = self._expire(now)
+        entry = self._values.get(key)
+        if entry is None:
+            self._create(key, value, now + ttl)
+        else:
+            entry[0] = value
+            entry[1] = now + ttl
+
+    def setdefault(self, key: str, value: int, ttl: int, now: Optional[float] = None) -> int:
+        """Create key with value unless it exists; return the stored value"""
+        now = self._expire(now)
+        entry = self._values.get(key)
+        if entry is None or entry[1] <= now:
+            entry = self._create(key, value, now + ttl)
+        return entry[0]
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def _create(self, key: str, value: int, expires_at: float) -> list:
+        entry = [value, expires_at]
+        self._values[key] = entry
+        self._wheel.schedule(key, expires_at)
+        return entry
+
+    def _expire(self, now: Optional[float]) -> float:
+        """Drop keys whose slot elapsed, rescheduling the ones that were refreshed"""
+        if now is None:
+            now = time.time()
+        for key in self._wheel.advance(now):
+            entry = self._values.get(key)
+            if entry is None:
+                continue
+            if entry[1] <= now:
+                del self._values[key]
+            else:
+                self._wheel.schedule(key, entry[1])
+        return now
+
+
+class CounterBackend(ABC):
+    """Abstract storage for expiring counters"""
+
+    @abstractmethod
+    async def incr_many(self, items: Sequence[CounterIncrement]) -> List[int]:
+        """Apply increments and return the new value of each key"""
+        pass
+
+    @abstractmethod
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        """Read current values (0 for missing keys)"""
+        pass
+
+    @abstractmethod
+    async def setdefault(self, key: str, value: int, ttl: int) -> int:
+        """Create key with value unless it already exists; return the stored value"""
+        pass
+
+    async def incr(self, key: str, amount: int = 1, ttl: int = 60) -> int:
+        """Apply a single increment"""
+        return (await self.incr_many([(key, amount, ttl)]))[0]
+
+    async def close(self) -> None:
+        """Release backend resources"""
+        pass
+
+
+class MemoryCounterBackend(CounterBackend):
+    """Counters local to one worker process"""
+
+    def __init__(self):
+        self._counters = ExpiringCounters()
+
+    async def incr_many(self, items: Sequence[CounterIncrement]) -> List[int]:
+        return [self._counters.incr(key, amount, ttl) for key, amount, ttl in items]
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        return [self._counters.get(key) for key in keys]
+
+    async def setdefault(self, key: str, value: int, ttl: int) -> int:
+        return self._counters.setdefault(key, value, ttl)
+
+
+class SharedMemoryCounterBackend(CounterBackend):
+    """
+    Counters shared by the workers of one host
+    A fixed-size open-addressing hash table in a memory-mapped file (put it
+    on /dev/shm for a RAM-backed mapping), guarded by an flock. Each slot
+    holds a 64-bit key hash, an expiry timestamp and the value; expired slots
+    are reused in place.
+    """
+
+    _MAGIC = b"RPCNTR01"
+    _HEADER = struct.Struct("<8sQ")  # magic, slot count
+    _SLOT = struct.Struct("<Qdq")  # key hash, expires at, value
+    # Seconds between tries while another worker holds the table lock
+    _RETRY_DELAY = 0.0005
+    _MAX_RETRY_DELAY = 0.01
+
+    def __init__(self, path: str, slots: int = 65536, max_probe: int = 32):
+        self.path = path
+        self.max_probe = max_probe
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+        with self._locked():
+            header_size = self._HEADER.size
+            if os.fstat(self._fd).st_size >= header_size:
+                magic, existing_slots = self._HEADER.unpack(os.pread(self._fd, header_size, 0))
+                if magic == self._MAGIC:
+                    slots = existing_slots
+            size = header_size + slots * self._SLOT.size
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, self._HEADER.pack(self._MAGIC, slots), 0)
+
+        self.slots = slots
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = asyncio.Lock()
+
+    async def incr_many(self, items: Sequence[CounterIncrement]) -> List[int]:
+        async with self._acquire():
+            now = time.time()
+            results = []
+            for key, amount, ttl in items:
+                offset, value = self._slot(key, now, create_ttl=ttl)
+                value += amount
+                if offset is not None:
+                    self._write_value(offset, value)
+                results.append(value)
+            return results
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        async with self._acquire():
+            now = time.time()
+            return [self._slot(key, now)[1] for key in keys]
+
+    async def setdefault(self, key: str, value: int, ttl: int) -> int:
+        async with self._acquire():
+            offset, current = self._slot(key, time.time(), create_ttl=ttl, initial=value)
+            return current
+
+    async def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[None]:
+        """
+        Take the table lock without blocking the event loop
+        The flock is only ever tried without blocking; while another worker
+        holds it (for microseconds), this one sleeps briefly and retries. A
+        task cancelled while waiting therefore never holds the lock. The
+        asyncio lock keeps this worker's coroutines from sharing the flock
+        (it is per file, not per caller).
+        """
+        async with self._lock:
+            delay = self._RETRY_DELAY
+            while True:
+                try:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self._MAX_RETRY_DELAY)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _slot(
+        self,
+        key: str,
+        now: float,
+        create_ttl: Optional[int] = None,
+        initial: int = 0
+    ) -> Tuple[Optional[int], int]:
+        """Locate key's slot; with create_ttl, claim a slot when it is missing"""
+        key_hash = self._hash(key)
+        start = key_hash % self.slots
+        reusable = None
+
+        for probe in range(self.max_probe):
+            offset = self._HEADER.size + ((start + probe) % self.slots) * self._SLOT.size
+            slot_hash, expires_at, value = self._SLOT.unpack_from(self._map, offset)
+
+            if slot_hash == key_hash and expires_at > now:
+                return offset, value
+            if slot_hash == 0 or expires_at <= now:
+                if reusable is None:
+                    reusable = offset
+                if slot_hash == 0:
+                    # Never-used slot ends the probe chain
+                    break
+
+        if create_ttl is None:
+            return None, 0
+
+        if reusable is None:
+            # Table is saturated around this key: count it for this call only
+            # rather than overwrite another live counter
+            logger.warning(f"Shared counter table is full around key '{key}'; not storing it")
+            return None, initial
+        self._SLOT.pack_into(self._map, reusable, key_hash, now + create_ttl, initial)
+        return reusable, initial
+
+    def _write_value(self, offset: int, value: int) -> None:
+        struct.pack_into("<q", self._map, offset + 16, value)
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") or 1
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server"""
+    pass
+
+
+class RedisCounterBackend(CounterBackend):
+    """
+    Counters kept on a Redis-protocol server (Redis, Valkey, KeyDB, ...)
+    Speaks RESP directly over one pipelined connection; every batch of
+    increments costs a single round trip.
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = asyncio.Lock()
+
+    async def incr_many(self, items: Sequence[CounterIncrement]) -> List[int]:
+        commands = []
+        for key, amount, ttl in items:
+            # SET NX creates the key with its TTL; INCRBY keeps the TTL
+            commands.append(("SET", key, 0, "EX", ttl, "NX"))
+            commands.append(("INCRBY", key, amount))
+        replies = await self.execute(commands)
+        return [int(reply) for reply in replies[1::2]]
+
+    async def get_many(self, keys: Sequence[str]) -> List[int]:
+        if not keys:
+            return []
+        (values,) = await self.execute([("MGET", *keys)])
+        return [int(value) if value is not None else 0 for value in values]
+
+    async def setdefault(self, key: str, value: int, ttl: int) -> int:
+        replies = await self.execute([("SET", key, value, "EX", ttl, "NX"), ("GET", key)])
+        return int(replies[1] or 0)
+
+    async def execute(self, commands: Sequence[tuple]) -> list:
+        """Send commands as one pipeline and return their replies in order"""
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self._connect()
+                self._writer.write(b"".join(self._encode(command) for command in commands))
+                await self._writer.drain()
+                replies = [
+                    await asyncio.wait_for(self._read_reply(), self.timeout)
+                    for _ in commands
+                ]
+            except BaseException:
+                # Failed, timed out or cancelled part way: the stream may be
+                # out of sync, so start over on the next call
+                await self._disconnect()
+                raise
+
+        for reply in replies:
+            if isinstance(reply, RedisError):
+                raise reply
+        return replies
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._disconnect()
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            self.timeout
+        )
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if not setup:
+            return
+        try:
+            self._writer.write(b"".join(self._encode(command) for command in setup))
+            await self._writer.drain()
+            for _ in setup:
+                reply = await asyncio.wait_for(self._read_reply(), self.timeout)
+                if isinstance(reply, RedisError):
+                    raise reply
+        except BaseException:
+            # Never keep a connection that is unauthenticated or on the wrong db
+            await self._disconnect()
+            raise
+
+    async def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    @staticmethod
+    def _encode(command: tuple) -> bytes:
+        parts = [b"*%d\r\n" % len(command)]
+        for arg in command:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(parts)
+
+    async def _read_reply(self):
+        line = await self._reader.readuntil(b"\r\n")
+        prefix, payload = line[:1], line[1:-2]
+
+        if prefix == b"+":
+            return payload.decode("utf-8")
+        if prefix == b"-":
+            return RedisError(payload.decode("utf-8"))
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return (await self._reader.readexactly(length + 2))[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            if length < 0:
+                return None
+            return [await self._read_reply() for _ in range(length)]
+        raise RedisError(f"Unexpected reply: {line!r}")
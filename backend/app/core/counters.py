@@ -0,0 +1,146 @@
+"""
+Shared Counters
+Write-behind view over a counter backend used by the rate limiter and device quotas
+"""
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.counter_backends import (
+    CounterBackend, ExpiringCounters, MemoryCounterBackend,
+    RedisCounterBackend, SharedMemoryCounterBackend
+)
+
+logger = logging.getLogger(__name__)
+
+
+class BatchedCounters:
+    """
+    Per-worker counter view with batched, pipelined writes
+    Reads and increments are answered from memory (last value seen from the
+    backend plus local increments not yet acknowledged); increments are
+    pushed to the backend in one batch every flush interval, which also
+    brings back the totals contributed by other workers.
+    """
+
+    def __init__(
+        self,
+        backend: CounterBackend,
+        flush_interval: float = 0.05,
+        max_pending: int = 1000
+    ):
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._synced = ExpiringCounters()
+        # key -> [amount, ttl]
+        self._pending: Dict[str, list] = {}
+        self._inflight: Dict[str, int] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def value(self, key: str) -> int:
+        """Best local estimate of key's value"""
+        pending = self._pending.get(key)
+        return (
+            self._synced.get(key)
+            + self._inflight.get(key, 0)
+            + (pending[0] if pending else 0)
+        )
+
+    def add(self, key: str, amount: int, ttl: int) -> int:
+        """Increment key locally and queue the increment for the backend"""
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = [amount, ttl]
+        else:
+            pending[0] += amount
+
+        if len(self._pending) >= self.max_pending:
+            self._schedule_flush()
+        return self.value(key)
+
+    async def seed(self, key: str, value: int, ttl: int) -> int:
+        """Initialize key in the backend unless another worker already did"""
+        stored = await self.backend.setdefault(key, value, ttl)
+        self._synced.set(key, stored, ttl)
+        return self.value(key)
+
+    async def flush(self) -> None:
+        """Push pending increments in one backend call and refresh their totals"""
+        if not self._pending or self._inflight:
+            return
+
+        batch, self._pending = self._pending, {}
+        self._inflight = {key: amount for key, (amount, _) in batch.items()}
+        items = [(key, amount, ttl) for key, (amount, ttl) in batch.items()]
+
+        try:
+            totals = await self.backend.incr_many(items)
+        except Exception as e:
+            logger.error(f"Failed to flush counters: {e}")
+            # Requeue so the increments are not lost
+            for key, amount, ttl in items:
+                pending = self._pending.setdefault(key, [0, ttl])
+                pending[0] += amount
+        else:
+            for (key, _, ttl), total in zip(items, totals):
+                self._synced.set(key, total, ttl)
+        finally:
+            self._inflight = {}
+
+    def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop flushing, push what is left and close the backend"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except asyncio.CancelledError:
+                pass
+            self._loop_task = None
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.flush()
+        await self.backend.close()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+
+def create_counter_backend() -> CounterBackend:
+    """Build the counter backend selected by COUNTER_BACKEND"""
+    backend = settings.COUNTER_BACKEND.lower()
+    if backend == "redis":
+        return RedisCounterBackend(settings.REDIS_URL)
+    if backend == "shared_memory":
+        return SharedMemoryCounterBackend(
+            settings.SHARED_COUNTERS_PATH,
+            slots=settings.SHARED_COUNTERS_SLOTS
+        )
+    if backend != "memory":
+        logger.warning(f"Unknown COUNTER_BACKEND '{settings.COUNTER_BACKEND}', using memory")
+    return MemoryCounterBackend()
+
+
+# Global counters instance
+shared_counters = BatchedCounters(
+    create_counter_backend(),
+    flush_interval=settings.COUNTER_FLUSH_INTERVAL
+)
+
+
+def get_shared_counters() -> BatchedCounters:
+    """Get shared counters instance"""
+    return shared_counters
@@ -4,6 +4,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.core.exceptions import BaseAPIException
 from app.core.security import security_manager
 from app.models.device import DeviceUser
 from app.services.device_service import DeviceService
@@ -115,7 +116,8 @@ async def get_authenticated_device_user(
         
         return device_user
         
-    except HTTPException:
+    except (HTTPException, BaseAPIException):
+        # Quota errors (429 with Retry-After) must not turn into a logout
         raise
     except Exception:
         raise HTTPException(
@@ -15,11 +15,13 @@ class BaseAPIException(Exception):
         self,
         message: str,
         status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR,
-        details: Optional[Dict[str, Any]] = None
+        details: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None
     ):
         self.message = message
         self.status_code = status_code
         self.details = details or {}
+        self.headers = headers
         super().__init__(self.message)
 
 
@@ -77,10 +79,17 @@ class ConflictException(BaseAPIException):
 class RateLimitException(BaseAPIException):
     """Rate limit exceeded exception"""
     
-    def __init__(self, message: str = "Rate limit exceeded"):
+    def __init__(
+        self,
+        message: str = "Rate limit exceeded",
+        retry_after: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None
+    ):
         super().__init__(
             message=message,
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            details=details,
+            headers={"Retry-After": str(retry_after)} if retry_after else None
         )
 
 
@@ -115,7 +124,8 @@ async def base_api_exception_handler(request: Request, exc: BaseAPIException):
             "success": False,
             "error": exc.message,
             "details": exc.details
-        }
+        },
+        headers=exc.headers
     )
 
 
@@ -0,0 +1,277 @@
+"""
+Favorites Cache
+Per-device favorite prompt ids held as compact integer arrays, with LRU eviction
+"""
+import logging
+import time
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.counters import BatchedCounters, shared_counters
+from app.core.response_cache import ResponseCache, response_cache
+
+logger = logging.getLogger(__name__)
+
+# Device generations outlive cached entries by a wide margin
+GENERATION_TTL = 24 * 3600
+
+FavoritesLoader = Callable[[], Awaitable[List[str]]]
+SummariesLoader = Callable[[List[str]], Awaitable[Dict[str, dict]]]
+
+
+class PromptIndex:
+    """Dense integer ids for prompt id strings (per worker, append-only until rebuilt)"""
+
+    def __init__(self):
+        self._numbers: Dict[str, int] = {}
+        self._ids: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def encode(self, prompt_id: str) -> int:
+        number = self._numbers.get(prompt_id)
+        if number is None:
+            number = self._numbers[prompt_id] = len(self._ids)
+            self._ids.append(prompt_id)
+        return number
+
+    def lookup(self, prompt_id: str) -> Optional[int]:
+        """Number of an already known prompt id, without assigning one"""
+        return self._numbers.get(prompt_id)
+
+    def decode(self, number: int) -> str:
+        return self._ids[number]
+
+
+class DeviceFavorites:
+    """One device's favorites: ids in favorites order plus a sorted copy for lookups"""
+
+    __slots__ = ("order", "members", "generation", "expires_at", "checked_at")
+
+    def __init__(self, order: array, generation: int, expires_at: float, checked_at: float):
+        self.order = order
+        self.members = array("I", sorted(order))
+        self.generation = generation
+        self.expires_at = expires_at
+        self.checked_at = checked_at
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __contains__(self, number: int) -> bool:
+        position = bisect_left(self.members, number)
+        return position < len(self.members) and self.members[position] == number
+
+    def add(self, number: int) -> None:
+        if number not in self:
+            self.order.append(number)
+            insort(self.members, number)
+
+    def remove(self, number: int) -> None:
+        if number in self:
+            self.order.remove(number)
+            self.members.pop(bisect_left(self.members, number))
+
+
+class FavoritesCache:
+    """
+    Favorite prompt ids of recently active devices
+    Entries are loaded lazily and kept up to date by this worker's toggles.
+    Every change also bumps a per-device generation in the shared counter
+    backend, and an entry is only trusted while its generation matches, so a
+    toggle served by another worker is seen within check_interval seconds
+    (checking it is an in-memory or Redis read, not a Mongo query, and is
+    done at most once per interval per device).
+    Favorite list summaries are cached too, until the catalog changes. Once
+    more than max_prompts prompt ids are known, everything is dropped and
+    numbering starts over, so memory stays bounded.
+    """
+
+    def __init__(
+        self,
+        counters: BatchedCounters,
+        cache: ResponseCache,
+        max_devices: int,
+        ttl: int,
+        summaries_ttl: int,
+        check_interval: float = 1.0,
+        max_prompts: int = 100000
+    ):
+        self.counters = counters
+        self.max_devices = max_devices
+        self.ttl = ttl
+        self.summaries_ttl = summaries_ttl
+        self.check_interval = check_interval
+        self.max_prompts = max_prompts
+        self.index = PromptIndex()
+        self._devices: "OrderedDict[str, DeviceFavorites]" = OrderedDict()
+        self._summaries: Dict[int, dict] = {}
+        self._summaries_expire_at = 0.0
+        self._summaries_epoch = 0
+        cache.watch("prompts")
+        cache.add_listener(self._on_invalidate)
+
+    async def get(self, device_id: str, load: FavoritesLoader) -> DeviceFavorites:
+        """Favorites of device_id, loading them with load() on a miss"""
+        if len(self.index) > self.max_prompts:
+            # Numbers are only reassigned here, before any entry is read
+            self.clear()
+
+        now = time.monotonic()
+        entry = self._devices.get(device_id)
+        if entry is not None and entry.expires_at > now and entry.checked_at + self.check_interval > now:
+            # Recently checked: skip the backend round trip
+            self._devices.move_to_end(device_id)
+            return entry
+
+        checked_at = time.monotonic()
+        generation = await self._generation(device_id)
+        entry = self._devices.get(device_id)
+        if (
+            entry is not None
+            and entry.generation == generation
+            and entry.expires_at > time.monotonic()
+        ):
+            entry.checked_at = checked_at
+            self._devices.move_to_end(device_id)
+            return entry
+
+        # The generation was read first, so a change made during the load
+        # leaves this entry stale rather than wrongly current
+        prompt_ids = await load()
+        entry = DeviceFavorites(
+            array("I", (self.index.encode(prompt_id) for prompt_id in prompt_ids)),
+            generation,
+            time.monotonic() + self.ttl,
+            checked_at
+        )
+        if generation is not None:
+            self._store(device_id, entry)
+        return entry
+
+    async def contains(self, device_id: str, prompt_id: str, load: FavoritesLoader) -> bool:
+        """Whether the device favorited prompt_id"""
+        return bool(await self.favorited(device_id, [prompt_id], load))
+
+    async def favorited(self, device_id: str, prompt_ids: List[str], load: FavoritesLoader) -> Set[str]:
+        """Which of prompt_ids the device favorited"""
+        entry = await self.get(device_id, load)
+        favorited = set()
+        for prompt_id in prompt_ids:
+            number = self.index.lookup(prompt_id)
+            if number is not None and number in entry:
+                favorited.add(prompt_id)
+        return favorited
+
+    async def prompt_ids(self, device_id: str, load: FavoritesLoader) -> List[str]:
+        """Favorite prompt ids of the device, in favorites order"""
+        entry = await self.get(device_id, load)
+        return [self.index.decode(number) for number in entry.order]
+
+    async def changed(self, device_id: str, prompt_id: str, favorited: bool) -> None:
+        """Record a favorite added or removed by this worker"""
+        try:
+            generation = await self.counters.backend.incr(self._generation_key(device_id), 1, GENERATION_TTL)
+        except Exception as e:
+            logger.error(f"Failed to bump favorites generation: {e}")
+            self._devices.pop(device_id, None)
+            return
+
+        entry = self._devices.get(device_id)
+        if entry is None:
+            return
+        if entry.generation != generation - 1:
+            # Another worker changed this device's favorites too
+            del self._devices[device_id]
+            return
+
+        number = self.index.encode(prompt_id)
+        if favorited:
+            entry.add(number)
+        else:
+            entry.remove(number)
+        entry.generation = generation
+
+    async def reset(self, device_id: str) -> None:
+        """Forget a device's favorites everywhere after a bulk change"""
+        self._devices.pop(device_id, None)
+        try:
+            await self.counters.backend.incr(self._generation_key(device_id), 1, GENERATION_TTL)
+        except Exception as e:
+            logger.error(f"Failed to bump favorites generation: {e}")
+
+    async def summaries(self, prompt_ids: List[str], load: SummariesLoader) -> Dict[str, dict]:
+        """Raw prompt summaries by id, loading the missing ones with load(ids)"""
+        if self._summaries_expire_at <= time.monotonic():
+            self._summaries.clear()
+            self._summaries_expire_at = time.monotonic() + self.summaries_ttl
+
+        found: Dict[str, dict] = {}
+        missing: List[str] = []
+        for prompt_id in prompt_ids:
+            number = self.index.lookup(prompt_id)
+            summary = self._summaries.get(number) if number is not None else None
+            if summary is None:
+                missing.append(prompt_id)
+            else:
+                found[prompt_id] = summary
+
+        if missing:
+            epoch = self._summaries_epoch
+            loaded = await load(missing)
+            if epoch == self._summaries_epoch:
+                for prompt_id, summary in loaded.items():
+                    self._summaries[self.index.encode(prompt_id)] = summary
+            found.update(loaded)
+        return found
+
+    def clear(self) -> None:
+        """Drop every cached entry in this worker and start prompt numbering over"""
+        self._devices.clear()
+        self._summaries.clear()
+        self._summaries_epoch += 1
+        self.index = PromptIndex()
+
+    async def _generation(self, device_id: str) -> Optional[int]:
+        try:
+            return (await self.counters.backend.get_many([self._generation_key(device_id)]))[0]
+        except Exception as e:
+            logger.error(f"Failed to read favorites generation: {e}")
+            # Cached entries cannot be trusted: load without caching
+            return None
+
+    def _store(self, device_id: str, entry: DeviceFavorites) -> None:
+        self._devices[device_id] = entry
+        self._devices.move_to_end(device_id)
+        while len(self._devices) > self.max_devices:
+            self._devices.popitem(last=False)
+
+    def _on_invalidate(self, namespace: str) -> None:
+        if namespace == "prompts":
+            self._summaries_epoch += 1
+            self._summaries.clear()
+
+    @staticmethod
+    def _generation_key(device_id: str) -> str:
+        return f"fav:gen:{device_id}"
+
+
+# Global favorites cache instance
+favorites_cache = FavoritesCache(
+    shared_counters,
+    response_cache,
+    max_devices=settings.FAVORITES_CACHE_DEVICES,
+    ttl=settings.FAVORITES_CACHE_TTL,
+    summaries_ttl=settings.CACHE_TTL,
+    check_interval=settings.FAVORITES_CACHE_CHECK_INTERVAL,
+    max_prompts=settings.FAVORITES_CACHE_PROMPTS
+)
+
+
+def get_favorites_cache() -> FavoritesCache:
+    """Get favorites cache instance"""
+    return favorites_cache
@@ -0,0 +1,69 @@
+"""
+HTTP Caching
+ETag generation, conditional request handling and per-route Cache-Control policies
+"""
+import hashlib
+from typing import Any, Dict, Set
+
+from fastapi import Request, Response
+
+# Cache-Control policy per cacheable route
+CACHE_POLICIES: Dict[str, str] = {
+    "categories": "public, max-age=60, stale-while-revalidate=300",
+    "app_settings": "public, max-age=300, stale-while-revalidate=3600",
+    "social_links": "public, max-age=300, stale-while-revalidate=3600",
+    # Detail carries the device's favorite flag, so shared caches must not keep it
+    "prompt_detail": "private, no-cache",
+    "bootstrap": "private, no-cache",
+    "catalog_manifest": "public, no-cache",
+    # Bundle files are content-addressed and never change
+    "catalog_bundle": "public, max-age=31536000, immutable",
+    # Images named by their content hash, their thumbnails and variants, and resized copies
+    "image_asset": "public, max-age=31536000, immutable",
+}
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from the values a representation depends on"""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()}"'
+
+
+def request_etags(request: Request) -> Set[str]:
+    """Entity tags listed in If-None-Match, with weak prefixes removed"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return set()
+
+    etags = set()
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate:
+            etags.add(candidate)
+    return etags
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check If-None-Match against etag (weak comparison, as RFC 9110 requires)"""
+    etags = request_etags(request)
+    return "*" in etags or etag in etags
+
+
+def cache_headers(etag: str, policy: str) -> Dict[str, str]:
+    """Validator and Cache-Control headers for a cacheable route"""
+    return {"ETag": etag, "Cache-Control": CACHE_POLICIES[policy]}
+
+
+def not_modified(etag: str, policy: str) -> Response:
+    """Empty 304 response carrying the same validators as a full response"""
+    return Response(status_code=304, headers=cache_headers(etag, policy))
+
+
+def apply_cache_headers(response: Response, etag: str, policy: str) -> None:
+    """Attach validator and Cache-Control headers to a full response"""
+    response.headers.update(cache_headers(etag, policy))
@@ -0,0 +1,215 @@
+"""
+Image Processing
+Decoding, validation and thumbnails run in a process pool, off the event loop
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from app.core.config import settings
+
+try:
+    import pillow_avif  # noqa: F401  registers the AVIF plugin with Pillow
+except ImportError:  # pragma: no cover - optional dependency
+    pillow_avif = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (300, 300)
+
+# Variant formats, smallest files first
+VARIANT_FORMATS = ("avif", "webp")
+
+
+def variant_formats() -> List[str]:
+    """Variant formats this Pillow build can write"""
+    Image.init()
+    return [fmt for fmt in VARIANT_FORMATS if fmt.upper() in Image.SAVE]
+
+
+class ImageProcessingError(Exception):
+    """Image work could not be done (busy, timed out or crashed)"""
+
+
+# Job functions run in the pool's processes: module level, picklable arguments
+
+def write_thumbnail(img: Image.Image, thumbnail_path: str, size: tuple = THUMBNAIL_SIZE) -> bool:
+    """Write a JPEG thumbnail of an opened image (modifies img)"""
+    try:
+        # Convert to RGB if necessary
+        if img.mode in ("RGBA", "P"):
+            img = img.convert("RGB")
+
+        # Generate thumbnail (JPEG sources are decoded at a reduced scale)
+        img.thumbnail(size, Image.Resampling.LANCZOS)
+        img.save(thumbnail_path, "JPEG", quality=85)
+        return True
+    except Exception as e:
+        logger.error(f"Error generating thumbnail: {e}")
+        return False
+
+
+def probe_image(path: str, thumbnail_path: Optional[str] = None) -> Tuple[int, int, bool]:
+    """
+    Decode the image once to validate it, read its size and write the thumbnail
+    Raises ValueError when the file is not a readable image.
+    """
+    try:
+        with Image.open(path) as img:
+            # A full decode catches truncated files that verify() lets through
+            img.load()
+            width, height = img.size
+            thumbnail_written = False
+            if thumbnail_path is not None:
+                thumbnail_written = write_thumbnail(img, thumbnail_path)
+    except Exception as e:
+        raise ValueError(f"Invalid image file: {e}")
+    return width, height, thumbnail_written
+
+
+def thumbnail_file(image_path: str, thumbnail_path: str, size: tuple = THUMBNAIL_SIZE) -> bool:
+    """Write a thumbnail of an image file"""
+    try:
+        with Image.open(image_path) as img:
+            return write_thumbnail(img, thumbnail_path, size)
+    except Exception as e:
+        logger.error(f"Error generating thumbnail: {e}")
+        return False
+
+
+def render_variants(image_path: str, directory: str, variants: List[Dict[str, Any]], quality: int) -> List[Dict[str, Any]]:
+    """
+    Write resized copies of an image; returns the variants written (in order), with their size
+    Each variant names its file (the last part of its url), width, height and
+    format. The image is decoded once and scaled down step by step, largest
+    width first.
+    """
+    sizes: Dict[str, int] = {}
+    with Image.open(image_path) as img:
+        largest = max(variant["width"] for variant in variants)
+        # JPEG sources can decode straight at a reduced scale
+        img.draft("RGB", (largest, max(1, img.height * largest // img.width)))
+        has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+        current = img.convert("RGBA" if has_alpha else "RGB")
+
+        for width in sorted({variant["width"] for variant in variants}, reverse=True):
+            sized = [variant for variant in variants if variant["width"] == width]
+            if current.width != width:
+                current = current.resize((width, sized[0]["height"]), Image.Resampling.LANCZOS)
+
+            for variant in sized:
+                path = os.path.join(directory, variant["url"].rsplit("/", 1)[-1])
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                try:
+                    if not os.path.exists(path):
+                        current.save(temp_path, variant["format"].upper(), quality=quality)
+                        os.replace(temp_path, path)
+                    sizes[variant["url"]] = os.path.getsize(path)
+                except Exception as e:
+                    logger.error(f"Error writing image variant {path}: {e}")
+                    if os.path.exists(temp_path):
+                        os.remove(temp_path)
+    return [{**variant, "size": sizes[variant["url"]]} for variant in variants if variant["url"] in sizes]
+
+
+def resize_image(source_path: str, path: str, width: Optional[int], height: Optional[int], fmt: str, quality: int) -> int:
+    """
+    Write a copy of an image fitting inside width x height (never upscaled); returns its size
+    Either bound may be None to scale by the other alone. Raises ValueError
+    when the source is not a readable image.
+    """
+    try:
+        with Image.open(source_path) as img:
+            bound = (width or img.width, height or img.height)
+            # JPEG sources can decode straight at a reduced scale
+            img.draft("RGB", bound)
+            has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+            resized = img.convert("RGBA" if has_alpha and fmt != "jpeg" else "RGB")
+            resized.thumbnail(bound, Image.Resampling.LANCZOS)
+    except Exception as e:
+        raise ValueError(f"Invalid image file: {e}")
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        options = {"optimize": True} if fmt in ("jpeg", "png") else {}
+        if fmt != "png":
+            options["quality"] = quality
+        resized.save(temp_path, fmt.upper(), **options)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return os.path.getsize(path)
+
+
+class ImageProcessor:
+    """
+    Bounded process pool for CPU-heavy image work
+    A semaphore caps how many jobs this worker has in the pool, and each job
+    (including its wait for a slot) is given a timeout, so a burst of admin
+    uploads queues in the pool instead of stalling the event loop. With
+    workers set to 0, jobs run in a thread instead (development).
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, timeout: float):
+        self.workers = workers
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        """Create the process pool"""
+        if self._executor is None and self.workers > 0:
+            # forkserver: children do not inherit the event loop, sockets or threads
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context("spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    async def stop(self) -> None:
+        """Shut the pool down, dropping queued jobs"""
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) in the pool; exceptions raised by func propagate"""
+        try:
+            return await asyncio.wait_for(self._run(func, *args), self.timeout)
+        except asyncio.TimeoutError:
+            raise ImageProcessingError("Image processing timed out")
+        except BrokenProcessPool:
+            # A worker died (e.g. out of memory on a huge image): replace the pool
+            logger.error("Image process pool broke; restarting it")
+            executor, self._executor = self._executor, None
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise ImageProcessingError("Image processing failed")
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        async with self._semaphore:
+            if self.workers <= 0:
+                return await asyncio.to_thread(func, *args)
+            self.start()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+
+# Global image processor instance
+image_processor = ImageProcessor(
+    workers=settings.IMAGE_WORKERS,
+    max_concurrency=settings.IMAGE_MAX_CONCURRENCY,
+    timeout=settings.IMAGE_TIMEOUT
+)
+
+
+def get_image_processor() -> ImageProcessor:
+    """Get image processor instance"""
+    return image_processor
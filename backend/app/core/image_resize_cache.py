@@ -0,0 +1,172 @@
+"""
+Image Resize Cache
+On-demand resized copies of uploaded images in a size-capped, LRU-evicted disk cache
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.image_processing import ImageProcessor, image_processor, resize_image
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index.json"
+
+# Seconds between writes of this worker's accesses to the shared index
+FLUSH_INTERVAL = 30.0
+
+
+class ImageResizeCache:
+    """
+    Resized images on disk, evicted least recently used once over max_bytes
+    The index file (file name -> size and last access) is shared by all
+    workers: each one buffers its accesses and merges them into the index
+    under a file lock, evicting as it goes, so no worker has to hold the
+    whole index in memory. Requests for a copy that is being made wait
+    for that job instead of starting another one.
+    """
+
+    def __init__(self, processor: ImageProcessor, directory: str, max_bytes: int, quality: int):
+        self.processor = processor
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._accessed: Dict[str, Tuple[int, float]] = {}
+        self._written = 0
+        self._jobs: Dict[str, asyncio.Task] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the periodic index flush"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop flushing and record what is left"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def get(self, source_path: str, name: str, width: Optional[int], height: Optional[int], fmt: str) -> str:
+        """
+        Path of a resized copy of source_path, making it on a miss
+        name must identify the source's content (its file name, as uploads are never overwritten).
+        Raises ValueError when the source is not a readable image.
+        """
+        stem = os.path.splitext(name)[0]
+        filename = f"{stem}_{width or 0}x{height or 0}.{fmt}"
+        path = os.path.join(self.directory, filename)
+
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            job = self._jobs.get(filename)
+            if job is None:
+                job = self._jobs[filename] = asyncio.get_running_loop().create_task(
+                    self._resize(source_path, path, width, height, fmt)
+                )
+                job.add_done_callback(lambda _: self._jobs.pop(filename, None))
+            # Shielded: one client going away must not cancel the others' job
+            size = await asyncio.shield(job)
+
+        self._accessed[filename] = (size, time.time())
+        return path
+
+    async def flush(self) -> None:
+        """Merge this worker's accesses into the shared index, evicting over the cap"""
+        accessed, self._accessed = self._accessed, {}
+        try:
+            await asyncio.to_thread(self._merge_index, accessed)
+        except Exception as e:
+            logger.error(f"Failed to update image resize cache index: {e}")
+
+    async def _resize(self, source_path: str, path: str, width: Optional[int], height: Optional[int], fmt: str) -> int:
+        os.makedirs(self.directory, exist_ok=True)
+        size = await self.processor.run(resize_image, source_path, path, width, height, fmt, self.quality)
+        self._written += size
+        if self._written > self.max_bytes // 10:
+            # Many new copies since the last flush: evict early rather than overshoot the cap
+            self._written = 0
+            asyncio.get_running_loop().create_task(self.flush())
+        return size
+
+    def _merge_index(self, accessed: Dict[str, Tuple[int, float]]) -> None:
+        """Read, update, evict and rewrite the index under the lock (blocking: runs in a thread)"""
+        os.makedirs(self.directory, exist_ok=True)
+        index_path = os.path.join(self.directory, INDEX_NAME)
+        with open(os.path.join(self.directory, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = self._read_index(index_path)
+                for filename, (size, accessed_at) in accessed.items():
+                    previous = entries.get(filename)
+                    if previous is not None and previous[1] >= accessed_at:
+                        continue
+                    # Another worker may have evicted it since this one served it
+                    if previous is not None or os.path.exists(os.path.join(self.directory, filename)):
+                        entries[filename] = [size, accessed_at]
+
+                total = sum(entry[0] for entry in entries.values())
+                for filename in sorted(entries, key=lambda key: entries[key][1]):
+                    if total <= self.max_bytes:
+                        break
+                    total -= entries.pop(filename)[0]
+                    try:
+                        os.remove(os.path.join(self.directory, filename))
+                    except FileNotFoundError:
+                        pass
+
+                temp_path = f"{index_path}.{os.getpid()}.tmp"
+                with open(temp_path, "w") as f:
+                    json.dump(entries, f, separators=(",", ":"))
+                os.replace(temp_path, index_path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_index(self, index_path: str) -> Dict[str, list]:
+        try:
+            with open(index_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            logger.error("Image resize cache index is corrupt; rebuilding it")
+
+        # No usable index: adopt the files already in the cache
+        entries = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.startswith(".") and entry.name != INDEX_NAME and not entry.name.endswith(".tmp"):
+                stat = entry.stat()
+                entries[entry.name] = [stat.st_size, stat.st_mtime]
+        return entries
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            if self._accessed:
+                await self.flush()
+
+
+# Global image resize cache instance
+image_resize_cache = ImageResizeCache(
+    image_processor,
+    directory=os.path.join(settings.upload_dir_path, "resized"),
+    max_bytes=settings.IMAGE_RESIZE_CACHE_MAX_BYTES,
+    quality=settings.IMAGE_VARIANT_QUALITY
+)
+
+
+def get_image_resize_cache() -> ImageResizeCache:
+    """Get image resize cache instance"""
+    return image_resize_cache
@@ -0,0 +1,109 @@
+"""
+Image Variants
+Resized WebP (and AVIF, when available) copies of uploaded images, made in the background
+"""
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.image_processing import ImageProcessor, image_processor, render_variants, variant_formats
+from app.core.response_cache import ResponseCache, response_cache
+from app.services.image_asset_service import ImageAssetService
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_URL = "/uploads/variants"
+
+
+class ImageVariantGenerator:
+    """
+    Plans and writes the resized copies of content-addressed images
+    Variant names derive from the image hash, width and format, so they are
+    known (and returned to the uploader) before they are written, and never
+    change. Writing happens on the image process pool after the upload
+    response; the finished list is then stored on the asset and on every
+    prompt using the image.
+    """
+
+    def __init__(
+        self,
+        processor: ImageProcessor,
+        cache: ResponseCache,
+        directory: str,
+        widths: List[int],
+        quality: int
+    ):
+        self.processor = processor
+        self.cache = cache
+        self.directory = directory
+        self.widths = widths
+        self.quality = quality
+        self.formats = variant_formats()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def plan(self, sha256: str, width: Optional[int], height: Optional[int]) -> List[Dict[str, Any]]:
+        """Variants of an image, smallest format first; widths are never upscaled"""
+        if not width or not height:
+            return []
+        targets = sorted({min(target, width) for target in self.widths if target > 0})
+        return [
+            {
+                "url": f"{VARIANTS_URL}/{sha256}_{target}w.{fmt}",
+                "width": target,
+                "height": max(1, round(height * target / width)),
+                "format": fmt,
+            }
+            for fmt in self.formats
+            for target in targets
+        ]
+
+    def schedule(self, asset: Dict[str, Any], image_path: str) -> None:
+        """Write an asset's variants in the background, once per asset at a time"""
+        sha256 = asset["sha256"]
+        if sha256 in self._tasks:
+            return
+        variants = self.plan(sha256, asset.get("width"), asset.get("height"))
+        if not variants:
+            return
+        self._tasks[sha256] = asyncio.get_running_loop().create_task(
+            self._generate(asset, image_path, variants)
+        )
+
+    async def stop(self) -> None:
+        """Cancel variant jobs still waiting; missing variants are redone on the next upload"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _generate(self, asset: Dict[str, Any], image_path: str, variants: List[Dict[str, Any]]) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            written = await self.processor.run(render_variants, image_path, self.directory, variants, self.quality)
+            if written:
+                prompts_updated = await ImageAssetService().set_variants(asset["sha256"], written)
+                if prompts_updated:
+                    self.cache.invalidate("prompts")
+                logger.info(f"🖼️ Wrote {len(written)} variants of image {asset['sha256'][:12]}")
+        except Exception as e:
+            logger.error(f"Failed to generate image variants: {e}")
+        finally:
+            self._tasks.pop(asset["sha256"], None)
+
+
+# Global image variant generator instance
+image_variants = ImageVariantGenerator(
+    image_processor,
+    response_cache,
+    directory=os.path.join(settings.upload_dir_path, "variants"),
+    widths=settings.IMAGE_VARIANT_WIDTHS,
+    quality=settings.IMAGE_VARIANT_QUALITY
+)
+
+
+def get_image_variants() -> ImageVariantGenerator:
+    """Get image variant generator instance"""
+    return image_variants
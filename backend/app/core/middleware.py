@@ -1,99 +1,191 @@
 import time
+import hashlib
 import logging
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from typing import Dict, Optional, Tuple
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.gzip import GZipMiddleware
 
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.counters import BatchedCounters, shared_counters
+from app.core.rate_limit import RateLimitPolicy, SlidingWindowRateLimiter, parse_policies
 
 logger = logging.getLogger(__name__)
 
+# Per-route policies: path prefix -> (calls, period seconds)
+ROUTE_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "/api/admin/auth/login": (10, 60),
+    "/api/mobile/auth/anonymous-login": (20, 60),
+    "/api/admin/prompts/upload": (30, 60),
+}
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware for logging HTTP requests"""
+
+class RequestLoggingMiddleware:
+    """Pure ASGI middleware for logging HTTP requests"""
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
         start_time = time.time()
+        status_code = 500
         
         # Log request
-        logger.info(f"Request: {request.method} {request.url}")
-        
-        # Process request
-        response = await call_next(request)
+        query = scope.get("query_string", b"")
+        path = scope["path"] + ("?" + query.decode("latin-1") if query else "")
+        logger.info(f"Request: {scope['method']} {path}")
         
-        # Calculate processing time
-        process_time = time.time() - start_time
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Add processing time header
+                process_time = time.time() - start_time
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (b"x-process-time", str(process_time).encode("latin-1"))
+                ]
+            await send(message)
         
-        # Log response
-        logger.info(
-            f"Response: {response.status_code} - "
-            f"Processing time: {process_time:.3f}s"
-        )
-        
-        # Add processing time header
-        response.headers["X-Process-Time"] = str(process_time)
-        
-        return response
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            # Log response once the body has been sent
+            process_time = time.time() - start_time
+            logger.info(
+                f"Response: {status_code} - "
+                f"Processing time: {process_time:.3f}s"
+            )
 
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """Middleware for adding security headers"""
+class SecurityHeadersMiddleware:
+    """Pure ASGI middleware for adding security headers"""
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        response = await call_next(request)
-        
-        # Add security headers
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+    def __init__(self, app: ASGIApp):
+        self.app = app
         
+        # Encode the headers once instead of on every response
+        headers = {
+            "x-content-type-options": "nosniff",
+            "x-frame-options": "DENY",
+            "x-xss-protection": "1; mode=block",
+            "referrer-policy": "strict-origin-when-cross-origin",
+        }
         if settings.ENVIRONMENT == "production":
-            response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+            headers["strict-transport-security"] = "max-age=31536000; includeSubDomains"
+        
+        self.raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+        self.header_names = {name for name, _ in self.raw_headers}
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                # Security headers replace any value set by the endpoint
+                message["headers"] = [
+                    *(header for header in message.get("headers", ()) if header[0] not in self.header_names),
+                    *self.raw_headers
+                ]
+            await send(message)
         
-        return response
+        await self.app(scope, receive, send_with_headers)
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple rate limiting middleware"""
+class RateLimitMiddleware:
+    """
+    Pure ASGI rate limiting middleware
+    Applies a per-client policy, an optional per-device policy and per-route
+    (per client IP) policies using O(1) sliding-window counters; rejected
+    requests get a 429 with Retry-After instead of an unhandled exception.
+    """
     
-    def __init__(self, app, calls: int = 100, period: int = 60):
-        super().__init__(app)
-        self.calls = calls
-        self.period = period
-        self.clients = {}
+    def __init__(
+        self,
+        app: ASGIApp,
+        calls: int = 100,
+        period: int = 60,
+        device_calls: Optional[int] = None,
+        route_limits: Optional[Dict[str, Tuple[int, int]]] = None,
+        exempt_paths: Tuple[str, ...] = ("/health", "/docs", "/redoc", "/openapi.json"),
+        counters: Optional[BatchedCounters] = None
+    ):
+        self.app = app
+        self.client_policy = RateLimitPolicy(calls, period)
+        self.device_policy = RateLimitPolicy(device_calls, period) if device_calls else None
+        self.route_policies = parse_policies(route_limits or {})
+        self.exempt_paths = exempt_paths
+        self.limiter = SlidingWindowRateLimiter(counters or shared_counters)
     
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
         
-        # Clean old entries
-        self.clients = {
-            ip: (calls, start_time) 
-            for ip, (calls, start_time) in self.clients.items()
-            if current_time - start_time < self.period
-        }
+        path = scope["path"]
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        device_key = self._device_key(scope)
+        
+        # Most specific decision wins: route, then device, then client IP.
+        # Route policies guard login and upload endpoints, so they are keyed
+        # on the client IP: the device key is whatever the caller sends and
+        # a fresh one per request would get a fresh bucket each time.
+        checks = []
+        for prefix, policy in self.route_policies:
+            if path.startswith(prefix):
+                checks.append((f"route:{prefix}:{client_ip}", policy))
+                break
+        if device_key and self.device_policy:
+            checks.append((f"device:{device_key}", self.device_policy))
+        checks.append((f"ip:{client_ip}", self.client_policy))
         
-        # Check rate limit
-        if client_ip in self.clients:
-            calls_made, start_time = self.clients[client_ip]
-            if current_time - start_time < self.period:
-                if calls_made >= self.calls:
-                    from fastapi import HTTPException, status
-                    raise HTTPException(
-                        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                        detail="Rate limit exceeded"
-                    )
-                self.clients[client_ip] = (calls_made + 1, start_time)
-            else:
-                self.clients[client_ip] = (1, current_time)
-        else:
-            self.clients[client_ip] = (1, current_time)
+        # Every limit is checked before any is counted, so a rejected
+        # request uses up none of them
+        now = time.time()
+        for key, policy in checks:
+            result = self.limiter.check(key, policy, now)
+            if not result.allowed:
+                response = JSONResponse(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    content={
+                        "success": False,
+                        "error": "Rate limit exceeded",
+                        "details": {"retry_after": result.retry_after}
+                    },
+                    headers={
+                        "Retry-After": str(result.retry_after),
+                        "X-RateLimit-Limit": str(result.limit),
+                        "X-RateLimit-Remaining": "0"
+                    }
+                )
+                await response(scope, receive, send)
+                return
+        for key, policy in checks:
+            self.limiter.record(key, policy, now)
         
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
+    
+    @staticmethod
+    def _device_key(scope: Scope) -> Optional[str]:
+        """Identify the calling device by X-Device-ID or its bearer token"""
+        authorization = None
+        for name, value in scope["headers"]:
+            if name == b"x-device-id":
+                return value.decode("latin-1")
+            if name == b"authorization":
+                authorization = value
+        if authorization and authorization[:7].lower() == b"bearer ":
+            return hashlib.blake2b(authorization[7:], digest_size=12).hexdigest()
+        return None
 
 
 def setup_middleware(app):
@@ -109,7 +201,7 @@ def setup_middleware(app):
     )
     
     # Add compression middleware
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE)
     
     # Add security headers middleware
     app.add_middleware(SecurityHeadersMiddleware)
@@ -120,4 +212,10 @@ def setup_middleware(app):
     
     # Add rate limiting middleware (only in production)
     if settings.ENVIRONMENT == "production":
-        app.add_middleware(RateLimitMiddleware, calls=100, period=60)
+        app.add_middleware(
+            RateLimitMiddleware,
+            calls=settings.RATE_LIMIT_CALLS,
+            period=settings.RATE_LIMIT_PERIOD,
+            device_calls=settings.RATE_LIMIT_DEVICE_CALLS,
+            route_limits=ROUTE_RATE_LIMITS
+        )
@@ -0,0 +1,206 @@
+"""
+Device Quotas
+In-memory daily request counters per device with batched persistence to MongoDB
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.counters import BatchedCounters, shared_counters
+from app.models.quota import DeviceQuota
+
+logger = logging.getLogger(__name__)
+
+QuotaKey = Tuple[str, str]  # (device_id, day)
+
+# Live counters only need to outlast the UTC day they count
+COUNTER_TTL = 2 * 24 * 60 * 60
+
+
+class QuotaStatus:
+    """Result of a quota check for one device"""
+
+    __slots__ = ("allowed", "limit", "used", "reset_time")
+
+    def __init__(self, allowed: bool, limit: int, used: int, reset_time: datetime):
+        self.allowed = allowed
+        self.limit = limit
+        self.used = used
+        self.reset_time = reset_time
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds until the quota resets"""
+        return max(1, int((self.reset_time - datetime.utcnow()).total_seconds()))
+
+
+class DeviceQuotaManager:
+    """
+    Daily per-device quota enforcement
+    Live counters are keyed by (device_id, day) in the shared counters, so
+    every worker sees the same usage. The check and the increment run
+    without yielding to the event loop, so they are atomic within a worker.
+    Each worker's increments are also flushed to Mongo in batches so quotas
+    survive restarts without a write per request.
+    """
+
+    def __init__(
+        self,
+        counters: BatchedCounters,
+        limits: Dict[str, int],
+        default_limit: int,
+        flush_interval: float = 10.0
+    ):
+        self.counters = counters
+        self.limits = limits
+        self.default_limit = default_limit
+        self.flush_interval = flush_interval
+        # Keys whose counter has been seeded from Mongo by this worker
+        self._seeded: Set[QuotaKey] = set()
+        # Increments made by this worker that are not persisted yet
+        self._pending: Dict[QuotaKey, int] = {}
+        self._loading: Dict[QuotaKey, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def limit_for(self, device_type: Optional[str]) -> int:
+        """Daily limit for a device type"""
+        if device_type is None:
+            return self.default_limit
+        return self.limits.get(getattr(device_type, "value", device_type), self.default_limit)
+
+    async def check_and_increment(self, device_id: str, device_type: Optional[str] = None) -> QuotaStatus:
+        """Count one request for device, refusing it when the daily limit is used up"""
+        key = (device_id, self._today())
+        if key not in self._seeded:
+            await self._load(key)
+
+        limit = self.limit_for(device_type)
+        reset_time = self._reset_time()
+
+        # No awaits below: check and increment happen atomically
+        used = self.counters.value(self._counter_key(key))
+        if used >= limit:
+            return QuotaStatus(False, limit, used, reset_time)
+
+        used = self.counters.add(self._counter_key(key), 1, ttl=COUNTER_TTL)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        return QuotaStatus(True, limit, used, reset_time)
+
+    async def get_status(self, device_id: str, device_type: Optional[str] = None) -> QuotaStatus:
+        """Current usage for device without counting a request"""
+        key = (device_id, self._today())
+        if key not in self._seeded:
+            await self._load(key)
+
+        limit = self.limit_for(device_type)
+        used = self.counters.value(self._counter_key(key))
+        return QuotaStatus(used < limit, limit, used, self._reset_time())
+
+    async def flush(self) -> None:
+        """Persist pending increments in one unordered bulk write"""
+        self._prune()
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, {}
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"device_id": device_id, "day": day},
+                {"$inc": {"requests": delta}, "$set": {"updated_at": now}},
+                upsert=True
+            )
+            for (device_id, day), delta in pending.items()
+        ]
+
+        try:
+            await DeviceQuota.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            # Keep the increments for the next flush
+            logger.error(f"Failed to persist device quotas: {e}")
+            for key, delta in pending.items():
+                self._pending[key] = self._pending.get(key, 0) + delta
+
+    def start(self) -> None:
+        """Start the periodic flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flush task and persist what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _load(self, key: QuotaKey) -> None:
+        """Seed the shared counter from Mongo, coalescing concurrent loads of the same key"""
+        future = self._loading.get(key)
+        if future is not None:
+            await asyncio.shield(future)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            persisted = 0
+            try:
+                doc = await DeviceQuota.get_motor_collection().find_one(
+                    {"device_id": key[0], "day": key[1]},
+                    {"requests": 1}
+                )
+                if doc:
+                    persisted = doc.get("requests", 0)
+                # Only the first worker to see the key seeds it
+                await self.counters.seed(self._counter_key(key), persisted, COUNTER_TTL)
+            except Exception as e:
+                logger.error(f"Failed to load device quota: {e}")
+            self._seeded.add(key)
+        finally:
+            del self._loading[key]
+            future.set_result(None)
+
+    def _prune(self) -> None:
+        """Forget seeded keys from previous days"""
+        today = self._today()
+        self._seeded = {key for key in self._seeded if key[1] == today}
+
+    @staticmethod
+    def _counter_key(key: QuotaKey) -> str:
+        return f"quota:{key[0]}:{key[1]}"
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.utcnow().strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _reset_time() -> datetime:
+        now = datetime.utcnow()
+        return datetime(now.year, now.month, now.day) + timedelta(days=1)
+
+
+# Global quota manager instance
+quota_manager = DeviceQuotaManager(
+    shared_counters,
+    limits=settings.DEVICE_DAILY_QUOTAS,
+    default_limit=settings.DEFAULT_DAILY_QUOTA,
+    flush_interval=settings.QUOTA_FLUSH_INTERVAL
+)
+
+
+def get_quota_manager() -> DeviceQuotaManager:
+    """Get quota manager instance"""
+    return quota_manager
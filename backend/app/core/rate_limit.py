@@ -0,0 +1,120 @@
+"""
+Rate Limiting
+Sliding-window counters used by the rate limit middleware
+"""
+import math
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.core.counters import BatchedCounters
+
+
+class RateLimitPolicy:
+    """Number of calls allowed per period (seconds)"""
+
+    __slots__ = ("calls", "period")
+
+    def __init__(self, calls: int, period: int):
+        self.calls = calls
+        self.period = period
+
+    def __repr__(self) -> str:
+        return f"RateLimitPolicy(calls={self.calls}, period={self.period})"
+
+
+class RateLimitResult:
+    """Outcome of a single rate limit check"""
+
+    __slots__ = ("allowed", "limit", "remaining", "retry_after")
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, retry_after: int = 0):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+
+class SlidingWindowRateLimiter:
+    """
+    Sliding-window-counter rate limiter
+    Each key counts calls in fixed windows; the previous window's count is
+    weighted by how much of it still overlaps the sliding window. Every check
+    is O(1): two counter reads and at most one increment. Counters live in a
+    shared counter view, so limits hold across workers when the backend is
+    shared.
+    """
+
+    def __init__(self, counters: BatchedCounters):
+        self.counters = counters
+
+    def hit(self, key: str, policy: RateLimitPolicy, now: Optional[float] = None) -> RateLimitResult:
+        """Record a call for key and report whether it is allowed"""
+        if now is None:
+            now = time.time()
+
+        result = self.check(key, policy, now)
+        if result.allowed:
+            self.record(key, policy, now)
+        return result
+
+    def check(self, key: str, policy: RateLimitPolicy, now: Optional[float] = None) -> RateLimitResult:
+        """Report whether one more call for key is allowed, without recording it"""
+        if now is None:
+            now = time.time()
+
+        period = policy.period
+        window = int(now // period)
+        previous = self.counters.value(f"rl:{key}:{window - 1}")
+        current = self.counters.value(f"rl:{key}:{window}")
+
+        window_start = window * period
+        weight = 1.0 - (now - window_start) / period
+        estimated = previous * weight + current
+
+        if estimated + 1 > policy.calls:
+            retry_after = self._retry_after(previous, current, policy, window_start, now)
+            return RateLimitResult(False, policy.calls, 0, retry_after)
+
+        remaining = max(0, int(policy.calls - (estimated + 1)))
+        return RateLimitResult(True, policy.calls, remaining)
+
+    def record(self, key: str, policy: RateLimitPolicy, now: Optional[float] = None) -> None:
+        """Count a call for key (after check allowed it)"""
+        if now is None:
+            now = time.time()
+
+        # A window stops mattering once the window after it has ended
+        window = int(now // policy.period)
+        self.counters.add(f"rl:{key}:{window}", 1, ttl=2 * policy.period)
+
+    @staticmethod
+    def _retry_after(
+        previous: int,
+        current: int,
+        policy: RateLimitPolicy,
+        window_start: float,
+        now: float
+    ) -> int:
+        """Seconds until one more call would be allowed"""
+        window_end = window_start + policy.period
+
+        if current + 1 > policy.calls or previous == 0:
+            # Blocked by the current window alone: wait for it to roll over,
+            # at which point it becomes the (decaying) previous window
+            wait_until = window_end + policy.period * (1 - (policy.calls - 1) / max(current, 1))
+            wait_until = max(wait_until, window_end)
+        else:
+            # Wait until the previous window has decayed enough
+            fraction = 1 - (policy.calls - current - 1) / previous
+            wait_until = window_start + fraction * policy.period
+
+        return max(1, int(math.ceil(wait_until - now)))
+
+
+def parse_policies(raw: Dict[str, Tuple[int, int]]) -> List[Tuple[str, RateLimitPolicy]]:
+    """Turn {path_prefix: (calls, period)} into prefix-sorted policies (longest first)"""
+    return sorted(
+        ((prefix, RateLimitPolicy(calls, period)) for prefix, (calls, period) in raw.items()),
+        key=lambda item: len(item[0]),
+        reverse=True
+    )
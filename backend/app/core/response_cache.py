@@ -0,0 +1,247 @@
+"""
+Response Cache
+Pre-serialized responses for public catalog endpoints, invalidated on admin writes
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+from app.core.compression import CACHED_LEVELS, compress, encoded_etag, negotiate_encoding
+from app.core.counters import BatchedCounters, shared_counters
+from app.core.http_cache import cache_headers, etag_matches
+from app.core.serialization import to_json
+
+logger = logging.getLogger(__name__)
+
+# Invalidation generations outlive any cached entry by a wide margin
+GENERATION_TTL = 30 * 24 * 3600
+
+InvalidationListener = Callable[[str], Any]
+
+
+class CachedResponse:
+    """Serialized response body with its validator and compressed variants"""
+
+    __slots__ = ("body", "etag", "expires_at", "variants")
+
+    def __init__(self, body: bytes, etag: str, expires_at: float):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.variants: Dict[str, bytes] = {}
+
+    def variant(self, encoding: str) -> bytes:
+        """Body compressed with encoding, compressed on first use only"""
+        body = self.variants.get(encoding)
+        if body is None:
+            body = compress(self.body, encoding, CACHED_LEVELS[encoding])
+            self.variants[encoding] = body
+        return body
+
+
+def cache_key(request: Request) -> str:
+    """
+    Cache key for a request: its route path
+    The cached endpoints take no parameters; keying on the query string
+    would let ?x=<random> grow the cache without bound.
+    """
+    return request.url.path
+
+
+class ResponseCache:
+    """
+    Per-worker cache of serialized responses grouped by namespace
+    Admin writes invalidate a whole namespace locally and bump its generation
+    in the shared counter backend; other workers poll the generations and
+    drop their copies, so with a shared backend invalidation reaches every
+    worker within one sync interval (otherwise entries expire after the TTL).
+    """
+
+    def __init__(
+        self,
+        ttl: int,
+        counters: Optional[BatchedCounters] = None,
+        sync_interval: float = 1.0,
+        compression_minimum_size: int = 1000
+    ):
+        self.ttl = ttl
+        self.counters = counters
+        self.sync_interval = sync_interval
+        self.compression_minimum_size = compression_minimum_size
+        self._entries: Dict[str, Dict[str, CachedResponse]] = {}
+        # Bumped on every local drop so in-flight builds do not store stale data
+        self._epochs: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+        self._building: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._listeners: List[InvalidationListener] = []
+        # Namespaces with no entries here whose invalidations still matter
+        self._watched: set = set()
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def get(self, namespace: str, key: str) -> Optional[CachedResponse]:
+        """Cached response for key, if present and fresh"""
+        entry = self._entries.get(namespace, {}).get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        return entry
+
+    def set(self, namespace: str, key: str, content: Any, etag: str) -> CachedResponse:
+        """Serialize content and store it under key"""
+        entry = CachedResponse(to_json(content), etag, time.monotonic() + self.ttl)
+        self._entries.setdefault(namespace, {})[key] = entry
+        return entry
+
+    async def get_or_build(
+        self,
+        namespace: str,
+        key: str,
+        build: Callable[[], Awaitable[Tuple[Any, str]]]
+    ) -> CachedResponse:
+        """Return the cached response, building it once for concurrent misses"""
+        entry = self.get(namespace, key)
+        if entry is not None:
+            return entry
+
+        building = self._building.get((namespace, key))
+        if building is not None:
+            return await asyncio.shield(building)
+
+        future = asyncio.get_running_loop().create_future()
+        self._building[(namespace, key)] = future
+        epoch = self._epochs.get(namespace, 0)
+        try:
+            content, etag = await build()
+            if self._epochs.get(namespace, 0) == epoch:
+                entry = self.set(namespace, key, content, etag)
+            else:
+                # Invalidated while building: serve it once, do not keep it
+                entry = CachedResponse(to_json(content), etag, 0.0)
+            future.set_result(entry)
+            return entry
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures are not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._building.pop((namespace, key), None)
+
+    def respond(self, request: Request, entry: CachedResponse, policy: str) -> Response:
+        """Full or 304 response for a cached entry, precompressed when negotiated"""
+        encoding = None
+        if len(entry.body) >= self.compression_minimum_size:
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+
+        etag = entry.etag if encoding is None else encoded_etag(entry.etag, encoding)
+        headers = cache_headers(etag, policy)
+        headers["Vary"] = "Accept-Encoding"
+        if etag_matches(request, etag) or etag_matches(request, entry.etag):
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return Response(content=entry.body, media_type="application/json", headers=headers)
+
+        headers["Content-Encoding"] = encoding
+        return Response(content=entry.variant(encoding), media_type="application/json", headers=headers)
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Drop namespaces here and tell the other workers to do the same"""
+        for namespace in namespaces:
+            self._drop(namespace)
+            if self.counters is not None:
+                key = self._generation_key(namespace)
+                added = self.counters.add(key, 1, ttl=GENERATION_TTL)
+                # The counters' view lags what sync() read from the backend;
+                # generations must never go backwards
+                self._generations[namespace] = max(self._generations.get(namespace, 0) + 1, added)
+
+    def add_listener(self, listener: InvalidationListener) -> None:
+        """Call listener(namespace) whenever a namespace is invalidated"""
+        self._listeners.append(listener)
+
+    def watch(self, *namespaces: str) -> None:
+        """Follow invalidations of namespaces even when nothing is cached for them"""
+        self._watched.update(namespaces)
+
+    def generation(self, namespace: str) -> int:
+        """Invalidation count of namespace as last seen by this worker"""
+        return self._generations.get(namespace, 0)
+
+    def clear(self) -> None:
+        """Drop every cached entry in this worker"""
+        for namespace in list(self._entries):
+            self._drop(namespace)
+
+    async def sync(self) -> None:
+        """Drop namespaces another worker invalidated since the last sync"""
+        namespaces = sorted(set(self._generations) | set(self._entries) | self._watched)
+        if self.counters is None or not namespaces:
+            return
+
+        keys = [self._generation_key(namespace) for namespace in namespaces]
+        try:
+            values = await self.counters.backend.get_many(keys)
+        except Exception as e:
+            logger.error(f"Failed to sync response cache: {e}")
+            return
+
+        for namespace, value in zip(namespaces, values):
+            known = self._generations.get(namespace)
+            self._generations[namespace] = max(value, known or 0)
+            if known is None:
+                # Entries cached before the generation was known may predate
+                # an invalidation elsewhere, so they are not trusted
+                if namespace in self._entries:
+                    self._drop(namespace)
+            elif value > known:
+                self._drop(namespace)
+
+    def start(self) -> None:
+        """Start polling invalidations from other workers"""
+        if self._sync_task is None and self.counters is not None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def stop(self) -> None:
+        """Stop polling invalidations"""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+
+    def _drop(self, namespace: str) -> None:
+        self._entries.pop(namespace, None)
+        self._epochs[namespace] = self._epochs.get(namespace, 0) + 1
+        for listener in self._listeners:
+            try:
+                listener(namespace)
+            except Exception as e:
+                logger.error(f"Response cache listener failed for '{namespace}': {e}")
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await self.sync()
+            await asyncio.sleep(self.sync_interval)
+
+    @staticmethod
+    def _generation_key(namespace: str) -> str:
+        return f"cache:gen:{namespace}"
+
+
+# Global response cache instance
+response_cache = ResponseCache(
+    ttl=settings.CACHE_TTL,
+    counters=shared_counters,
+    sync_interval=settings.CACHE_SYNC_INTERVAL,
+    compression_minimum_size=settings.COMPRESSION_MINIMUM_SIZE
+)
+
+
+def get_response_cache() -> ResponseCache:
+    """Get response cache instance"""
+    return response_cache
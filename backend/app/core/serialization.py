@@ -0,0 +1,72 @@
+"""
+Serialization
+Single-pass conversion of documents and raw BSON to JSON bytes
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import orjson
+from bson import ObjectId
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """Cached TypeAdapter for a response type (building one compiles a validator)"""
+    return TypeAdapter(tp)
+
+
+def _field_values(value: Any) -> Any:
+    # Beanie documents proxy attribute access (lazy parsing), which makes
+    # from_attributes validation several times slower than reading __dict__
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    if isinstance(value, list):
+        return [item.__dict__ if isinstance(item, BaseModel) else item for item in value]
+    return value
+
+
+def validate_as(tp: Any, value: Any) -> Any:
+    """Validate a document, a list of documents or a raw dict straight into tp"""
+    return get_type_adapter(tp).validate_python(_field_values(value), from_attributes=True)
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def to_json(value: Any, tp: Any = None) -> bytes:
+    """
+    Serialize value to JSON bytes
+    With tp, value is dumped through tp's cached TypeAdapter (models and
+    lists of models); without it, plain dicts and lists go through orjson.
+    """
+    if tp is not None:
+        return get_type_adapter(tp).dump_json(value)
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+    return orjson.dumps(value, default=_orjson_default)
+
+
+def json_response(
+    value: Any,
+    tp: Any = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Already-serialized JSON response
+    Returning a Response skips FastAPI's response_model re-validation, so the
+    route's response_model only documents the shape.
+    """
+    return Response(
+        content=to_json(value, tp),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Optional, List, Dict, Any
+from datetime import datetime
+from typing import Generic, TypeVar, Optional, List, Dict, Any, Iterable, Tuple
 from beanie import Document, PydanticObjectId
 
 T = TypeVar("T", bound=Document)
@@ -94,6 +95,10 @@ class MongoRepository(BaseRepository[T]):
             if hasattr(obj, field):
                 setattr(obj, field, value)
         
+        # Keep updated_at meaningful for ETags and change tracking
+        if hasattr(obj, "updated_at") and "updated_at" not in obj_in:
+            obj.updated_at = datetime.utcnow()
+        
         await obj.save()
         return obj
     
@@ -124,6 +129,78 @@ class MongoRepository(BaseRepository[T]):
         if limit:
             query = query.limit(limit)
         return await query.to_list()
+    
+    async def find_raw(
+        self,
+        filters: Dict[str, Any],
+        fields: Optional[Iterable[str]] = None,
+        skip: int = 0,
+        limit: Optional[int] = None,
+        sort: Optional[List[Tuple[str, int]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Read-only query returning projected dicts straight from motor
+        No documents are built, so results cannot be saved; "_id" is returned
+        as "id". Use the document methods for anything that writes. limit
+        None reads every match; a limit below 1 is rejected, since Mongo
+        would read 0 as no limit at all.
+        """
+        if limit is not None and limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        
+        projection = None
+        if fields is not None:
+            # "_id" is always returned; it alone keeps an id-only projection from meaning "all"
+            projection = {field: 1 for field in fields if field != "id"} or {"_id": 1}
+        
+        cursor = self.model.get_motor_collection().find(
+            filters,
+            projection=projection,
+            skip=skip,
+            limit=limit or 0,  # None: no limit
+            sort=sort
+        )
+        docs = await cursor.to_list(length=None)
+        for doc in docs:
+            doc["id"] = doc.pop("_id")
+        return docs
+    
+    async def insert_raw(self, doc: Dict[str, Any]) -> Any:
+        """
+        Insert a plain dict in one round trip, without building a document
+        Raises pymongo's DuplicateKeyError when a unique index rejects it.
+        """
+        result = await self.model.get_motor_collection().insert_one(doc)
+        return result.inserted_id
+    
+    async def delete_where(self, filters: Dict[str, Any]) -> bool:
+        """Delete the first document matching filters; True if one was deleted"""
+        result = await self.model.get_motor_collection().delete_one(filters)
+        return result.deleted_count > 0
+    
+    async def increment(self, filters: Dict[str, Any], amounts: Dict[str, int]) -> bool:
+        """Atomically $inc fields of the first matching document; True if one matched"""
+        result = await self.model.get_motor_collection().update_one(filters, {"$inc": amounts})
+        return result.matched_count > 0
+    
+    async def bulk_write(self, operations: List[Any]) -> Any:
+        """Apply pymongo write operations in one unordered batch"""
+        return await self.model.get_motor_collection().bulk_write(operations, ordered=False)
+    
+    async def aggregate_raw(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run an aggregation pipeline and return the raw result documents"""
+        return await self.model.get_motor_collection().aggregate(pipeline).to_list(length=None)
+    
+    async def get_version(self, filters: Optional[Dict[str, Any]] = None) -> Tuple[int, Optional[datetime]]:
+        """Cheap version of a result set: (document count, latest updated_at)"""
+        pipeline = [
+            {"$match": filters or {}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "updated_at": {"$max": "$updated_at"}}}
+        ]
+        result = await self.model.get_motor_collection().aggregate(pipeline).to_list(1)
+        if not result:
+            return 0, None
+        return result[0]["count"], result[0]["updated_at"]
 
 
 class CacheableRepository(MongoRepository[T]):
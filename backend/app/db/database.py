@@ -339,17 +339,39 @@ class DatabaseManager:
             from app.models.admin import Admin
             from app.models.settings import AppSettings
             from app.models.social_link import SocialLink
+            from app.models.quota import DeviceQuota
+            from app.models.tombstone import Tombstone
+            from app.models.image_asset import ImageAsset
+            
+            # Duplicate favorites would make Beanie's unique index build abort startup
+            removed_favorites = await self._prepare_favorites()
             
             await init_beanie(
                 database=self.database,
-                document_models=[Prompt, Category, Favorite, DeviceUser, Admin, AppSettings, SocialLink]
+                document_models=[Prompt, Category, Favorite, DeviceUser, Admin, AppSettings, SocialLink, DeviceQuota, Tombstone, ImageAsset]
             )
             print(f"✅ Beanie ODM initialized with database: {self.database_name}")
-            print(f"🔧 Initialized models: Prompt, Category, Favorite, DeviceUser, Admin, AppSettings, SocialLink")
+            print(f"🔧 Initialized models: Prompt, Category, Favorite, DeviceUser, Admin, AppSettings, SocialLink, DeviceQuota, Tombstone, ImageAsset")
+            
+            if removed_favorites:
+                from app.services.prompt_service import PromptService
+                await PromptService().repair_likes_counts()
+                print(f"❤️  Removed {removed_favorites} duplicate favorites and recounted prompt likes")
         except Exception as e:
             print(f"❌ Failed to initialize Beanie: {e}")
             raise
     
+    async def _prepare_favorites(self) -> int:
+        """Deduplicate favorites and build their unique index; returns duplicates removed"""
+        from app.db.migrations import ensure_unique_favorites
+        
+        try:
+            return await ensure_unique_favorites(self.database)
+        except Exception as e:
+            print(f"⚠️  Could not prepare the unique favorites index: {e}")
+            print("🔧 Run scripts/migrate_favorites_unique_index.py, then restart")
+            return 0
+    
     def get_database(self) -> AsyncIOMotorDatabase:
         """Get database instance"""
         if not self.database:
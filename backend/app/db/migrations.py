@@ -0,0 +1,55 @@
+"""
+Database Migrations
+Idempotent data fixes that must run before Beanie builds its indexes
+"""
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+# Non-unique compound index the unique one replaces (same keys, so both cannot exist)
+OLD_FAVORITES_INDEX = "device_id_1_prompt_id_1"
+FAVORITES_UNIQUE_INDEX = "device_prompt_unique"
+
+
+async def ensure_unique_favorites(database: AsyncIOMotorDatabase) -> int:
+    """
+    Make favorites unique per (device_id, prompt_id); returns duplicates removed
+    Duplicates (from racing double taps before the unique index) are removed,
+    keeping the oldest, then the old index is swapped for the unique one.
+    Once the unique index exists this is a single index listing.
+    """
+    favorites = database["favorites"]
+    indexes = await favorites.index_information()
+    if FAVORITES_UNIQUE_INDEX in indexes:
+        return 0
+
+    duplicates = favorites.aggregate([
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {
+            "_id": {"device_id": "$device_id", "prompt_id": "$prompt_id"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+    extra_ids = []
+    async for group in duplicates:
+        extra_ids.extend(group["ids"][1:])
+
+    removed = 0
+    if extra_ids:
+        result = await favorites.delete_many({"_id": {"$in": extra_ids}})
+        removed = result.deleted_count
+
+    if OLD_FAVORITES_INDEX in indexes:
+        try:
+            await favorites.drop_index(OLD_FAVORITES_INDEX)
+        except OperationFailure:
+            # Another worker starting at the same time dropped it first
+            pass
+    await favorites.create_index(
+        [("device_id", ASCENDING), ("prompt_id", ASCENDING)],
+        unique=True,
+        name=FAVORITES_UNIQUE_INDEX
+    )
+    return removed
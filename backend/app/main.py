@@ -1,7 +1,7 @@
 import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
@@ -12,8 +12,17 @@ from app.core.exceptions import (
     http_exception_handler, validation_exception_handler,
     general_exception_handler
 )
+from app.core.counters import shared_counters
+from app.core.quota import quota_manager
+from app.core.response_cache import response_cache
+from app.core.catalog_bundle import catalog_bundle
+from app.core.catalog_events import catalog_events
+from app.core.image_processing import image_processor
+from app.core.image_variants import image_variants
+from app.core.image_resize_cache import image_resize_cache
 from app.db.database import connect_to_mongo, close_mongo_connection
 from app.schemas.common import HealthResponse
+from app.utils.static_files import UploadStaticFiles
 
 # Import all individual routers directly
 from app.api.mobile.auth import router as mobile_auth_router
@@ -22,6 +31,10 @@ from app.api.mobile.favorites import router as mobile_favorites_router
 from app.api.mobile.settings import router as mobile_settings_router
 from app.api.mobile.social_links import router as mobile_social_links_router
 from app.api.mobile.categories import router as mobile_categories_router
+from app.api.mobile.bootstrap import router as mobile_bootstrap_router
+from app.api.mobile.sync import router as mobile_sync_router
+from app.api.mobile.catalog import router as mobile_catalog_router
+from app.api.uploads import router as uploads_router
 from app.api.admin.auth import router as admin_auth_router
 from app.api.admin.dashboard import router as admin_dashboard_router
 from app.api.admin.prompts import router as admin_prompts_router
@@ -44,12 +57,27 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting RoyalPrompts API...")
     await connect_to_mongo()
+    shared_counters.start()
+    quota_manager.start()
+    response_cache.start()
+    catalog_bundle.start()
+    catalog_events.start()
+    image_processor.start()
+    image_resize_cache.start()
     logger.info("✅ Application started successfully!")
     
     yield
     
     # Shutdown
     logger.info("🔄 Shutting down RoyalPrompts API...")
+    await image_resize_cache.stop()
+    await image_variants.stop()
+    await image_processor.stop()
+    await catalog_events.stop()
+    await catalog_bundle.stop()
+    await response_cache.stop()
+    await quota_manager.stop()
+    await shared_counters.stop()
     await close_mongo_connection()
     logger.info("✅ Application shut down successfully!")
 
@@ -61,6 +89,7 @@ app = FastAPI(
     description="Scalable backend API for RoyalPrompts mobile app and admin dashboard",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -73,8 +102,11 @@ app.add_exception_handler(StarletteHTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(Exception, general_exception_handler)
 
+# Uploaded images (resized on request); must come before the static mount that would shadow it
+app.include_router(uploads_router, prefix="/uploads", tags=["Uploads"])
+
 # Mount static files
-app.mount("/uploads", StaticFiles(directory=settings.upload_dir_path), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory=settings.upload_dir_path), name="uploads")
 
 # Include all routers directly in main.py for better clarity
 # Mobile App Routes
@@ -84,6 +116,9 @@ app.include_router(mobile_favorites_router, prefix="/api/mobile/favorites", tags
 app.include_router(mobile_settings_router, prefix="/api/mobile/settings", tags=["Mobile Settings"])
 app.include_router(mobile_social_links_router, prefix="/api/mobile/social-links", tags=["Mobile Social Links"])
 app.include_router(mobile_categories_router, prefix="/api/mobile/categories", tags=["Mobile Categories"])
+app.include_router(mobile_bootstrap_router, prefix="/api/mobile/bootstrap", tags=["Mobile Bootstrap"])
+app.include_router(mobile_sync_router, prefix="/api/mobile/sync", tags=["Mobile Sync"])
+app.include_router(mobile_catalog_router, prefix="/api/mobile/catalog", tags=["Mobile Catalog"])
 
 # Admin Panel Routes (includes image upload for prompts)
 app.include_router(admin_auth_router, prefix="/api/admin/auth", tags=["Admin Auth"])
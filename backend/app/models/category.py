@@ -24,7 +24,8 @@ class Category(Document):
         indexes = [
             "name",
             "is_active",
-            "order"
+            "order",
+            "updated_at"  # delta sync
         ]
     
     def increment_prompts_count(self) -> None:
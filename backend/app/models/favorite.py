@@ -1,5 +1,6 @@
 from beanie import Document, Indexed
 from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from datetime import datetime
 
 
@@ -17,6 +18,9 @@ class Favorite(Document):
         indexes = [
             "device_id",
             "prompt_id",
-            [("device_id", 1), ("prompt_id", 1)],  # Compound index
+            # One favorite per device and prompt (toggles rely on it)
+            IndexModel([("device_id", ASCENDING), ("prompt_id", ASCENDING)], unique=True, name="device_prompt_unique"),
+            # Newest-first favorites pages
+            IndexModel([("device_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
             "created_at"
         ]
@@ -0,0 +1,46 @@
+"""
+Image Asset Model
+Uploaded images stored under the SHA-256 of their content, with reference counts
+"""
+from datetime import datetime
+from typing import List, Optional
+from beanie import Document
+from pydantic import BaseModel, Field
+from pymongo import ASCENDING, IndexModel
+
+
+class ImageVariant(BaseModel):
+    """A resized copy of an image in a web format, for srcset-style selection"""
+    url: str
+    width: int
+    height: int
+    format: str  # "webp" or "avif"
+    size: Optional[int] = None  # bytes, once written
+
+
+class ImageAsset(Document):
+    """A stored image; identical uploads share one asset"""
+
+    sha256: str
+    filename: str  # {sha256}{ext} under UPLOAD_DIR/images
+    thumbnail_filename: Optional[str] = None
+    content_type: str
+    size: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    variants: List[ImageVariant] = []
+
+    # Prompts whose image_url points at this asset
+    ref_count: int = 0
+
+    # Metadata
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "image_assets"
+        indexes = [
+            IndexModel([("sha256", ASCENDING)], unique=True, name="sha256_unique"),
+            # Unreferenced assets for cleanup
+            IndexModel([("ref_count", ASCENDING), ("updated_at", ASCENDING)])
+        ]
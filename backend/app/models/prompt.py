@@ -1,9 +1,12 @@
 from beanie import Document, Indexed
 from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
+from app.models.image_asset import ImageVariant
+
 
 class PromptStatus(str, Enum):
     """Simplified prompt status"""
@@ -27,8 +30,9 @@ class Prompt(Document):
     
     # Media
     image_url: Optional[str] = None
+    image_variants: List[ImageVariant] = []  # resized web copies of image_url
     
-    # Simple metrics for mobile app
+    # Simple metrics for mobile app (likes_count is the number of favorites)
     likes_count: int = 0
     
     # Metadata
@@ -44,7 +48,18 @@ class Prompt(Document):
             "status",
             "is_featured",
             "is_active",
-            "created_at"
+            "created_at",
+            "updated_at",  # delta sync
+            # Most favorited feeds, globally and per category
+            IndexModel(
+                [("status", ASCENDING), ("is_active", ASCENDING), ("likes_count", DESCENDING), ("_id", DESCENDING)],
+                name="most_favorited"
+            ),
+            IndexModel(
+                [("category_id", ASCENDING), ("status", ASCENDING), ("is_active", ASCENDING),
+                 ("likes_count", DESCENDING), ("_id", DESCENDING)],
+                name="most_favorited_by_category"
+            )
         ]
     
     def increment_likes(self) -> None:
@@ -0,0 +1,27 @@
+"""
+Device Quota Model
+Persisted daily request counters for device quotas
+"""
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class DeviceQuota(Document):
+    """Daily request counter for a single device"""
+
+    device_id: str
+    day: str  # UTC date, YYYY-MM-DD
+    requests: int = 0
+
+    # Metadata
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "device_quotas"
+        indexes = [
+            IndexModel([("device_id", ASCENDING), ("day", ASCENDING)], unique=True),
+            # Old counters are useless after the day rolls over
+            IndexModel([("updated_at", ASCENDING)], expireAfterSeconds=3 * 24 * 60 * 60)
+        ]
@@ -5,7 +5,7 @@ Handles application configuration and settings
 from datetime import datetime
 from typing import Optional
 from beanie import Document
-from pydantic import EmailStr
+from pydantic import EmailStr, Field
 
 
 class AppSettings(Document):
@@ -18,8 +18,8 @@ class AppSettings(Document):
     contact_email: EmailStr = "support@royalprompts.com"
     
     # Metadata
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "app_settings"
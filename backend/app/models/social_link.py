@@ -5,7 +5,7 @@ Handles social media links and channels
 from datetime import datetime
 from typing import Optional
 from beanie import Document, Indexed
-from pydantic import HttpUrl
+from pydantic import HttpUrl, Field
 
 
 class SocialLink(Document):
@@ -17,8 +17,8 @@ class SocialLink(Document):
     display_order: int = 0  # For ordering in UI
     
     # Metadata
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
     
     class Settings:
         name = "social_links"
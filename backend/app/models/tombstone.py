@@ -0,0 +1,25 @@
+"""
+Tombstone Model
+Records of deleted catalog items, so delta sync can report deletions
+"""
+from datetime import datetime
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+# Sync tokens older than this cannot be answered with a delta
+TOMBSTONE_RETENTION_DAYS = 30
+
+
+class Tombstone(Document):
+    """A deleted prompt or category"""
+
+    kind: str  # "prompt" or "category"
+    item_id: str
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "tombstones"
+        indexes = [
+            IndexModel([("deleted_at", ASCENDING)], expireAfterSeconds=TOMBSTONE_RETENTION_DAYS * 24 * 60 * 60)
+        ]
@@ -16,7 +16,8 @@ from .category import (
 )
 from .favorite import (
     FavoriteCreate, FavoriteResponse, FavoriteWithPrompt,
-    FavoriteStatus, UserFavorites
+    FavoriteStatus, UserFavorites, FavoriteAction, FavoriteOperation,
+    FavoritesSyncRequest, FavoritesSyncResponse
 )
 from .common import (
     PaginationParams, PaginatedResponse, SuccessResponse, ErrorResponse,
@@ -43,7 +44,8 @@ __all__ = [
     
     # Favorite schemas
     "FavoriteCreate", "FavoriteResponse", "FavoriteWithPrompt",
-    "FavoriteStatus", "UserFavorites",
+    "FavoriteStatus", "UserFavorites", "FavoriteAction", "FavoriteOperation",
+    "FavoritesSyncRequest", "FavoritesSyncResponse",
     
     # Common schemas
     "PaginationParams", "PaginatedResponse", "SuccessResponse", "ErrorResponse",
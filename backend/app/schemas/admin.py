@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 from app.models.admin import AdminRole
+from app.schemas.common import ObjectIdStr
 
 
 # Request schemas
@@ -49,7 +50,7 @@ class PasswordChange(BaseModel):
 # Response schemas
 class AdminResponse(BaseModel):
     """Admin response schema"""
-    id: str
+    id: ObjectIdStr
     email: EmailStr
     username: str
     full_name: Optional[str] = None
@@ -0,0 +1,23 @@
+"""
+Bootstrap Schemas
+Pydantic schemas for the mobile app launch payload
+"""
+from typing import List
+from pydantic import BaseModel
+
+from app.schemas.category import CategoryResponse
+from app.schemas.common import PaginatedResponse
+from app.schemas.prompt import PromptSummary
+from app.schemas.settings import AppSettingsPublic
+from app.schemas.social_link import SocialLinksPublicListResponse
+
+
+class BootstrapResponse(BaseModel):
+    """Everything the app needs on launch, in one payload"""
+    version: str
+    categories: List[CategoryResponse]
+    settings: AppSettingsPublic
+    social_links: SocialLinksPublicListResponse
+    prompts: PaginatedResponse[PromptSummary]
+    # Per device
+    favorite_ids: List[str]
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from app.schemas.common import ObjectIdStr
 
 
 # Base schemas  
@@ -29,7 +30,7 @@ class CategoryUpdate(BaseModel):
 # Response schemas
 class CategoryResponse(CategoryBase):
     """Category response schema"""
-    id: str
+    id: ObjectIdStr
     order: int
     is_active: bool
     prompts_count: int
@@ -42,7 +43,7 @@ class CategoryResponse(CategoryBase):
 
 class CategorySummary(BaseModel):
     """Category summary schema for lists"""
-    id: str
+    id: ObjectIdStr
     name: str
     icon: Optional[str] = None
     prompts_count: int
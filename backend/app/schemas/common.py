@@ -1,10 +1,21 @@
-from pydantic import BaseModel
-from typing import List, Optional, Any, Generic, TypeVar
+from pydantic import BaseModel, BeforeValidator
+from typing import Annotated, List, Optional, Any, Generic, TypeVar
 from datetime import datetime
+from bson import ObjectId
+
+from app.models.image_asset import ImageVariant
 
 T = TypeVar("T")
 
 
+def _object_id_to_str(value: Any) -> Any:
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+# Document ids: accepts an ObjectId (e.g. a Beanie document's id) or a string
+ObjectIdStr = Annotated[str, BeforeValidator(_object_id_to_str)]
+
+
 # Pagination schemas
 class PaginationParams(BaseModel):
     """Pagination parameters"""
@@ -76,6 +87,7 @@ class FileUploadResponse(BaseModel):
     url: str
     size: int
     content_type: str
+    sha256: Optional[str] = None
 
 
 class ImageUploadResponse(FileUploadResponse):
@@ -83,6 +95,8 @@ class ImageUploadResponse(FileUploadResponse):
     thumbnail_url: Optional[str] = None
     width: Optional[int] = None
     height: Optional[int] = None
+    # Resized web copies; generated in the background, so briefly missing after a new upload
+    variants: List[ImageVariant] = []
 
 
 # Search schemas
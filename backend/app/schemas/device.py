@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from app.models.device import DeviceType, UserType
@@ -66,8 +66,8 @@ class RateLimitInfo(BaseModel):
     """Rate limit information schema"""
     daily_limit: int
     daily_used: int
-    monthly_limit: int
-    monthly_used: int
+    monthly_limit: int = Field(default=1000, deprecated="No monthly quota is enforced; use daily_limit")
+    monthly_used: int = Field(default=0, deprecated="No monthly quota is enforced; use daily_used")
     is_premium: bool
     can_upgrade: bool
     reset_time: Optional[datetime] = None
@@ -6,11 +6,12 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 from app.models.device import DeviceType, UserType
+from app.schemas.common import ObjectIdStr
 
 
 class DeviceUserAdmin(BaseModel):
     """Admin schema for device user management"""
-    id: str
+    id: ObjectIdStr
     device_id: str
     device_type: DeviceType
     device_model: Optional[str] = None
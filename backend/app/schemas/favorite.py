@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 from datetime import datetime
+from enum import Enum
+from app.schemas.common import ObjectIdStr
 from app.schemas.prompt import PromptSummary
 
 
@@ -10,10 +12,28 @@ class FavoriteCreate(BaseModel):
     prompt_id: str
 
 
+class FavoriteAction(str, Enum):
+    """Offline favorite change"""
+    ADD = "add"
+    REMOVE = "remove"
+
+
+class FavoriteOperation(BaseModel):
+    """One favorite change made on the device, with when it was made"""
+    prompt_id: str
+    action: FavoriteAction
+    timestamp: datetime
+
+
+class FavoritesSyncRequest(BaseModel):
+    """Batch of offline favorite changes"""
+    operations: List[FavoriteOperation] = Field(..., max_length=500)
+
+
 # Response schemas
 class FavoriteResponse(BaseModel):
     """Favorite response schema"""
-    id: str
+    id: ObjectIdStr
     user_id: str
     prompt_id: str
     created_at: datetime
@@ -24,7 +44,7 @@ class FavoriteResponse(BaseModel):
 
 class FavoriteWithPrompt(BaseModel):
     """Favorite with prompt details"""
-    id: str
+    id: ObjectIdStr
     prompt: PromptSummary
     created_at: datetime
     
@@ -43,3 +63,9 @@ class UserFavorites(BaseModel):
     user_id: str
     favorites: List[FavoriteWithPrompt]
     total_count: int
+
+
+class FavoritesSyncResponse(BaseModel):
+    """Device favorites after applying a sync batch"""
+    favorite_ids: List[str]
+    applied: int
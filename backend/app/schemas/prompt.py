@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
+from app.models.image_asset import ImageVariant
 from app.models.prompt import PromptStatus
+from app.schemas.common import ObjectIdStr
 
 
 # Base schemas
@@ -48,8 +50,9 @@ class PromptSort(BaseModel):
 # Response schemas
 class PromptResponse(PromptBase):
     """Prompt response schema"""
-    id: str
+    id: ObjectIdStr
     image_url: Optional[str] = None
+    image_variants: List[ImageVariant] = []
     status: PromptStatus
     is_featured: bool
     is_active: bool
@@ -62,15 +65,18 @@ class PromptResponse(PromptBase):
 
 class PromptSummary(BaseModel):
     """Prompt summary schema for lists"""
-    id: str
+    id: ObjectIdStr
     title: str
     description: str
 
     image_url: Optional[str] = None
+    image_variants: List[ImageVariant] = []
     category_id: str
     is_featured: bool
     likes_count: int
     created_at: datetime
+    # Per device: set on device-specific lists, None in shared (cached) payloads
+    is_favorited: Optional[bool] = None
     
     model_config = {"from_attributes": True}
 
@@ -82,6 +88,21 @@ class PromptDetail(PromptResponse):
     related_prompts: List[PromptSummary] = []
 
 
+class PromptBatchItem(BaseModel):
+    """Prompt in a batch fetch, with the ETag its own endpoint would send"""
+    etag: str
+    prompt: Union[PromptDetail, PromptSummary]
+
+
+class PromptBatchResponse(BaseModel):
+    """Prompts fetched by id"""
+    items: List[PromptBatchItem]
+    # Requested with an ETag from If-None-Match that still matches
+    not_modified_ids: List[str] = []
+    # Unknown ids (or prompts that were deleted)
+    missing_ids: List[str] = []
+
+
 class PromptStats(BaseModel):
     """Prompt statistics schema"""
     total_prompts: int
@@ -6,6 +6,8 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 
+from app.schemas.common import ObjectIdStr
+
 
 class AppSettingsBase(BaseModel):
     """Base app settings schema"""
@@ -32,7 +34,7 @@ class AppSettingsUpdate(BaseModel):
 
 class AppSettingsResponse(AppSettingsBase):
     """App settings response schema"""
-    id: str
+    id: ObjectIdStr
     created_at: datetime
     updated_at: datetime
     
@@ -6,6 +6,8 @@ from typing import List, Optional
 from pydantic import BaseModel, HttpUrl, Field
 from datetime import datetime
 
+from app.schemas.common import ObjectIdStr
+
 
 class SocialLinkBase(BaseModel):
     """Base social link schema"""
@@ -30,7 +32,7 @@ class SocialLinkUpdate(BaseModel):
 
 class SocialLinkResponse(SocialLinkBase):
     """Schema for social link responses"""
-    id: str
+    id: ObjectIdStr
     created_at: datetime
     updated_at: datetime
     
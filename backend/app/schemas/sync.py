@@ -0,0 +1,22 @@
+"""
+Sync Schemas
+Pydantic schemas for mobile catalog delta sync
+"""
+from typing import List
+from pydantic import BaseModel
+
+from app.schemas.category import CategoryResponse
+from app.schemas.prompt import PromptSummary
+
+
+class SyncResponse(BaseModel):
+    """Catalog changes since a sync token"""
+    token: str
+    # True when the client must replace its local catalog with this payload
+    reset: bool
+    # True when more changes are waiting: sync again with the new token
+    has_more: bool
+    prompts: List[PromptSummary]
+    removed_prompt_ids: List[str]
+    categories: List[CategoryResponse]
+    removed_category_ids: List[str]
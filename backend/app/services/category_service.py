@@ -5,6 +5,7 @@ from app.services.base import BaseService
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
 from app.db.base import MongoRepository
+from app.services.sync_service import SyncService
 
 
 class CategoryService(BaseService[Category, CategoryCreate, CategoryUpdate]):
@@ -23,6 +24,13 @@ class CategoryService(BaseService[Category, CategoryCreate, CategoryUpdate]):
         return await self.repository.create(category_data)
     
     
+    async def delete(self, id: str) -> bool:
+        """Delete category and leave a tombstone for delta sync"""
+        deleted = await self.repository.delete(id)
+        if deleted:
+            await SyncService().record_deletion("category", id)
+        return deleted
+    
     async def get_by_name(self, name: str) -> Optional[Category]:
         """Get category by name"""
         return await self.repository.find_one({"name": name})
@@ -31,6 +39,11 @@ class CategoryService(BaseService[Category, CategoryCreate, CategoryUpdate]):
         """Get all active categories"""
         return await self.repository.find_many({"is_active": True})
     
+    async def get_active_version(self) -> str:
+        """Version of the active category list, for ETags"""
+        count, updated_at = await self.repository.get_version({"is_active": True})
+        return f"{count}:{updated_at.isoformat() if updated_at else ''}"
+    
     async def get_all(self) -> List[Category]:
         """Get all categories"""
         return await self.repository.find_many({})
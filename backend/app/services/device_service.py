@@ -6,6 +6,8 @@ import uuid
 from app.services.base import BaseService
 from app.models.device import DeviceUser, DeviceType, UserType
 from app.db.base import MongoRepository
+from app.core.exceptions import RateLimitException
+from app.core.quota import quota_manager, QuotaStatus
 
 
 class DeviceService(BaseService[DeviceUser, dict, dict]):
@@ -65,11 +67,24 @@ class DeviceService(BaseService[DeviceUser, dict, dict]):
         return device_user
     
     async def check_rate_limit(self, device_user: DeviceUser) -> bool:
-        """Check if device user is within rate limits"""
-        # For now, no rate limiting since we removed premium features
-        # You can add simple rate limiting here if needed
+        """Count a request against the device's daily quota, raising when it is used up"""
+        quota = await quota_manager.check_and_increment(device_user.device_id, device_user.device_type)
+        if not quota.allowed:
+            raise RateLimitException(
+                message="Daily request quota exceeded",
+                retry_after=quota.retry_after,
+                details={
+                    "daily_limit": quota.limit,
+                    "daily_used": quota.used,
+                    "reset_time": quota.reset_time.isoformat()
+                }
+            )
         return True
     
+    async def get_quota_status(self, device_user: DeviceUser) -> QuotaStatus:
+        """Get the device's daily quota usage without counting a request"""
+        return await quota_manager.get_status(device_user.device_id, device_user.device_type)
+    
     
     async def add_to_favorites(self, device_user: DeviceUser, prompt_id: str) -> None:
         """Add prompt to device user favorites"""
@@ -1,12 +1,26 @@
-from typing import List, Optional
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
 from fastapi import HTTPException, status
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 
+from app.core.favorites_cache import get_favorites_cache
+from app.core.serialization import validate_as
+from app.schemas.prompt import PromptSummary
 from app.services.base import BaseService
 from app.models.favorite import Favorite
-from app.schemas.favorite import FavoriteCreate, FavoriteWithPrompt
+from app.schemas.favorite import FavoriteAction, FavoriteCreate, FavoriteOperation, FavoriteWithPrompt
 from app.db.base import MongoRepository
 
 
+def _as_utc(moment: datetime) -> datetime:
+    """Naive UTC datetime, as stored by the models"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
 class FavoriteService(BaseService[Favorite, FavoriteCreate, dict]):
     """Favorite service for business logic"""
     
@@ -14,41 +28,151 @@ class FavoriteService(BaseService[Favorite, FavoriteCreate, dict]):
         repository = MongoRepository(Favorite)
         super().__init__(repository)
     
-    async def add_favorite(self, device_id: str, prompt_id: str) -> Favorite:
+    async def add_favorite(self, device_id: str, prompt_id: str) -> None:
         """Add prompt to device favorites"""
-        # Check if already favorited
-        existing_favorite = await self.repository.find_one({
-            "device_id": device_id,
-            "prompt_id": prompt_id
-        })
-        
-        if existing_favorite:
+        if not await self._insert(device_id, prompt_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Prompt already in favorites"
             )
-        
-        favorite_data = {
-            "device_id": device_id,
-            "prompt_id": prompt_id
-        }
-        
-        return await self.repository.create(favorite_data)
     
     async def remove_favorite(self, device_id: str, prompt_id: str) -> bool:
         """Remove prompt from device favorites"""
-        favorite = await self.repository.find_one({
-            "device_id": device_id,
-            "prompt_id": prompt_id
-        })
-        
-        if not favorite:
+        if not await self._delete(device_id, prompt_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Favorite not found"
             )
+        return True
+    
+    async def toggle_favorite(self, device_id: str, prompt_id: str) -> bool:
+        """
+        Flip favorite status with one delete-or-insert attempt; returns the new status
+        The unique (device_id, prompt_id) index settles concurrent toggles
+        (double taps): an insert that loses the race leaves the prompt favorited.
+        """
+        if await self._delete(device_id, prompt_id):
+            return False
+        # False means a concurrent insert won and counted the like: favorited either way
+        await self._insert(device_id, prompt_id)
+        return True
+    
+    async def sync_favorites(self, device_id: str, operations: List[FavoriteOperation]) -> Tuple[List[str], int]:
+        """
+        Apply offline favorite changes with last-writer-wins semantics
+        A favorite's created_at is when it was last added: an add creates it
+        unless it exists, and a remove deletes it only if it was added
+        before the remove was made. Within a batch the latest operation per
+        prompt wins. Returns the merged favorite ids and how many changed.
+        """
+        from app.services.prompt_service import PromptService
+        
+        now = datetime.utcnow()
+        latest: Dict[str, FavoriteOperation] = {}
+        for operation in operations:
+            current = latest.get(operation.prompt_id)
+            if current is None or _as_utc(operation.timestamp) >= _as_utc(current.timestamp):
+                latest[operation.prompt_id] = operation
+        
+        prompt_service = PromptService()
+        added_ids = [prompt_id for prompt_id, operation in latest.items() if operation.action == FavoriteAction.ADD]
+        known_ids = await prompt_service.get_existing_ids(added_ids)
+        
+        adds: List[str] = []
+        upserts = []
+        removed_before: Dict[str, datetime] = {}
+        for prompt_id, operation in latest.items():
+            # Client clocks can run ahead; no change is newer than now
+            timestamp = min(_as_utc(operation.timestamp), now)
+            if operation.action == FavoriteAction.ADD:
+                if prompt_id in known_ids:
+                    adds.append(prompt_id)
+                    key = {"device_id": device_id, "prompt_id": prompt_id}
+                    upserts.append(UpdateOne(key, {"$setOnInsert": {"created_at": timestamp}}, upsert=True))
+            else:
+                removed_before[prompt_id] = timestamp
+        
+        # One read finds the favorites the removes apply to; they are then
+        # deleted by _id in the same unordered batch as the adds
+        removed: List[str] = []
+        deletes = []
+        if removed_before:
+            rows = await self.repository.find_raw(
+                {"device_id": device_id, "prompt_id": {"$in": list(removed_before)}},
+                ["prompt_id", "created_at"]
+            )
+            for row in rows:
+                if row["created_at"] <= removed_before[row["prompt_id"]]:
+                    removed.append(row["prompt_id"])
+                    deletes.append(DeleteOne({"_id": row["id"]}))
+        
+        # Likes follow what these writes did, not a before/after diff: a
+        # concurrent toggle has already counted its own change
+        deltas: Dict[str, int] = {}
+        recount: List[str] = []
+        changed = 0
+        if upserts or deletes:
+            try:
+                result = await self.repository.bulk_write(upserts + deletes)
+                inserted, deleted = result.upserted_ids.keys(), result.deleted_count
+            except BulkWriteError as e:
+                # An upsert racing a toggle for the same favorite: it exists either way
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+                inserted = [upserted["index"] for upserted in e.details.get("upserted", [])]
+                deleted = e.details.get("nRemoved", 0)
+            deltas.update({adds[index]: 1 for index in inserted})
+            changed = len(inserted) + deleted
+            if deleted == len(deletes):
+                deltas.update({prompt_id: -1 for prompt_id in removed})
+            else:
+                # A concurrent toggle deleted (and uncounted) some of them
+                # first; which ones is unknown, so those prompts are recounted
+                recount = removed
         
-        return await self.repository.delete(str(favorite.id))
+        if deltas:
+            await prompt_service.adjust_likes(deltas)
+        if recount:
+            await prompt_service.repair_likes_counts(recount)
+        await get_favorites_cache().reset(device_id)
+        return await self._load_prompt_ids(device_id), changed
+    
+    async def _insert(self, device_id: str, prompt_id: str) -> bool:
+        """Insert the favorite and count the like; False if it already existed"""
+        from app.services.prompt_service import PromptService
+        
+        key = {"device_id": device_id, "prompt_id": prompt_id}
+        try:
+            await self.repository.insert_raw({**key, "created_at": datetime.utcnow()})
+        except DuplicateKeyError:
+            return False
+        
+        # Counted only once the favorite exists; counting also checks that
+        # the prompt does, and any failure takes the favorite back out
+        try:
+            counted = await PromptService().increment_like(prompt_id)
+        except BaseException:
+            await self.repository.delete_where(key)
+            raise
+        if not counted:
+            await self.repository.delete_where(key)
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Prompt not found"
+            )
+        
+        await get_favorites_cache().changed(device_id, prompt_id, True)
+        return True
+    
+    async def _delete(self, device_id: str, prompt_id: str) -> bool:
+        """Delete the favorite and uncount the like; False if there was none"""
+        from app.services.prompt_service import PromptService
+        
+        if not await self.repository.delete_where({"device_id": device_id, "prompt_id": prompt_id}):
+            return False
+        await PromptService().decrement_like(prompt_id)
+        await get_favorites_cache().changed(device_id, prompt_id, False)
+        return True
     
     async def get_device_favorites(self, device_id: str) -> List[Favorite]:
         """Get all favorites for a device"""
@@ -65,25 +189,93 @@ class FavoriteService(BaseService[Favorite, FavoriteCreate, dict]):
         for favorite in favorites:
             prompt = await prompt_service.get_by_id(favorite.prompt_id)
             if prompt:
-                # Convert prompt to dict and ensure id is string
-                prompt_dict = prompt.model_dump()
-                prompt_dict["id"] = str(prompt.id)
-                
                 favorites_with_prompts.append(FavoriteWithPrompt(
-                    id=str(favorite.id),
-                    prompt=prompt_dict,
+                    id=favorite.id,
+                    prompt=validate_as(PromptSummary, prompt),
                     created_at=favorite.created_at
                 ))
         
         return favorites_with_prompts
     
+    async def get_favorite_prompt_ids(self, device_id: str) -> List[str]:
+        """Ids of the device's favorite prompts (cached for active devices)"""
+        return await get_favorites_cache().prompt_ids(device_id, lambda: self._load_prompt_ids(device_id))
+    
+    async def get_favorited_ids(self, device_id: str, prompt_ids: List[str]) -> Set[str]:
+        """Which of prompt_ids the device favorited (e.g. for a page of prompts)"""
+        if not prompt_ids:
+            return set()
+        return await get_favorites_cache().favorited(device_id, prompt_ids, lambda: self._load_prompt_ids(device_id))
+    
+    async def get_favorite_summaries(self, device_id: str) -> List[dict]:
+        """Raw summaries of the device's favorite prompts, in favorites order"""
+        from app.services.prompt_service import PromptService
+        
+        prompt_ids = await self.get_favorite_prompt_ids(device_id)
+        summaries = await get_favorites_cache().summaries(prompt_ids, PromptService().get_summaries_by_ids)
+        return [summaries[prompt_id] for prompt_id in prompt_ids if prompt_id in summaries]
+    
+    async def get_favorites_page(self, device_id: str, skip: int = 0, limit: int = 20) -> Tuple[List[dict], int]:
+        """
+        Newest-first page of the device's favorite prompts as raw summaries, with the total
+        The join runs on the server, with prompts no longer published or
+        active filtered out there; the page and the total are two
+        aggregations run concurrently.
+        """
+        from app.services.prompt_service import SUMMARY_FIELDS
+        
+        page_pipeline = self._visible_favorites_pipeline(
+            device_id,
+            {field: 1 for field in SUMMARY_FIELDS if field != "id"}
+        ) + [
+            {"$skip": skip},
+            {"$limit": limit},
+            {"$replaceRoot": {"newRoot": "$prompt"}}
+        ]
+        total_pipeline = self._visible_favorites_pipeline(device_id, {"_id": 1}) + [{"$count": "total"}]
+        
+        rows, counted = await asyncio.gather(
+            self.repository.aggregate_raw(page_pipeline),
+            self.repository.aggregate_raw(total_pipeline)
+        )
+        for row in rows:
+            row["id"] = row.pop("_id")
+        return rows, counted[0]["total"] if counted else 0
+    
+    def _visible_favorites_pipeline(self, device_id: str, projection: Dict[str, int]) -> List[dict]:
+        """Device favorites, newest first, joined with their published prompt"""
+        from app.models.prompt import Prompt, PromptStatus
+        
+        return [
+            {"$match": {"device_id": device_id}},
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {"$lookup": {
+                "from": Prompt.Settings.name,
+                "let": {
+                    "prompt_id": {"$convert": {"input": "$prompt_id", "to": "objectId", "onError": None, "onNull": None}}
+                },
+                "pipeline": [
+                    {"$match": {
+                        "$expr": {"$eq": ["$_id", "$$prompt_id"]},
+                        "status": PromptStatus.PUBLISHED.value,
+                        "is_active": True
+                    }},
+                    {"$project": projection}
+                ],
+                "as": "prompt"
+            }},
+            # Favorites whose prompt is gone or hidden have no match and drop out here
+            {"$unwind": "$prompt"}
+        ]
+    
     async def is_favorited(self, device_id: str, prompt_id: str) -> bool:
         """Check if prompt is favorited by device"""
-        favorite = await self.repository.find_one({
-            "device_id": device_id,
-            "prompt_id": prompt_id
-        })
-        return favorite is not None
+        return await get_favorites_cache().contains(device_id, prompt_id, lambda: self._load_prompt_ids(device_id))
+    
+    async def _load_prompt_ids(self, device_id: str) -> List[str]:
+        """Ids of the device's favorite prompts, straight from Mongo"""
+        favorites = await self.repository.find_raw({"device_id": device_id}, ["prompt_id"])
+        return [favorite["prompt_id"] for favorite in favorites]
     
     async def get_prompt_favorites_count(self, prompt_id: str) -> int:
         """Get number of favorites for a prompt"""
@@ -95,25 +287,13 @@ class FavoriteService(BaseService[Favorite, FavoriteCreate, dict]):
     
     async def get_popular_prompts_by_favorites(self, limit: int = 10) -> List[dict]:
         """Get most favorited prompts"""
-        # This would typically use an aggregation pipeline
-        # For now, we'll implement a simplified version
         from app.services.prompt_service import PromptService
         
-        prompt_service = PromptService()
-        all_prompts = await prompt_service.repository.find_many({})
-        
-        prompt_favorites = []
-        for prompt in all_prompts:
-            favorites_count = await self.get_prompt_favorites_count(str(prompt.id))
-            prompt_favorites.append({
-                "prompt": prompt,
-                "favorites_count": favorites_count
-            })
-        
-        # Sort by favorites count
-        prompt_favorites.sort(key=lambda x: x["favorites_count"], reverse=True)
-        
-        return prompt_favorites[:limit]
+        prompts, _ = await PromptService().browse_most_favorited(limit=limit)
+        return [
+            {"prompt": prompt, "favorites_count": prompt["likes_count"]}
+            for prompt in prompts
+        ]
     
     async def validate_create(self, favorite_in: FavoriteCreate) -> None:
         """Validate favorite creation"""
@@ -0,0 +1,141 @@
+"""
+Image Asset Service
+Content-addressed image records and their prompt reference counts
+"""
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from app.db.base import MongoRepository
+from app.models.image_asset import ImageAsset
+from app.models.prompt import Prompt
+
+# Public URL of a content-addressed image: /uploads/images/{sha256}{ext}
+ASSET_URL_PATTERN = re.compile(r"/uploads/images/([0-9a-f]{64})\.[a-z0-9]+$")
+
+
+def asset_hash_from_url(url: Optional[str]) -> Optional[str]:
+    """SHA-256 of the asset an image URL points at, if it is one"""
+    if not url:
+        return None
+    match = ASSET_URL_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+class ImageAssetService:
+    """Image asset lookups, registration and reference counting"""
+
+    def __init__(self):
+        self.repository = MongoRepository(ImageAsset)
+
+    async def find_by_hash(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """Asset record for a content hash"""
+        assets = await self.repository.find_raw({"sha256": sha256}, limit=1)
+        return assets[0] if assets else None
+
+    async def claim(self, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Asset record for a content hash, restarting its cleanup grace period
+        Used when an upload resolves to the asset, so an image that sat
+        unreferenced is not deleted before the prompt using it is saved.
+        """
+        await self.repository.bulk_write([
+            UpdateOne({"sha256": sha256}, {"$set": {"updated_at": datetime.utcnow()}})
+        ])
+        return await self.find_by_hash(sha256)
+    
+    async def register(self, asset: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a newly stored asset; returns the existing one if another upload won the race"""
+        now = datetime.utcnow()
+        doc = {**asset, "ref_count": 0, "created_at": now, "updated_at": now}
+        try:
+            doc["id"] = await self.repository.insert_raw(dict(doc))
+        except DuplicateKeyError:
+            existing = await self.claim(asset["sha256"])
+            if existing is not None:
+                return existing
+            raise
+        return doc
+
+    async def variants_for_url(self, url: Optional[str]) -> List[Dict[str, Any]]:
+        """Written variants of the asset an image URL points at"""
+        sha256 = asset_hash_from_url(url)
+        if not sha256:
+            return []
+        asset = await self.find_by_hash(sha256)
+        return asset.get("variants", []) if asset else []
+
+    async def set_variants(self, sha256: str, variants: List[Dict[str, Any]]) -> int:
+        """Store an asset's written variants, on it and on its prompts; returns prompts updated"""
+        now = datetime.utcnow()
+        await self.repository.bulk_write([
+            UpdateOne({"sha256": sha256}, {"$set": {"variants": variants, "updated_at": now}})
+        ])
+        result = await MongoRepository(Prompt).bulk_write([
+            UpdateMany(
+                {"image_url": {"$regex": f"/uploads/images/{sha256}\\."}, "image_variants": {"$ne": variants}},
+                {"$set": {"image_variants": variants, "updated_at": now}}
+            )
+        ])
+        return result.modified_count
+
+    async def replace_reference(self, old_url: Optional[str], new_url: Optional[str]) -> None:
+        """Move one prompt's reference from the image at old_url to the one at new_url"""
+        old_hash = asset_hash_from_url(old_url)
+        new_hash = asset_hash_from_url(new_url)
+        if old_hash == new_hash:
+            return
+
+        now = datetime.utcnow()
+        operations = []
+        if new_hash:
+            operations.append(UpdateOne(
+                {"sha256": new_hash},
+                {"$inc": {"ref_count": 1}, "$set": {"updated_at": now}}
+            ))
+        if old_hash:
+            operations.append(UpdateOne(
+                {"sha256": old_hash, "ref_count": {"$gt": 0}},
+                {"$inc": {"ref_count": -1}, "$set": {"updated_at": now}}
+            ))
+        await self.repository.bulk_write(operations)
+
+    async def recount_references(self) -> int:
+        """Rebuild every ref_count from the prompts; returns the number of referenced assets"""
+        counts: Dict[str, int] = {}
+        rows = await MongoRepository(Prompt).aggregate_raw([
+            {"$match": {"image_url": {"$regex": ASSET_URL_PATTERN.pattern}}},
+            {"$group": {"_id": "$image_url", "count": {"$sum": 1}}}
+        ])
+        for row in rows:
+            sha256 = asset_hash_from_url(row["_id"])
+            counts[sha256] = counts.get(sha256, 0) + row["count"]
+
+        operations: List[Any] = [
+            UpdateOne({"sha256": sha256, "ref_count": {"$ne": count}}, {"$set": {"ref_count": count}})
+            for sha256, count in counts.items()
+        ]
+        operations.append(UpdateMany(
+            {"sha256": {"$nin": list(counts)}, "ref_count": {"$ne": 0}},
+            {"$set": {"ref_count": 0, "updated_at": datetime.utcnow()}}
+        ))
+        await self.repository.bulk_write(operations)
+        return len(counts)
+
+    async def get_unreferenced(self, grace: timedelta) -> List[Dict[str, Any]]:
+        """Assets no prompt has used for at least the grace period"""
+        return await self.repository.find_raw({
+            "ref_count": 0,
+            "updated_at": {"$lt": datetime.utcnow() - grace}
+        })
+
+    async def delete(self, asset_id: Any, grace: timedelta) -> bool:
+        """Delete an asset record if it is still unreferenced and was not claimed within the grace period"""
+        return await self.repository.delete_where({
+            "_id": asset_id,
+            "ref_count": 0,
+            "updated_at": {"$lt": datetime.utcnow() - grace}
+        })
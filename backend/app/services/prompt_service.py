@@ -1,11 +1,21 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Set, Tuple
 from fastapi import HTTPException, status
 from datetime import datetime
+from bson import ObjectId
+from pymongo import UpdateOne
 
 from app.services.base import BaseService
 from app.models.prompt import Prompt, PromptStatus
-from app.schemas.prompt import PromptCreate, PromptUpdate, PromptFilter
+from app.schemas.prompt import PromptCreate, PromptUpdate, PromptFilter, PromptSummary
 from app.db.base import MongoRepository
+from app.services.image_asset_service import ImageAssetService
+from app.services.sync_service import SyncService
+
+# Fields read for list endpoints; content is the bulk of a prompt and is skipped
+SUMMARY_FIELDS = tuple(field for field in PromptSummary.model_fields if field != "is_favorited")
+
+# Newest first; _id breaks ties so skip/limit pages never overlap or skip items
+BROWSE_SORT = [("created_at", -1), ("_id", -1)]
 
 
 class PromptService(BaseService[Prompt, PromptCreate, PromptUpdate]):
@@ -23,7 +33,29 @@ class PromptService(BaseService[Prompt, PromptCreate, PromptUpdate]):
         prompt_data["created_by"] = created_by
         prompt_data["slug"] = self._generate_slug(prompt_in.title)
         
-        return await self.repository.create(prompt_data)
+        return await self.create(prompt_data)
+    
+    async def create(self, obj_in: PromptCreate) -> Prompt:
+        """Create prompt, with its image's variants, and count a reference to the image"""
+        assets = ImageAssetService()
+        obj_data = obj_in.dict() if hasattr(obj_in, 'dict') else dict(obj_in)
+        obj_data["image_variants"] = await assets.variants_for_url(obj_data.get("image_url"))
+        prompt = await self.repository.create(obj_data)
+        await assets.replace_reference(None, prompt.image_url)
+        return prompt
+    
+    async def update(self, id: str, obj_in: PromptUpdate) -> Optional[Prompt]:
+        """Update prompt, moving the image reference when image_url changes"""
+        assets = ImageAssetService()
+        obj_data = obj_in.dict(exclude_unset=True) if hasattr(obj_in, 'dict') else dict(obj_in)
+        previous = None
+        if "image_url" in obj_data:
+            previous = await self.repository.get_by_id(id)
+            obj_data["image_variants"] = await assets.variants_for_url(obj_data["image_url"])
+        prompt = await self.repository.update(id, obj_data)
+        if prompt is not None and previous is not None:
+            await assets.replace_reference(previous.image_url, prompt.image_url)
+        return prompt
     
     async def get_by_slug(self, slug: str) -> Optional[Prompt]:
         """Get prompt by slug"""
@@ -70,20 +102,146 @@ class PromptService(BaseService[Prompt, PromptCreate, PromptUpdate]):
             "is_active": True
         }, limit=limit, sort=[("likes_count", -1), ("views_count", -1)])
     
+    async def delete(self, id: str) -> bool:
+        """Delete prompt, release its image and leave a tombstone for delta sync"""
+        prompt = await self.repository.get_by_id(id)
+        if prompt is None:
+            return False
+        deleted = await self.repository.delete(id)
+        if deleted:
+            await ImageAssetService().replace_reference(prompt.image_url, None)
+            await SyncService().record_deletion("prompt", id)
+        return deleted
+    
     async def search(self, query: str, limit: int = 20) -> List[Prompt]:
         """Search prompts by text"""
-        search_filter = {
+        return await self.repository.find_many(self._search_filter(query), limit=limit)
+    
+    async def browse_summaries(
+        self,
+        category_id: Optional[str] = None,
+        search: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Published prompt summaries as raw dicts, with the total match count"""
+        if category_id:
+            filters = {
+                "category_id": category_id,
+                "status": PromptStatus.PUBLISHED.value,
+                "is_active": True
+            }
+        elif search:
+            filters = self._search_filter(search)
+        else:
+            filters = {"status": PromptStatus.PUBLISHED.value}
+        
+        items = await self.repository.find_raw(
+            filters,
+            SUMMARY_FIELDS,
+            skip=skip,
+            limit=limit,
+            sort=BROWSE_SORT
+        )
+        total = await self.repository.count(filters)
+        return items, total
+    
+    async def browse_most_favorited(
+        self,
+        category_id: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Published prompt summaries ordered by favorites, globally or in a category"""
+        filters: Dict[str, Any] = {"status": PromptStatus.PUBLISHED.value, "is_active": True}
+        if category_id:
+            filters["category_id"] = category_id
+        
+        items = await self.repository.find_raw(
+            filters,
+            SUMMARY_FIELDS,
+            skip=skip,
+            limit=limit,
+            sort=[("likes_count", -1), ("_id", -1)]
+        )
+        total = await self.repository.count(filters)
+        return items, total
+    
+    async def repair_likes_counts(self, prompt_ids: Optional[List[str]] = None) -> None:
+        """
+        Rebuild likes_count from the favorites collection, for every prompt or only prompt_ids
+        Runs as one aggregation on the server: each prompt counts its
+        favorites through the prompt_id index and only prompts whose stored
+        count drifted are written back.
+        """
+        from app.models.favorite import Favorite
+        
+        pipeline: List[Dict[str, Any]] = []
+        if prompt_ids is not None:
+            object_ids = [ObjectId(prompt_id) for prompt_id in prompt_ids if ObjectId.is_valid(prompt_id)]
+            pipeline.append({"$match": {"_id": {"$in": object_ids}}})
+        pipeline += [
+            {"$project": {"likes_count": 1}},
+            {"$lookup": {
+                "from": Favorite.Settings.name,
+                "let": {"prompt_id": {"$toString": "$_id"}},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$prompt_id", "$$prompt_id"]}}},
+                    {"$count": "count"}
+                ],
+                "as": "favorites"
+            }},
+            {"$project": {
+                "stored": "$likes_count",
+                "likes_count": {"$ifNull": [{"$first": "$favorites.count"}, 0]}
+            }},
+            {"$match": {"$expr": {"$ne": ["$stored", "$likes_count"]}}},
+            {"$project": {"likes_count": 1}},
+            {"$merge": {
+                "into": Prompt.Settings.name,
+                "on": "_id",
+                "whenMatched": "merge",
+                "whenNotMatched": "discard"
+            }}
+        ]
+        await self.repository.aggregate_raw(pipeline)
+    
+    async def get_summaries_by_ids(self, prompt_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Raw prompt summaries keyed by id string (unknown or invalid ids are skipped)"""
+        return await self.get_raw_by_ids(prompt_ids, SUMMARY_FIELDS)
+    
+    async def get_raw_by_ids(
+        self,
+        prompt_ids: List[str],
+        fields: Optional[Iterable[str]] = None,
+        published_only: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Raw prompts keyed by id string, in one $in query (unknown or invalid ids are skipped)
+        With published_only, drafts, archived and inactive prompts are skipped too.
+        """
+        object_ids = [ObjectId(prompt_id) for prompt_id in prompt_ids if ObjectId.is_valid(prompt_id)]
+        if not object_ids:
+            return {}
+        
+        filters: Dict[str, Any] = {"_id": {"$in": object_ids}}
+        if published_only:
+            filters.update({"status": PromptStatus.PUBLISHED.value, "is_active": True})
+        items = await self.repository.find_raw(filters, fields)
+        return {str(item["id"]): item for item in items}
+    
+    def _search_filter(self, query: str) -> Dict[str, Any]:
+        """Filter matching published prompts by text"""
+        return {
             "$or": [
                 {"title": {"$regex": query, "$options": "i"}},
                 {"description": {"$regex": query, "$options": "i"}},
                 {"tags": {"$in": [query]}},
                 {"content": {"$regex": query, "$options": "i"}}
             ],
-            "status": PromptStatus.PUBLISHED,
+            "status": PromptStatus.PUBLISHED.value,
             "is_active": True
         }
-        
-        return await self.repository.find_many(search_filter, limit=limit)
     
     async def get_by_filter(
         self, 
@@ -101,19 +259,40 @@ class PromptService(BaseService[Prompt, PromptCreate, PromptUpdate]):
             prompt.increment_views()
             await prompt.save()
     
-    async def increment_like(self, prompt_id: str) -> None:
-        """Increment prompt like count"""
-        prompt = await self.get_by_id(prompt_id)
-        if prompt:
-            prompt.increment_likes()
-            await prompt.save()
+    async def increment_like(self, prompt_id: str) -> bool:
+        """Atomically increment prompt like count; False if the prompt does not exist"""
+        if not ObjectId.is_valid(prompt_id):
+            return False
+        return await self.repository.increment({"_id": ObjectId(prompt_id)}, {"likes_count": 1})
     
     async def decrement_like(self, prompt_id: str) -> None:
-        """Decrement prompt like count"""
-        prompt = await self.get_by_id(prompt_id)
-        if prompt:
-            prompt.decrement_likes()
-            await prompt.save()
+        """Atomically decrement prompt like count, never below zero"""
+        if ObjectId.is_valid(prompt_id):
+            await self.repository.increment(
+                {"_id": ObjectId(prompt_id), "likes_count": {"$gt": 0}},
+                {"likes_count": -1}
+            )
+    
+    async def adjust_likes(self, deltas: Dict[str, int]) -> None:
+        """Apply like count changes for many prompts in one batch, never below zero"""
+        operations = []
+        for prompt_id, delta in deltas.items():
+            if not delta or not ObjectId.is_valid(prompt_id):
+                continue
+            filters: Dict[str, Any] = {"_id": ObjectId(prompt_id)}
+            if delta < 0:
+                filters["likes_count"] = {"$gte": -delta}
+            operations.append(UpdateOne(filters, {"$inc": {"likes_count": delta}}))
+        if operations:
+            await self.repository.bulk_write(operations)
+    
+    async def get_existing_ids(self, prompt_ids: List[str]) -> Set[str]:
+        """Which of prompt_ids belong to existing prompts"""
+        object_ids = [ObjectId(prompt_id) for prompt_id in prompt_ids if ObjectId.is_valid(prompt_id)]
+        if not object_ids:
+            return set()
+        items = await self.repository.find_raw({"_id": {"$in": object_ids}}, ["id"])
+        return {str(item["id"]) for item in items}
     
     async def publish(self, prompt_id: str) -> Optional[Prompt]:
         """Publish a prompt"""
@@ -24,6 +24,11 @@ class SocialLinkService(BaseService[SocialLink, SocialLinkCreate, SocialLinkUpda
         """Get only active social links ordered by display_order"""
         return await SocialLink.find(SocialLink.is_active == True).sort("display_order").to_list()
     
+    async def get_active_version(self) -> str:
+        """Version of the active social links, for ETags"""
+        count, updated_at = await self.repository.get_version({"is_active": True})
+        return f"{count}:{updated_at.isoformat() if updated_at else ''}"
+    
     async def get_social_link_by_platform(self, platform: str) -> Optional[SocialLink]:
         """Get social link by platform name"""
         return await SocialLink.find_one(SocialLink.platform == platform)
@@ -0,0 +1,140 @@
+"""
+Sync Service
+Delta sync of the mobile catalog: changes since a version token
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+
+from app.core.config import settings
+from app.db.base import MongoRepository
+from app.models.category import Category
+from app.models.prompt import Prompt, PromptStatus
+from app.models.tombstone import Tombstone, TOMBSTONE_RETENTION_DAYS
+from app.schemas.prompt import PromptSummary
+
+TOKEN_PREFIX = "v1."
+EPOCH = datetime(1970, 1, 1)
+
+# Prompt fields read for sync: the summary plus what decides visibility
+SYNC_PROMPT_FIELDS = tuple(
+    field for field in PromptSummary.model_fields if field != "is_favorited"
+) + ("status", "is_active", "updated_at")
+
+
+def encode_sync_token(moment: datetime, after_id: Optional[ObjectId] = None) -> str:
+    """
+    Opaque token for a point in time (millisecond precision, like MongoDB)
+    after_id continues a paged sync past the prompts sharing that timestamp.
+    """
+    token = f"{TOKEN_PREFIX}{(moment - EPOCH) // timedelta(milliseconds=1)}"
+    return f"{token}.{after_id}" if after_id is not None else token
+
+
+def decode_sync_token(token: str) -> Tuple[datetime, Optional[ObjectId]]:
+    """Point in time (and paging id) of a token; raises ValueError when malformed"""
+    if not token.startswith(TOKEN_PREFIX):
+        raise ValueError("Unknown sync token version")
+    milliseconds, _, after_id = token[len(TOKEN_PREFIX):].partition(".")
+    if after_id and not ObjectId.is_valid(after_id):
+        raise ValueError("Malformed sync token")
+    moment = EPOCH + timedelta(milliseconds=int(milliseconds))
+    return moment, ObjectId(after_id) if after_id else None
+
+
+class SyncService:
+    """Changed and deleted prompts and categories since a point in time"""
+    
+    def __init__(self):
+        self.prompts = MongoRepository(Prompt)
+        self.categories = MongoRepository(Category)
+        self.tombstones = MongoRepository(Tombstone)
+    
+    async def record_deletion(self, kind: str, item_id: str) -> None:
+        """Leave a tombstone so synced clients learn about a deletion"""
+        await self.tombstones.create({"kind": kind, "item_id": item_id})
+    
+    async def get_changes(
+        self,
+        since: Optional[datetime],
+        after_id: Optional[ObjectId] = None
+    ) -> Dict[str, Any]:
+        """
+        Changes since a point in time, oldest first
+        Without since (or when it is older than tombstones are kept) the whole
+        visible catalog is returned with reset=True. Windows overlap by
+        SYNC_SAFETY_WINDOW seconds so writes still in flight are not missed;
+        clients apply changes as idempotent upserts and deletes.
+        A paging cursor (after_id) never resets: the next page of a full sync
+        carries the timestamp of the last prompt sent, however old it is.
+        """
+        now = datetime.utcnow()
+        reset = since is None or (
+            after_id is None and since < now - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        )
+        limit = settings.SYNC_PAGE_SIZE
+        
+        if reset:
+            prompt_filter = {"status": PromptStatus.PUBLISHED.value, "is_active": True}
+            category_filter = {"is_active": True}
+            since = None
+        elif after_id is not None:
+            # Continue a paged sync exactly after the last prompt returned
+            prompt_filter = {"$or": [
+                {"updated_at": {"$gt": since}},
+                {"updated_at": since, "_id": {"$gt": after_id}}
+            ]}
+            category_filter = {"updated_at": {"$gte": since}}
+        else:
+            prompt_filter = {"updated_at": {"$gte": since}}
+            category_filter = {"updated_at": {"$gte": since}}
+        
+        rows = await self.prompts.find_raw(
+            prompt_filter,
+            SYNC_PROMPT_FIELDS,
+            limit=limit + 1,
+            sort=[("updated_at", 1), ("_id", 1)]
+        )
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        prompts: List[Dict[str, Any]] = []
+        removed_prompt_ids: List[str] = []
+        for row in rows:
+            if row.get("status") == PromptStatus.PUBLISHED.value and row.get("is_active", True):
+                prompts.append(row)
+            else:
+                removed_prompt_ids.append(str(row["id"]))
+        
+        categories: List[Dict[str, Any]] = []
+        removed_category_ids: List[str] = []
+        for row in await self.categories.find_raw(category_filter, sort=[("updated_at", 1)]):
+            if row.get("is_active", True):
+                categories.append(row)
+            else:
+                removed_category_ids.append(str(row["id"]))
+        
+        if since is not None:
+            for tombstone in await self.tombstones.find_raw({"deleted_at": {"$gte": since}}, ["kind", "item_id"]):
+                if tombstone["kind"] == "prompt":
+                    removed_prompt_ids.append(tombstone["item_id"])
+                elif tombstone["kind"] == "category":
+                    removed_category_ids.append(tombstone["item_id"])
+        
+        if has_more:
+            token = encode_sync_token(rows[-1]["updated_at"], rows[-1]["id"])
+        else:
+            next_since = now - timedelta(seconds=settings.SYNC_SAFETY_WINDOW)
+            if since is not None:
+                next_since = max(next_since, since)
+            token = encode_sync_token(next_since)
+        
+        return {
+            "token": token,
+            "reset": reset,
+            "has_more": has_more,
+            "prompts": prompts,
+            "removed_prompt_ids": removed_prompt_ids,
+            "categories": categories,
+            "removed_category_ids": removed_category_ids,
+        }
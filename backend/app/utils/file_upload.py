@@ -261,15 +261,105 @@
 #     """Get file upload manager instance"""
 #     return file_upload_manager
 
+import hashlib
 import os
 import uuid
 import shutil
-from typing import Optional
-from fastapi import UploadFile, HTTPException, status
-from PIL import Image
+from typing import Dict, List, Optional
+from fastapi import Request, UploadFile, HTTPException, status
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
 import aiofiles
 
 from app.core.config import settings
+from app.core.image_processing import ImageProcessingError, image_processor, probe_image, thumbnail_file
+from app.core.image_variants import image_variants
+from app.services.image_asset_service import ImageAssetService
+
+# File extensions of content-addressed images, by content type
+IMAGE_EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+}
+
+# Room for the multipart boundaries and part headers around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StreamedUpload:
+    """An uploaded file already written to a temp file, with its size and SHA-256"""
+    
+    def __init__(self, path: str, filename: str, content_type: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.sha256 = sha256
+    
+    def discard(self) -> None:
+        """Delete the temp file if it was not moved into place"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _FilePartReceiver:
+    """multipart/form-data parser callbacks collecting the data of one file field"""
+    
+    def __init__(self, field_name: str):
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.pending: List[bytes] = []
+        self.complete = False
+        self._in_file = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self.callbacks = {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+    
+    def on_part_begin(self) -> None:
+        self._headers = {}
+    
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+    
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+    
+    def on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+    
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        if name != self.field_name or b"filename" not in options or self.filename is not None:
+            return
+        self._in_file = True
+        self.filename = options[b"filename"].decode("utf-8", "replace")
+        content_type, _ = parse_options_header(self._headers.get(b"content-type", b""))
+        self.content_type = content_type.decode("latin-1").lower()
+    
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file:
+            self.pending.append(data[start:end])
+    
+    def on_part_end(self) -> None:
+        if self._in_file:
+            self._in_file = False
+            self.complete = True
 
 
 class FileUploadManager:
@@ -279,6 +369,9 @@ class FileUploadManager:
         self.upload_dir = settings.UPLOAD_DIR  # Use standard UPLOAD_DIR setting
         self.max_file_size = settings.MAX_FILE_SIZE
         self.allowed_types = settings.ALLOWED_FILE_TYPES
+        self.chunk_size = settings.UPLOAD_CHUNK_SIZE
+        self.image_processor = image_processor
+        self.image_variants = image_variants
         
         # Create upload directory if it doesn't exist
         os.makedirs(self.upload_dir, exist_ok=True)
@@ -287,26 +380,12 @@ class FileUploadManager:
         os.makedirs(f"{self.upload_dir}/temp", exist_ok=True)
     
     async def validate_file(self, file: UploadFile) -> None:
-        """Validate uploaded file"""
-        # Reset file pointer to beginning to check size properly
-        await file.seek(0)
-        
-        # Read content to check actual size
-        content = await file.read()
-        actual_size = len(content)
-        
-        # Reset file pointer back to beginning for later use
-        await file.seek(0)
-        
-        # Validate size and type
-        if actual_size == 0:
+        """Validate an already parsed upload's size and type"""
+        if file.size == 0:
             raise HTTPException(status_code=400, detail="File is empty")
         
-        if actual_size > self.max_file_size:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File size exceeds maximum allowed size of {self.max_file_size} bytes"
-            )
+        if file.size is not None and file.size > self.max_file_size:
+            raise self._too_large()
         
         # Check file type
         if file.content_type not in self.allowed_types:
@@ -315,6 +394,72 @@ class FileUploadManager:
                 detail=f"File type {file.content_type} is not allowed"
             )
     
+    async def receive_file(self, request: Request, field_name: str = "file") -> StreamedUpload:
+        """
+        Stream a multipart/form-data upload to a temp file
+        The body is parsed as it arrives and written in chunks, so memory use
+        does not grow with the file; the size limit is enforced and the
+        SHA-256 computed in the same pass.
+        """
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+        
+        # Refuse bodies that announce they are too large before reading any of them
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > self.max_file_size + MULTIPART_OVERHEAD:
+            raise self._too_large()
+        
+        receiver = _FilePartReceiver(field_name)
+        parser = MultipartParser(params[b"boundary"], receiver.callbacks)
+        temp_path = os.path.join(self.upload_dir, "temp", f".{uuid.uuid4().hex}.part")
+        hasher = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        
+        try:
+            async with aiofiles.open(temp_path, "wb") as f:
+                async for chunk in request.stream():
+                    parser.write(chunk)
+                    if receiver.pending:
+                        self._check_type(receiver.content_type)
+                    for data in receiver.pending:
+                        size += len(data)
+                        if size > self.max_file_size:
+                            raise self._too_large()
+                        hasher.update(data)
+                        buffer += data
+                    receiver.pending.clear()
+                    
+                    if len(buffer) >= self.chunk_size:
+                        await f.write(bytes(buffer))
+                        buffer.clear()
+                
+                parser.finalize()
+                if buffer:
+                    await f.write(bytes(buffer))
+            
+            if not receiver.complete:
+                raise HTTPException(status_code=400, detail=f"No file uploaded in field '{field_name}'")
+            if size == 0:
+                raise HTTPException(status_code=400, detail="File is empty")
+            self._check_type(receiver.content_type)
+        except MultipartParseError:
+            self._remove(temp_path)
+            raise HTTPException(status_code=400, detail="Malformed multipart body")
+        except BaseException:
+            # Includes client disconnects and cancellation: never leave partial files behind
+            self._remove(temp_path)
+            raise
+        
+        return StreamedUpload(
+            path=temp_path,
+            filename=receiver.filename or "",
+            content_type=receiver.content_type,
+            size=size,
+            sha256=hasher.hexdigest()
+        )
+    
     def generate_filename(self, original_filename: str) -> str:
         """Generate unique filename"""
         file_extension = os.path.splitext(original_filename)[1].lower()
@@ -331,141 +476,100 @@ class FileUploadManager:
         # Reset file pointer before saving
         await file.seek(0)
         
-        # Save file
+        # Copy in chunks rather than reading the whole file
         async with aiofiles.open(file_path, 'wb') as f:
-            content = await file.read()
-            await f.write(content)
+            while chunk := await file.read(self.chunk_size):
+                await f.write(chunk)
         
         return filename
     
-    async def save_image(self, file: UploadFile) -> dict:
-        """Save image file with thumbnail generation"""
-        await self.validate_file(file)
-        
-        filename = self.generate_filename(file.filename)
-        image_path = os.path.join(self.upload_dir, "images", filename)
-        
-        # Reset file pointer to beginning before saving
-        await file.seek(0)
-        
-        # Save original image directly to images folder
-        async with aiofiles.open(image_path, 'wb') as f:
-            content = await file.read()
-            if len(content) == 0:
-                raise HTTPException(status_code=400, detail="File is empty")
-            await f.write(content)
-        
-        # Validate saved file
-        if not os.path.exists(image_path) or os.path.getsize(image_path) == 0:
-            raise HTTPException(status_code=500, detail="Failed to save file")
-        
-        # Validate that the saved file is actually a valid image
-        try:
-            with Image.open(image_path) as img:
-                # Verify it's a valid image by trying to load it
-                img.verify()
-        except Exception as e:
-            # If it's not a valid image, delete the file and raise an error
-            if os.path.exists(image_path):
-                os.remove(image_path)
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid image file: {str(e)}"
-            )
-        
-        # Reopen the image to get dimensions (verify() closes the file)
+    async def save_image(self, upload: StreamedUpload) -> dict:
+        """
+        Save a received image with thumbnail generation
+        Images are named by the SHA-256 of their content, so a file that was
+        uploaded before is not written or processed again: the existing
+        asset is returned, and its cleanup grace period starts over.
+        Resized variants are written in the background; the response lists
+        them up front.
+        """
+        assets = ImageAssetService()
         try:
-            with Image.open(image_path) as img:
-                width, height = img.size
-        except Exception as e:
-            # If we can't get dimensions, use defaults
-            width, height = None, None
+            asset = await assets.claim(upload.sha256)
+            image_path = os.path.join(self.upload_dir, "images", asset["filename"]) if asset else None
+            if asset is None or not os.path.exists(image_path):
+                asset = await assets.register(await self._store_image(upload))
+                image_path = os.path.join(self.upload_dir, "images", asset["filename"])
+        finally:
+            upload.discard()
+        
+        variants = asset.get("variants")
+        if not variants:
+            self.image_variants.schedule(asset, image_path)
+            variants = self.image_variants.plan(asset["sha256"], asset.get("width"), asset.get("height"))
         
-        # Generate thumbnail
-        thumbnail_filename = await self.generate_thumbnail(image_path, filename)
+        return {
+            "filename": asset["filename"],
+            "url": f"/uploads/images/{asset['filename']}",
+            "thumbnail_url": f"/uploads/thumbnails/{asset['thumbnail_filename']}" if asset.get("thumbnail_filename") else None,
+            "size": asset["size"],
+            "content_type": asset["content_type"],
+            "width": asset.get("width"),
+            "height": asset.get("height"),
+            "sha256": asset["sha256"],
+            "variants": variants
+        }
+    
+    async def _store_image(self, upload: StreamedUpload) -> dict:
+        """Validate the image, write its thumbnail and move it under its content hash"""
+        extension = IMAGE_EXTENSIONS.get(upload.content_type) or os.path.splitext(upload.filename)[1].lower()
+        filename = f"{upload.sha256}{extension}"
+        thumbnail_filename = f"thumb_{filename}"
+        thumbnail_path = os.path.join(self.upload_dir, "thumbnails", thumbnail_filename)
+        
+        width, height, thumbnail_written = await self._run_image_job(
+            probe_image, upload.path, thumbnail_path
+        )
+        # Concurrent identical uploads replace the file with the same bytes
+        os.replace(upload.path, os.path.join(self.upload_dir, "images", filename))
         
         return {
+            "sha256": upload.sha256,
             "filename": filename,
-            "url": f"/uploads/images/{filename}",  # Fixed URL path
-            "thumbnail_url": f"/uploads/thumbnails/{thumbnail_filename}" if thumbnail_filename else None,
-            "size": os.path.getsize(image_path),
-            "content_type": file.content_type,
+            "thumbnail_filename": thumbnail_filename if thumbnail_written else None,
+            "content_type": upload.content_type,
+            "size": upload.size,
             "width": width,
             "height": height
         }
     
-    async def save_temp_image(self, file: UploadFile) -> dict:
-        """Save temporary image file for preview"""
-        await self.validate_file(file)
-        
-        filename = self.generate_filename(file.filename)
+    async def save_temp_image(self, upload: StreamedUpload) -> dict:
+        """Save a received image to the temp directory for preview"""
+        filename = self.generate_filename(upload.filename)
         temp_path = os.path.join(self.upload_dir, "temp", filename)
         
-        # Reset file pointer to beginning before saving
-        await file.seek(0)
-        
-        # Save original image to temp directory
-        async with aiofiles.open(temp_path, 'wb') as f:
-            content = await file.read()
-            if len(content) == 0:
-                raise HTTPException(status_code=400, detail="File is empty")
-            await f.write(content)
-        
-        # Validate saved file
-        if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-            raise HTTPException(status_code=500, detail="Failed to save temporary file")
-        
-        # Validate that the saved file is actually a valid image
         try:
-            with Image.open(temp_path) as img:
-                # Verify it's a valid image by trying to load it
-                img.verify()
-        except Exception as e:
-            # If it's not a valid image, delete the file and raise an error
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid image file: {str(e)}"
-            )
-        
-        # Reopen the image to get dimensions (verify() closes the file)
-        try:
-            with Image.open(temp_path) as img:
-                width, height = img.size
-        except Exception as e:
-            # If we can't get dimensions, use defaults
-            width, height = None, None
+            width, height, _ = await self._run_image_job(probe_image, upload.path, None)
+            os.replace(upload.path, temp_path)
+        finally:
+            upload.discard()
         
         return {
             "filename": filename,
             "url": f"/uploads/temp/{filename}",  # Fixed URL path
             "thumbnail_url": None,  # No thumbnail for temp images
-            "size": os.path.getsize(temp_path),
-            "content_type": file.content_type,
+            "size": upload.size,
+            "content_type": upload.content_type,
             "width": width,
-            "height": height
+            "height": height,
+            "sha256": upload.sha256
         }
     
     async def generate_thumbnail(self, image_path: str, filename: str, size: tuple = (300, 300)) -> Optional[str]:
         """Generate thumbnail for image"""
-        try:
-            thumbnail_filename = f"thumb_{filename}"
-            thumbnail_path = os.path.join(self.upload_dir, "thumbnails", thumbnail_filename)
-            
-            with Image.open(image_path) as img:
-                # Convert to RGB if necessary
-                if img.mode in ("RGBA", "P"):
-                    img = img.convert("RGB")
-                
-                # Generate thumbnail
-                img.thumbnail(size, Image.Resampling.LANCZOS)
-                img.save(thumbnail_path, "JPEG", quality=85)
-            
-            return thumbnail_filename
-        except Exception as e:
-            print(f"Error generating thumbnail: {e}")
-            return None
+        thumbnail_filename = f"thumb_{filename}"
+        thumbnail_path = os.path.join(self.upload_dir, "thumbnails", thumbnail_filename)
+        written = await self._run_image_job(thumbnail_file, image_path, thumbnail_path, size)
+        return thumbnail_filename if written else None
     
     def delete_file(self, filename: str, subfolder: str = "images") -> bool:
         """Delete file from disk"""
@@ -488,6 +592,35 @@ class FileUploadManager:
     def get_file_url(self, filename: str, subfolder: str = "images") -> str:
         """Get public URL for file"""
         return f"/uploads/{subfolder}/{filename}"
+    
+    async def _run_image_job(self, func, *args):
+        """Run image work in the process pool, mapping its failures to HTTP errors"""
+        try:
+            return await self.image_processor.run(func, *args)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid image file")
+        except ImageProcessingError as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    def _check_type(self, content_type: Optional[str]) -> None:
+        if content_type not in self.allowed_types:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"File type {content_type} is not allowed"
+            )
+    
+    def _too_large(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"File size exceeds maximum allowed size of {self.max_file_size} bytes"
+        )
+    
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
 
 # Global file upload manager instance
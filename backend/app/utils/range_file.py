@@ -0,0 +1,98 @@
+"""
+Range File Responses
+File responses with ETag revalidation and single-range (resumable) downloads
+"""
+import os
+from typing import Dict, Optional, Tuple
+
+import aiofiles
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.http_cache import etag_matches
+
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single "bytes=start-end" range into inclusive offsets
+    Returns None when the header is not a single byte range (serve the whole
+    file) and raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if not start_text:
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                raise ValueError("Empty suffix range")
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, min(end, size - 1)
+
+
+async def _read_file(path: str, start: int, length: int):
+    async with aiofiles.open(path, "rb") as f:
+        await f.seek(start)
+        while length > 0:
+            chunk = await f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def range_file_response(
+    request: Request,
+    path: str,
+    media_type: str,
+    etag: str,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """Serve path with 304, 206 and 416 handling based on the request headers"""
+    size = os.path.getsize(path)
+    response_headers = {"ETag": etag, "Accept-Ranges": "bytes", **(headers or {})}
+
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=response_headers)
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            response_headers["Content-Range"] = f"bytes */{size}"
+            return Response(status_code=416, headers=response_headers)
+
+    if byte_range is None:
+        start, end, status_code = 0, size - 1, 200
+    else:
+        start, end = byte_range
+        status_code = 206
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+    length = end - start + 1 if size else 0
+    response_headers["Content-Length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=status_code, headers=response_headers, media_type=media_type)
+
+    return StreamingResponse(
+        _read_file(path, start, length),
+        status_code=status_code,
+        headers=response_headers,
+        media_type=media_type
+    )
@@ -0,0 +1,31 @@
+"""
+Upload Static Files
+Serves UPLOAD_DIR, marking content-addressed images as cacheable forever
+"""
+import os
+import re
+
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import Response
+from starlette.types import Scope
+
+from app.core.http_cache import CACHE_POLICIES
+
+# {sha256}{ext} originals, their thumb_{sha256}{ext} thumbnails and {sha256}_{width}w.{format} variants
+CONTENT_ADDRESSED_NAME = re.compile(r"^(thumb_)?[0-9a-f]{64}(_\d+w)?\.[a-z0-9]+$")
+
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles with immutable caching for files named by their content hash"""
+
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if CONTENT_ADDRESSED_NAME.match(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = CACHE_POLICIES["image_asset"]
+        return response
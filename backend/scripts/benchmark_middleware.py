@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark the full middleware stack in a single worker
+Compares the previous BaseHTTPMiddleware implementations with the pure ASGI
+ones by driving the ASGI app directly (no sockets), so the numbers reflect
+middleware overhead rather than network or server costs.
+
+Usage: python scripts/benchmark_middleware.py [requests] [concurrency]
+"""
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
+
+from app.core.counter_backends import MemoryCounterBackend
+from app.core.counters import BatchedCounters
+from app.core.middleware import (
+    RateLimitMiddleware, RequestLoggingMiddleware, SecurityHeadersMiddleware
+)
+
+
+class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware request logging, kept for comparison"""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        start_time = time.time()
+        logging.getLogger(__name__).info(f"Request: {request.method} {request.url}")
+        response = await call_next(request)
+        process_time = time.time() - start_time
+        logging.getLogger(__name__).info(
+            f"Response: {response.status_code} - Processing time: {process_time:.3f}s"
+        )
+        response.headers["X-Process-Time"] = str(process_time)
+        return response
+
+
+class LegacySecurityHeadersMiddleware(BaseHTTPMiddleware):
+    """Previous BaseHTTPMiddleware security headers, kept for comparison"""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        response = await call_next(request)
+        response.headers["X-Content-Type-Options"] = "nosniff"
+        response.headers["X-Frame-Options"] = "DENY"
+        response.headers["X-XSS-Protection"] = "1; mode=block"
+        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
+        return response
+
+
+def build_app(security_middleware, logging_middleware) -> FastAPI:
+    """Build an app with the same middleware order as setup_middleware"""
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"status": "ok", "items": list(range(10))}
+
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    app.add_middleware(security_middleware)
+    app.add_middleware(logging_middleware)
+    app.add_middleware(
+        RateLimitMiddleware,
+        calls=10 ** 9,
+        period=60,
+        device_calls=10 ** 9,
+        counters=BatchedCounters(MemoryCounterBackend())
+    )
+    return app
+
+
+async def call(app, index: int) -> None:
+    """Send one GET /ping through the ASGI app"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/ping",
+        "raw_path": b"/ping",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"host", b"bench"),
+            (b"accept-encoding", b"gzip"),
+            (b"x-device-id", f"bench-{index % 100}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000 + index % 1000),
+        "server": ("bench", 80),
+    }
+
+    body_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Like a real server: block until the client goes away
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    await app(scope, receive, send)
+    disconnected.set()
+
+
+async def run(app, total: int, concurrency: int) -> float:
+    """Return requests per second for total requests at the given concurrency"""
+    # Warm up so the middleware stack is built before timing starts
+    for index in range(200):
+        await call(app, index)
+
+    queue = iter(range(total))
+
+    async def worker():
+        for index in queue:
+            await call(app, index)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    # Logging is measured, but not printed
+    logging.basicConfig(level=logging.CRITICAL)
+
+    before = build_app(LegacySecurityHeadersMiddleware, LegacyRequestLoggingMiddleware)
+    after = build_app(SecurityHeadersMiddleware, RequestLoggingMiddleware)
+
+    before_rps = await run(before, total, concurrency)
+    after_rps = await run(after, total, concurrency)
+
+    print(f"📊 Full middleware stack, {total} requests, concurrency {concurrency}")
+    print(f"   BaseHTTPMiddleware: {before_rps:,.0f} req/s per worker")
+    print(f"   Pure ASGI:          {after_rps:,.0f} req/s per worker")
+    print(f"   Speedup:            {after_rps / before_rps:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
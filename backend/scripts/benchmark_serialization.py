@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Benchmark serialization of a 50-item browse_prompts page
+Compares the previous model_dump -> model_validate -> response_model path
+with validating documents straight into schemas and returning JSON bytes,
+and with validating the projected dicts the raw motor path returns.
+Routes are driven through the ASGI app without a database, so the numbers
+reflect serialization cost only.
+
+Usage: python scripts/benchmark_serialization.py [requests]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path to import app modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from app.core.serialization import json_response, validate_as
+from app.models.prompt import Prompt, PromptStatus
+from app.schemas.common import PaginatedResponse, PaginationParams
+from app.schemas.prompt import PromptSummary
+
+PAGE_SIZE = 50
+
+
+def make_prompts(count: int) -> List[Prompt]:
+    """Prompt documents as Beanie would load them (no database needed)"""
+    now = datetime.utcnow()
+    return [
+        Prompt.model_construct(
+            id=ObjectId(),
+            title=f"Prompt {index}",
+            description="Cinematic portrait with soft rim lighting and shallow depth of field",
+            content="Create a cinematic portrait of ... " * 10,
+            category_id=str(ObjectId()),
+            status=PromptStatus.PUBLISHED,
+            is_featured=index % 7 == 0,
+            is_active=True,
+            image_url=f"/uploads/images/{ObjectId()}.jpg",
+            likes_count=index * 3,
+            created_by=None,
+            created_at=now - timedelta(minutes=index),
+            updated_at=now
+        )
+        for index in range(count)
+    ]
+
+
+def raw_rows(prompts: List[Prompt]) -> List[dict]:
+    """Projected dicts as MongoRepository.find_raw returns them"""
+    fields = PromptSummary.model_fields
+    return [{key: value for key, value in prompt.__dict__.items() if key in fields} for prompt in prompts]
+
+
+def build_app(prompts: List[Prompt]) -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    pagination = PaginationParams(page=1, size=PAGE_SIZE)
+
+    @app.get("/legacy", response_model=PaginatedResponse[PromptSummary])
+    async def legacy():
+        items = []
+        for prompt in prompts:
+            prompt_dict = prompt.model_dump()
+            prompt_dict["id"] = str(prompt.id)
+            items.append(PromptSummary.model_validate(prompt_dict))
+        return PaginatedResponse.create(items, len(prompts), pagination)
+
+    @app.get("/direct", response_model=PaginatedResponse[PromptSummary])
+    async def direct():
+        items = validate_as(List[PromptSummary], prompts)
+        return json_response(PaginatedResponse[PromptSummary].create(items, len(prompts), pagination))
+
+    rows = raw_rows(prompts)
+
+    @app.get("/raw", response_model=PaginatedResponse[PromptSummary])
+    async def raw():
+        items = validate_as(List[PromptSummary], rows)
+        return json_response(PaginatedResponse[PromptSummary].create(items, len(rows), pagination))
+
+    return app
+
+
+async def call(app, path: str) -> bytes:
+    """Send one GET through the ASGI app and return the body"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    body = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def run(app, path: str, total: int) -> float:
+    """Return requests per second for total sequential requests"""
+    for _ in range(50):
+        await call(app, path)
+
+    start = time.perf_counter()
+    for _ in range(total):
+        await call(app, path)
+    return total / (time.perf_counter() - start)
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = build_app(make_prompts(PAGE_SIZE))
+
+    expected = await call(app, "/legacy")
+    if expected != await call(app, "/direct") or expected != await call(app, "/raw"):
+        print("⚠️  Responses differ between paths")
+
+    before_rps = await run(app, "/legacy", total)
+    after_rps = await run(app, "/direct", total)
+    raw_rps = await run(app, "/raw", total)
+
+    print(f"📊 browse_prompts page of {PAGE_SIZE} items, {total} requests")
+    print(f"   model_dump + response_model: {before_rps:,.0f} req/s ({1000 / before_rps:.2f} ms)")
+    print(f"   Direct to JSON bytes:        {after_rps:,.0f} req/s ({1000 / after_rps:.2f} ms)")
+    print(f"   Raw projected dicts:         {raw_rps:,.0f} req/s ({1000 / raw_rps:.2f} ms)")
+    print(f"   Speedup (direct / raw):      {after_rps / before_rps:.2f}x / {raw_rps / before_rps:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -108,7 +108,7 @@ async def clean_and_reset_data():
             
             for prompt in user_prompts:
                 try:
-                    favorite = await favorite_service.add_favorite(user.device_id, str(prompt.id))
+                    await favorite_service.add_favorite(user.device_id, str(prompt.id))
                     favorites_created += 1
                     print(f"     ✅ Favorited: {prompt.title[:40]}...")
                 except Exception as e:
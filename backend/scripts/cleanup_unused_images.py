@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Recount image references and delete images no prompt uses
+Uploaded images are shared by content hash and counted per prompt. Counts
+are rebuilt from the prompts first, then assets that stayed unreferenced
+for the grace period are removed with their files. The grace period keeps
+images that were just uploaded for a prompt that is still being edited.
+
+Usage: python scripts/cleanup_unused_images.py
+"""
+
+import asyncio
+import sys
+import os
+from datetime import timedelta
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.database import DatabaseManager
+from app.services.image_asset_service import ImageAssetService
+
+GRACE_PERIOD = timedelta(days=1)
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def cleanup_unused_images():
+    """Rebuild reference counts and delete unreferenced images"""
+
+    print("🚀 Cleaning up unused images...")
+
+    db_manager = DatabaseManager()
+    await db_manager.connect()
+    await db_manager.init_beanie()
+
+    try:
+        service = ImageAssetService()
+
+        # Step 1: Recount references from prompts
+        print("\n🔢 Step 1: Recounting image references...")
+        referenced = await service.recount_references()
+        print(f"   ✅ {referenced} images are used by prompts")
+
+        # Step 2: Delete unreferenced images
+        print("\n🧹 Step 2: Deleting unreferenced images...")
+        upload_dir = settings.upload_dir_path
+        deleted = 0
+        for asset in await service.get_unreferenced(GRACE_PERIOD):
+            # The record goes first, and only while still unreferenced and unclaimed
+            if not await service.delete(asset["id"], GRACE_PERIOD):
+                continue
+            remove_file(os.path.join(upload_dir, "images", asset["filename"]))
+            if asset.get("thumbnail_filename"):
+                remove_file(os.path.join(upload_dir, "thumbnails", asset["thumbnail_filename"]))
+            for variant in asset.get("variants", []):
+                remove_file(os.path.join(upload_dir, "variants", variant["url"].rsplit("/", 1)[-1]))
+            deleted += 1
+        print(f"   ✅ Deleted {deleted} unused images")
+
+        print("\n✅ Image cleanup completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Error during cleanup: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        await db_manager.disconnect()
+        print("\n🔌 Disconnected from database")
+
+
+if __name__ == "__main__":
+    asyncio.run(cleanup_unused_images())
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Make favorites unique per (device_id, prompt_id) and recount prompt likes
+The API does the same on startup when the unique index is missing; run
+this ahead of a deploy to keep that work out of the first startup, or if
+startup reports it could not prepare the index. Duplicate favorites (from
+racing double taps) are removed, keeping the oldest, and likes_count is
+rebuilt from the favorites.
+
+Usage: python scripts/migrate_favorites_unique_index.py
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import DatabaseManager
+from app.db.migrations import FAVORITES_UNIQUE_INDEX, ensure_unique_favorites
+from app.services.prompt_service import PromptService
+
+
+async def migrate_favorites():
+    """Remove duplicate favorites, swap the index and recount likes"""
+
+    print("🚀 Migrating favorites to a unique (device_id, prompt_id) index...")
+
+    # Beanie is not initialized yet: it would try to create the conflicting index
+    db_manager = DatabaseManager()
+    await db_manager.connect()
+    favorites = db_manager.database["favorites"]
+
+    try:
+        # Steps 1-2: Remove duplicates (keeping the oldest) and swap the index
+        print("\n🧹 Step 1-2: Removing duplicate favorites and creating the unique index...")
+        indexes = await favorites.index_information()
+        if FAVORITES_UNIQUE_INDEX in indexes:
+            print(f"   ✅ {FAVORITES_UNIQUE_INDEX} already exists")
+        else:
+            removed = await ensure_unique_favorites(db_manager.database)
+            print(f"   ✅ Deleted {removed} duplicate favorites")
+            print(f"   ✅ Created {FAVORITES_UNIQUE_INDEX}")
+
+        # Step 3: Recount likes from favorites (the index exists now, so Beanie can start)
+        print("\n❤️  Step 3: Recounting prompt likes...")
+        await db_manager.init_beanie()
+        await PromptService().repair_likes_counts()
+        print("   ✅ Recounted prompt likes")
+
+        print("\n✅ Migration completed successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Error during migration: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        await db_manager.disconnect()
+        print("\n🔌 Disconnected from database")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_favorites())
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Rebuild prompt likes_count (the denormalized favorites count) from favorites
+Safe to run at any time, e.g. from cron; only prompts whose count drifted
+are written.
+
+Usage: python scripts/repair_likes_counts.py
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.database import DatabaseManager
+from app.services.prompt_service import PromptService
+
+
+async def repair_likes_counts():
+    """Recount favorites for every prompt in one aggregation"""
+
+    print("🚀 Repairing prompt likes counts...")
+
+    db_manager = DatabaseManager()
+    await db_manager.connect()
+    await db_manager.init_beanie()
+
+    try:
+        await PromptService().repair_likes_counts()
+        print("\n✅ Likes counts repaired successfully!")
+
+    except Exception as e:
+        print(f"\n❌ Error during repair: {str(e)}")
+        import traceback
+        traceback.print_exc()
+
+    finally:
+        await db_manager.disconnect()
+        print("\n🔌 Disconnected from database")
+
+
+if __name__ == "__main__":
+    asyncio.run(repair_likes_counts())
@@ -0,0 +1,52 @@
+"""
+CatalogBundleBuilder tests: writing under the build lock
+"""
+import asyncio
+import fcntl
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.catalog_bundle import CatalogBundleBuilder
+from app.core.response_cache import ResponseCache
+from app.db.base import MongoRepository
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch):
+    async def find_raw(self, filters, fields=None, **kwargs):
+        return []
+
+    monkeypatch.setattr(MongoRepository, "find_raw", find_raw)
+    return CatalogBundleBuilder(ResponseCache(ttl=60), str(tmp_path), debounce=0, keep=2)
+
+
+def test_cancelled_build_does_not_keep_the_lock(builder):
+    async def scenario():
+        os.makedirs(builder.directory, exist_ok=True)
+        with open(os.path.join(builder.directory, ".lock"), "a") as other_worker:
+            fcntl.flock(other_worker, fcntl.LOCK_EX)
+            task = asyncio.create_task(builder.build())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            fcntl.flock(other_worker, fcntl.LOCK_UN)
+
+        manifest = await asyncio.wait_for(builder.build(), 2)
+        assert manifest["prompts"] == 0
+        assert builder.bundle_path(manifest["filename"]) is not None
+
+    asyncio.run(scenario())
+
+
+def test_bundle_read_before_a_newer_one_is_dropped(builder):
+    async def scenario():
+        newer = await builder.build()
+        stale_at = datetime.fromisoformat(newer["generated_at"]) - timedelta(seconds=1)
+        manifest, written = await asyncio.to_thread(builder._write_locked, b"{}", stale_at, 0, 0)
+        assert not written
+        assert manifest == newer
+
+    asyncio.run(scenario())
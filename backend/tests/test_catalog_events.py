@@ -0,0 +1,52 @@
+"""
+CatalogEventBroadcaster tests: connection admission and release
+"""
+import asyncio
+import gc
+
+from app.core.catalog_events import CatalogEventBroadcaster
+from app.core.response_cache import ResponseCache
+
+
+def test_burst_of_connects_never_exceeds_the_limit():
+    async def scenario():
+        events = CatalogEventBroadcaster(ResponseCache(ttl=60), heartbeat=60, max_connections=3)
+        streams = await asyncio.gather(*(events.open() for _ in range(10)))
+
+        admitted = [stream for stream in streams if stream is not None]
+        assert len(admitted) == 3
+        assert events.connections == 3
+
+        await admitted[0].aclose()
+        assert events.connections == 2
+        assert await events.open() is not None
+
+    asyncio.run(scenario())
+
+
+def test_unread_stream_frees_its_slot():
+    async def scenario():
+        events = CatalogEventBroadcaster(ResponseCache(ttl=60), heartbeat=60, max_connections=1)
+        stream = await events.open()
+        assert events.connections == 1
+
+        # The response never started reading it (e.g. the client left at once)
+        del stream
+        gc.collect()
+        # The loop's async generator finalizer closes it on a later iteration
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert events.connections == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_sends_retry_then_current_version():
+    async def scenario():
+        events = CatalogEventBroadcaster(ResponseCache(ttl=60), heartbeat=60, max_connections=1)
+        stream = await events.open()
+        assert await stream.__anext__() == b"retry: 5000\n\n"
+        assert b"event: catalog" in await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(scenario())
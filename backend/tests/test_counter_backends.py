@@ -0,0 +1,268 @@
+"""
+Counter backend tests: in-process, shared-memory and Redis-protocol storage
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.counter_backends import (
+    ExpiringCounters, MemoryCounterBackend, RedisCounterBackend,
+    RedisError, SharedMemoryCounterBackend
+)
+
+
+class RespStubServer:
+    """Minimal Redis-protocol server implementing the commands the backend sends"""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.values = {}
+        self.commands = []
+        self._server = None
+        self._writers = set()
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self._server.sockets[0].getsockname()[1]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}127.0.0.1:{port}/0"
+
+    async def stop(self) -> None:
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                command = await self._read_command(reader)
+                self.commands.append(command)
+                writer.write(self._reply(command))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _read_command(self, reader):
+        count = int((await reader.readuntil(b"\r\n"))[1:-2])
+        args = []
+        for _ in range(count):
+            length = int((await reader.readuntil(b"\r\n"))[1:-2])
+            args.append((await reader.readexactly(length + 2))[:-2].decode())
+        return args
+
+    def _live(self, key):
+        entry = self.values.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= time.time():
+            del self.values[key]
+            entry = None
+        return entry
+
+    def _reply(self, command) -> bytes:
+        name = command[0].upper()
+        if name == "AUTH":
+            return b"+OK\r\n" if command[1] == self.password else b"-ERR invalid password\r\n"
+        if name == "SELECT":
+            return b"+OK\r\n"
+        if name == "SET":
+            key, value, options = command[1], command[2], [arg.upper() for arg in command[3:]]
+            if "NX" in options and self._live(key) is not None:
+                return b"$-1\r\n"
+            expires_at = time.time() + int(command[4]) if "EX" in options else None
+            self.values[key] = [value, expires_at]
+            return b"+OK\r\n"
+        if name == "INCRBY":
+            entry = self._live(command[1])
+            if entry is None:
+                entry = self.values[command[1]] = ["0", None]
+            entry[0] = str(int(entry[0]) + int(command[2]))
+            return b":%d\r\n" % int(entry[0])
+        if name == "GET":
+            return self._bulk(self._live(command[1]))
+        if name == "MGET":
+            return b"*%d\r\n" % (len(command) - 1) + b"".join(
+                self._bulk(self._live(key)) for key in command[1:]
+            )
+        return b"-ERR unknown command\r\n"
+
+    @staticmethod
+    def _bulk(entry) -> bytes:
+        if entry is None:
+            return b"$-1\r\n"
+        value = entry[0].encode()
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def test_expiring_counters_keep_ttl_on_increment():
+    counters = ExpiringCounters()
+    now = time.time()
+    assert counters.incr("a", 2, ttl=10, now=now) == 2
+    assert counters.incr("a", 3, ttl=60, now=now + 5) == 5
+    # The TTL set at creation is kept: the key expires at now + 10
+    assert counters.get("a", now=now + 9) == 5
+    assert counters.get("a", now=now + 12) == 0
+    # The timer wheel dropped it
+    assert len(counters) == 0
+
+
+def test_expiring_counters_setdefault():
+    counters = ExpiringCounters()
+    now = time.time()
+    assert counters.setdefault("a", 7, ttl=10, now=now) == 7
+    assert counters.setdefault("a", 1, ttl=10, now=now + 1) == 7
+    assert counters.setdefault("a", 1, ttl=10, now=now + 12) == 1
+
+
+def test_memory_backend():
+    async def scenario():
+        backend = MemoryCounterBackend()
+        assert await backend.incr_many([("a", 1, 60), ("b", 5, 60), ("a", 2, 60)]) == [1, 5, 3]
+        assert await backend.get_many(["a", "b", "missing"]) == [3, 5, 0]
+        assert await backend.setdefault("a", 10, 60) == 3
+        assert await backend.setdefault("c", 10, 60) == 10
+        assert await backend.incr("c") == 11
+
+    asyncio.run(scenario())
+
+
+def test_shared_memory_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "counters")
+
+    async def scenario():
+        first = SharedMemoryCounterBackend(path, slots=64)
+        second = SharedMemoryCounterBackend(path, slots=1024)
+        # The second instance adopts the table size already on disk
+        assert second.slots == 64
+
+        assert await first.incr_many([("a", 2, 60), ("b", 1, 60)]) == [2, 1]
+        assert await second.incr("a", 3) == 5
+        assert await first.get_many(["a", "b", "missing"]) == [5, 1, 0]
+        assert await second.setdefault("a", 100, 60) == 5
+        assert await second.setdefault("c", 100, 60) == 100
+        assert await first.get_many(["c"]) == [100]
+
+        await first.close()
+        await second.close()
+
+    asyncio.run(scenario())
+
+
+def test_shared_memory_backend_reuses_expired_slots(tmp_path):
+    async def scenario():
+        backend = SharedMemoryCounterBackend(str(tmp_path / "counters"), slots=64)
+        await backend.incr("a", 4, ttl=1)
+        assert await backend.get_many(["a"]) == [4]
+        await asyncio.sleep(1.1)
+        assert await backend.get_many(["a"]) == [0]
+        assert await backend.incr("a", 1, ttl=60) == 1
+        await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_shared_memory_backend_full_table_fails_open(tmp_path):
+    async def scenario():
+        backend = SharedMemoryCounterBackend(str(tmp_path / "counters"), slots=4, max_probe=4)
+        keys = ["a", "b", "c", "d"]
+        assert await backend.incr_many([(key, 1, 60) for key in keys]) == [1, 1, 1, 1]
+
+        # No free slot: the new key is counted for the call but not stored...
+        assert await backend.incr("e", 1) == 1
+        assert await backend.get_many(["e"]) == [0]
+        # ...and the live counters are left alone
+        assert await backend.get_many(keys) == [1, 1, 1, 1]
+        await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_shared_memory_backend_concurrent_increments(tmp_path):
+    path = str(tmp_path / "counters")
+
+    async def scenario():
+        backends = [SharedMemoryCounterBackend(path, slots=64) for _ in range(3)]
+        await asyncio.gather(*(
+            backend.incr("hits", 1)
+            for backend in backends
+            for _ in range(50)
+        ))
+        assert await backends[0].get_many(["hits"]) == [150]
+        for backend in backends:
+            await backend.close()
+
+    asyncio.run(scenario())
+
+
+def test_shared_memory_backend_cancelled_wait_leaves_lock_free(tmp_path):
+    path = str(tmp_path / "counters")
+
+    async def scenario():
+        holder = SharedMemoryCounterBackend(path, slots=64)
+        waiter = SharedMemoryCounterBackend(path, slots=64)
+        with holder._locked():
+            task = asyncio.create_task(waiter.incr("hits", 1))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        # Nobody holds the flock, so both instances can still count
+        assert await asyncio.wait_for(holder.incr("hits", 1), 1) == 1
+        assert await asyncio.wait_for(waiter.incr("hits", 1), 1) == 2
+        await holder.close()
+        await waiter.close()
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_against_resp_stub():
+    async def scenario():
+        server = RespStubServer(password="secret")
+        backend = RedisCounterBackend(await server.start())
+
+        assert await backend.incr_many([("a", 1, 60), ("b", 5, 60), ("a", 2, 60)]) == [1, 5, 3]
+        assert await backend.get_many(["a", "b", "missing"]) == [3, 5, 0]
+        assert await backend.get_many([]) == []
+        assert await backend.setdefault("a", 10, 60) == 3
+        assert await backend.setdefault("c", 10, 60) == 10
+
+        # Authenticated once, then every batch is pipelined on the same connection
+        assert server.commands[0] == ["AUTH", "secret"]
+        assert server.commands[1:3] == [["SET", "a", "0", "EX", "60", "NX"], ["INCRBY", "a", "1"]]
+
+        await backend.close()
+        await server.stop()
+
+    asyncio.run(scenario())
+
+
+def test_redis_backend_error_reply_and_reconnect():
+    async def scenario():
+        server = RespStubServer(password="secret")
+        url = await server.start()
+        backend = RedisCounterBackend(url.replace("secret", "wrong"))
+        with pytest.raises(RedisError):
+            await backend.incr("a")
+        # The unauthenticated connection is dropped: the retry authenticates again
+        with pytest.raises(RedisError):
+            await backend.incr("a")
+        assert [command[0] for command in server.commands] == ["AUTH", "AUTH"]
+        await backend.close()
+
+        backend = RedisCounterBackend(url)
+        assert await backend.incr("a") == 1
+        await server.stop()
+        # The server went away: the error surfaces and the next call reconnects
+        with pytest.raises((OSError, asyncio.IncompleteReadError)):
+            await backend.incr("a")
+        server = RespStubServer(password="secret")
+        backend.port = int((await server.start()).rsplit(":", 1)[1].split("/")[0])
+        assert await backend.incr("a") == 1
+        await backend.close()
+        await server.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,119 @@
+"""
+BatchedCounters tests: local estimates, batched flushes and seeding
+"""
+import asyncio
+
+from app.core.counter_backends import MemoryCounterBackend
+from app.core.counters import BatchedCounters
+
+
+class FailingBackend(MemoryCounterBackend):
+    """Memory backend whose writes fail until told otherwise"""
+
+    def __init__(self):
+        super().__init__()
+        self.failing = True
+        self.batches = []
+
+    async def incr_many(self, items):
+        self.batches.append(list(items))
+        if self.failing:
+            raise ConnectionError("backend down")
+        return await super().incr_many(items)
+
+
+def test_add_is_local_until_flush():
+    async def scenario():
+        backend = MemoryCounterBackend()
+        counters = BatchedCounters(backend)
+        assert counters.add("a", 1, 60) == 1
+        assert counters.add("a", 2, 60) == 3
+        assert await backend.get_many(["a"]) == [0]
+
+        await counters.flush()
+        assert await backend.get_many(["a"]) == [3]
+        assert counters.value("a") == 3
+
+    asyncio.run(scenario())
+
+
+def test_flush_brings_back_other_workers_totals():
+    async def scenario():
+        backend = MemoryCounterBackend()
+        first = BatchedCounters(backend)
+        second = BatchedCounters(backend)
+
+        first.add("a", 2, 60)
+        second.add("a", 5, 60)
+        await first.flush()
+        await second.flush()
+        assert second.value("a") == 7
+        # first only learns about second's increments on its next flush
+        assert first.value("a") == 2
+        first.add("a", 1, 60)
+        await first.flush()
+        assert first.value("a") == 8
+
+    asyncio.run(scenario())
+
+
+def test_flush_batches_keys_and_requeues_on_failure():
+    async def scenario():
+        backend = FailingBackend()
+        counters = BatchedCounters(backend)
+        counters.add("a", 1, 60)
+        counters.add("b", 1, 60)
+        counters.add("a", 1, 60)
+
+        await counters.flush()
+        assert backend.batches == [[("a", 2, 60), ("b", 1, 60)]]
+        # Nothing is lost: the failed batch is still counted locally
+        assert counters.value("a") == 2
+
+        counters.add("a", 1, 60)
+        backend.failing = False
+        await counters.flush()
+        assert backend.batches[-1] == [("a", 3, 60), ("b", 1, 60)]
+        assert await backend.get_many(["a", "b"]) == [3, 1]
+        assert counters.value("a") == 3
+
+    asyncio.run(scenario())
+
+
+def test_max_pending_schedules_a_flush():
+    async def scenario():
+        backend = MemoryCounterBackend()
+        counters = BatchedCounters(backend, max_pending=2)
+        counters.add("a", 1, 60)
+        counters.add("b", 1, 60)
+        await asyncio.sleep(0)
+        assert await backend.get_many(["a", "b"]) == [1, 1]
+
+    asyncio.run(scenario())
+
+
+def test_seed_keeps_the_first_workers_value():
+    async def scenario():
+        backend = MemoryCounterBackend()
+        first = BatchedCounters(backend)
+        second = BatchedCounters(backend)
+
+        assert await first.seed("quota", 40, 60) == 40
+        assert await second.seed("quota", 10, 60) == 40
+        # Pending local increments sit on top of the seeded value
+        second.add("quota", 1, 60)
+        assert await second.seed("quota", 10, 60) == 41
+
+    asyncio.run(scenario())
+
+
+def test_stop_flushes_what_is_left():
+    async def scenario():
+        backend = MemoryCounterBackend()
+        counters = BatchedCounters(backend, flush_interval=60)
+        counters.start()
+        counters.add("a", 4, 60)
+        await counters.stop()
+        assert await backend.get_many(["a"]) == [4]
+
+    asyncio.run(scenario())
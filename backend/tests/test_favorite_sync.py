@@ -0,0 +1,148 @@
+"""
+FavoriteService.sync_favorites tests: likes follow the writes this sync made
+"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from pymongo import DeleteOne
+from pymongo.errors import BulkWriteError
+
+from app.schemas.favorite import FavoriteOperation
+from app.services import favorite_service as favorite_module
+from app.services.favorite_service import FavoriteService
+from app.services.prompt_service import PromptService
+
+
+class FakeFavorites:
+    """Favorites of one device keyed by prompt id (also their _id), with the writes sync_favorites makes"""
+
+    def __init__(self, existing=None):
+        self.rows = dict(existing or {})
+        # Favorites another request inserts or deletes while the sync's bulk write runs
+        self.racing_inserts = []
+        self.racing_deletes = []
+
+    async def bulk_write(self, operations):
+        upserted = {}
+        removed = 0
+        errors = []
+        for prompt_id in self.racing_deletes:
+            self.rows.pop(prompt_id, None)
+        for index, operation in enumerate(operations):
+            if isinstance(operation, DeleteOne):
+                removed += self.rows.pop(operation._filter["_id"], None) is not None
+                continue
+            prompt_id = operation._filter["prompt_id"]
+            if prompt_id in self.racing_inserts:
+                self.rows[prompt_id] = datetime.utcnow()
+                errors.append({"index": index, "code": 11000})
+            elif prompt_id not in self.rows:
+                self.rows[prompt_id] = operation._doc["$setOnInsert"]["created_at"]
+                upserted[index] = prompt_id
+        if errors:
+            raise BulkWriteError({
+                "writeErrors": errors,
+                "upserted": [{"index": index, "_id": _id} for index, _id in upserted.items()],
+                "nRemoved": removed
+            })
+        return SimpleNamespace(upserted_ids=upserted, deleted_count=removed)
+
+    async def find_raw(self, filters, fields=None):
+        wanted = filters.get("prompt_id", {}).get("$in", self.rows)
+        return [
+            {"id": prompt_id, "prompt_id": prompt_id, "created_at": created_at}
+            for prompt_id, created_at in self.rows.items()
+            if prompt_id in wanted
+        ]
+
+
+class FakeFavoritesCache:
+    async def reset(self, device_id):
+        pass
+
+
+def run_sync(monkeypatch, favorites, operations, recounted=None):
+    adjusted = {}
+
+    async def get_existing_ids(self, prompt_ids):
+        return set(prompt_ids)
+
+    async def adjust_likes(self, deltas):
+        adjusted.update(deltas)
+
+    async def repair_likes_counts(self, prompt_ids=None):
+        recounted.extend(prompt_ids)
+
+    monkeypatch.setattr(PromptService, "get_existing_ids", get_existing_ids)
+    monkeypatch.setattr(PromptService, "adjust_likes", adjust_likes)
+    monkeypatch.setattr(PromptService, "repair_likes_counts", repair_likes_counts)
+    monkeypatch.setattr(favorite_module, "get_favorites_cache", lambda: FakeFavoritesCache())
+
+    service = FavoriteService()
+    service.repository = favorites
+    merged, applied = asyncio.run(service.sync_favorites("device", operations))
+    return merged, applied, adjusted
+
+
+def operation(prompt_id, action, minutes_ago=0):
+    return FavoriteOperation(
+        prompt_id=prompt_id,
+        action=action,
+        timestamp=datetime.utcnow() - timedelta(minutes=minutes_ago)
+    )
+
+
+def test_likes_follow_inserts_and_deletes(monkeypatch):
+    favorites = FakeFavorites({"kept": datetime.utcnow() - timedelta(days=1), "gone": datetime.utcnow() - timedelta(days=1)})
+    merged, applied, adjusted = run_sync(monkeypatch, favorites, [
+        operation("new", "add"),
+        operation("kept", "add"),
+        operation("gone", "remove"),
+        operation("never-had", "remove"),
+    ])
+
+    assert adjusted == {"new": 1, "gone": -1}
+    assert applied == 2
+    assert sorted(merged) == ["kept", "new"]
+
+
+def test_racing_toggle_is_not_counted_twice(monkeypatch):
+    favorites = FakeFavorites()
+    # A toggle inserts (and counts) "raced" while the sync's upsert runs
+    favorites.racing_inserts.append("raced")
+    merged, applied, adjusted = run_sync(monkeypatch, favorites, [
+        operation("raced", "add"),
+        operation("other", "add"),
+    ])
+
+    assert adjusted == {"other": 1}
+    assert applied == 1
+    assert sorted(merged) == ["other", "raced"]
+
+
+def test_remove_older_than_the_add_keeps_the_favorite(monkeypatch):
+    favorites = FakeFavorites({"readded": datetime.utcnow()})
+    merged, applied, adjusted = run_sync(monkeypatch, favorites, [operation("readded", "remove", minutes_ago=10)])
+
+    assert adjusted == {}
+    assert applied == 0
+    assert merged == ["readded"]
+
+
+def test_remove_racing_a_toggle_recounts_instead_of_guessing(monkeypatch):
+    day_ago = datetime.utcnow() - timedelta(days=1)
+    favorites = FakeFavorites({"raced": day_ago, "gone": day_ago})
+    # A toggle deletes (and uncounts) "raced" between the sync's read and its delete
+    favorites.racing_deletes.append("raced")
+    recounted = []
+    merged, applied, adjusted = run_sync(monkeypatch, favorites, [
+        operation("raced", "remove"),
+        operation("gone", "remove"),
+        operation("new", "add"),
+    ], recounted)
+
+    assert adjusted == {"new": 1}
+    assert sorted(recounted) == ["gone", "raced"]
+    assert applied == 2
+    assert merged == ["new"]
@@ -0,0 +1,84 @@
+"""
+FavoriteService add/toggle tests: a like is counted only for a favorite that was stored
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError
+
+from app.services import favorite_service as favorite_module
+from app.services.favorite_service import FavoriteService
+from app.services.prompt_service import PromptService
+
+
+class FakeFavorites:
+    """Favorites as a set of (device_id, prompt_id), with a unique index"""
+
+    def __init__(self, existing=()):
+        self.rows = set(existing)
+
+    async def insert_raw(self, doc):
+        key = (doc["device_id"], doc["prompt_id"])
+        if key in self.rows:
+            raise DuplicateKeyError("duplicate favorite")
+        self.rows.add(key)
+
+    async def delete_where(self, filters):
+        key = (filters["device_id"], filters["prompt_id"])
+        if key not in self.rows:
+            return False
+        self.rows.remove(key)
+        return True
+
+
+class FakeFavoritesCache:
+    async def changed(self, device_id, prompt_id, favorited):
+        pass
+
+
+@pytest.fixture
+def service(monkeypatch):
+    likes = {"known": 0}
+
+    async def increment_like(self, prompt_id):
+        if prompt_id == "failing":
+            raise ConnectionError("prompts unavailable")
+        if prompt_id not in likes:
+            return False
+        likes[prompt_id] += 1
+        return True
+
+    async def decrement_like(self, prompt_id):
+        likes[prompt_id] = max(0, likes[prompt_id] - 1)
+
+    monkeypatch.setattr(PromptService, "increment_like", increment_like)
+    monkeypatch.setattr(PromptService, "decrement_like", decrement_like)
+    monkeypatch.setattr(favorite_module, "get_favorites_cache", lambda: FakeFavoritesCache())
+
+    service = FavoriteService()
+    service.repository = FakeFavorites()
+    service.likes = likes
+    return service
+
+
+def test_toggle_counts_each_change_once(service):
+    assert asyncio.run(service.toggle_favorite("device", "known")) is True
+    assert service.likes["known"] == 1
+    assert asyncio.run(service.toggle_favorite("device", "known")) is False
+    assert service.likes["known"] == 0
+
+
+def test_duplicate_add_counts_nothing(service):
+    asyncio.run(service.add_favorite("device", "known"))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(service.add_favorite("device", "known"))
+    assert error.value.status_code == 400
+    assert service.likes["known"] == 1
+
+
+@pytest.mark.parametrize("prompt_id, expected", [("missing", HTTPException), ("failing", ConnectionError)])
+def test_failed_count_takes_the_favorite_back_out(service, prompt_id, expected):
+    with pytest.raises(expected):
+        asyncio.run(service.toggle_favorite("device", prompt_id))
+    assert service.repository.rows == set()
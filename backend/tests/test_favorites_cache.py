@@ -0,0 +1,104 @@
+"""
+FavoritesCache tests: generation checks across workers and bounded prompt numbering
+"""
+import asyncio
+
+from app.core.counter_backends import MemoryCounterBackend
+from app.core.counters import BatchedCounters
+from app.core.favorites_cache import FavoritesCache
+from app.core.response_cache import ResponseCache
+
+
+class CountingBackend(MemoryCounterBackend):
+    """Memory backend that counts generation reads"""
+
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+
+    async def get_many(self, keys):
+        self.reads += 1
+        return await super().get_many(keys)
+
+
+def make_cache(backend, **options):
+    return FavoritesCache(
+        BatchedCounters(backend),
+        ResponseCache(ttl=60),
+        max_devices=100,
+        ttl=600,
+        summaries_ttl=60,
+        **options
+    )
+
+
+def loader(favorites, calls):
+    async def load():
+        calls.append(1)
+        return list(favorites)
+    return load
+
+
+def test_generation_is_checked_once_per_interval():
+    async def scenario():
+        backend = CountingBackend()
+        cache = make_cache(backend, check_interval=60)
+        calls = []
+        load = loader(["p1"], calls)
+
+        for _ in range(5):
+            assert await cache.contains("device", "p1", load)
+        assert backend.reads == 1
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_toggle_on_another_worker_is_seen_after_the_interval():
+    async def scenario():
+        backend = CountingBackend()
+        first = make_cache(backend, check_interval=0.05)
+        second = make_cache(backend, check_interval=0.05)
+        favorites = ["p1"]
+        calls = []
+        load = loader(favorites, calls)
+
+        assert await first.favorited("device", ["p1", "p2"], load) == {"p1"}
+        favorites.append("p2")
+        await second.changed("device", "p2", True)
+
+        await asyncio.sleep(0.1)
+        assert await first.favorited("device", ["p1", "p2"], load) == {"p1", "p2"}
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_own_toggles_keep_the_entry_current():
+    async def scenario():
+        cache = make_cache(CountingBackend(), check_interval=0)
+        calls = []
+        load = loader(["p1"], calls)
+
+        assert await cache.prompt_ids("device", load) == ["p1"]
+        await cache.changed("device", "p2", True)
+        await cache.changed("device", "p1", False)
+        assert await cache.prompt_ids("device", load) == ["p2"]
+        assert len(calls) == 1
+
+    asyncio.run(scenario())
+
+
+def test_prompt_numbering_is_rebuilt_past_the_bound():
+    async def scenario():
+        cache = make_cache(CountingBackend(), max_prompts=10)
+        calls = []
+        for device in range(5):
+            prompt_ids = [f"d{device}-p{n}" for n in range(4)]
+            assert await cache.prompt_ids(f"device{device}", loader(prompt_ids, calls)) == prompt_ids
+            assert len(cache.index) <= 10 + 4
+
+        # Earlier devices were dropped with the old numbering and reload correctly
+        assert await cache.prompt_ids("device0", loader(["d0-p0"], calls)) == ["d0-p0"]
+
+    asyncio.run(scenario())
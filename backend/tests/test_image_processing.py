@@ -0,0 +1,44 @@
+"""
+ImageProcessor tests: running jobs and timing them out
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core.image_processing import ImageProcessingError, ImageProcessor
+
+
+def slow(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def test_run_returns_the_result():
+    async def scenario():
+        processor = ImageProcessor(workers=0, max_concurrency=2, timeout=5)
+        assert await processor.run(slow, 0.01) == 0.01
+
+    asyncio.run(scenario())
+
+
+def test_run_times_out_including_the_wait_for_a_slot():
+    async def scenario():
+        processor = ImageProcessor(workers=0, max_concurrency=1, timeout=0.2)
+        first = asyncio.ensure_future(processor.run(slow, 0.15))
+        await asyncio.sleep(0.01)
+        # Waits ~0.14s for the slot, then needs 0.15s more: over the 0.2s budget
+        with pytest.raises(ImageProcessingError):
+            await processor.run(slow, 0.15)
+        assert await first == 0.15
+
+    asyncio.run(scenario())
+
+
+def test_job_errors_propagate():
+    async def scenario():
+        processor = ImageProcessor(workers=0, max_concurrency=1, timeout=5)
+        with pytest.raises(TypeError):
+            await processor.run(slow, "not a number")
+
+    asyncio.run(scenario())
@@ -0,0 +1,49 @@
+"""
+Mobile prompt endpoints: page size limits and what a batch fetch may read
+"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.mobile.prompts import router
+from app.core.device_auth import get_authenticated_device_user
+from app.db.base import MongoRepository
+from app.models.prompt import Prompt
+from app.services.prompt_service import PromptService
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router, prefix="/api/mobile/prompts")
+    app.dependency_overrides[get_authenticated_device_user] = lambda: SimpleNamespace(device_id="device")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/api/mobile/prompts", "/api/mobile/prompts/most-favorited"])
+@pytest.mark.parametrize("limit", [0, -1, 51])
+def test_lists_reject_limits_out_of_range(client, path, limit):
+    assert client.get(path, params={"limit": limit}).status_code == 422
+
+
+@pytest.mark.parametrize("limit", [0, -5])
+def test_find_raw_rejects_non_positive_limits(limit):
+    with pytest.raises(ValueError):
+        asyncio.run(MongoRepository(Prompt).find_raw({}, limit=limit))
+
+
+def test_batch_only_reads_published_prompts(monkeypatch):
+    filters_seen = []
+    
+    async def find_raw(self, filters, fields=None, **kwargs):
+        filters_seen.append(filters)
+        return []
+    
+    monkeypatch.setattr(MongoRepository, "find_raw", find_raw)
+    prompt_id = "0123456789abcdef01234567"
+    assert asyncio.run(PromptService().get_raw_by_ids([prompt_id], published_only=True)) == {}
+    assert filters_seen[0]["status"] == "published"
+    assert filters_seen[0]["is_active"] is True
@@ -0,0 +1,67 @@
+"""
+RateLimitMiddleware tests: route keys and rejected requests
+"""
+import asyncio
+
+from app.core.counter_backends import MemoryCounterBackend
+from app.core.counters import BatchedCounters
+from app.core.middleware import RateLimitMiddleware
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def call(middleware, path, ip="10.0.0.1", headers=()):
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": path,
+        "client": (ip, 1234),
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+    }
+    statuses = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            statuses.append(message["status"])
+
+    await middleware(scope, receive, send)
+    return statuses[0]
+
+
+def test_route_limit_ignores_client_chosen_device_ids():
+    async def scenario():
+        middleware = RateLimitMiddleware(
+            ok_app, calls=100, route_limits={"/api/admin/auth/login": (3, 60)},
+            counters=BatchedCounters(MemoryCounterBackend())
+        )
+        statuses = [
+            await call(middleware, "/api/admin/auth/login", headers=[("x-device-id", f"device-{n}")])
+            for n in range(5)
+        ]
+        assert statuses == [200, 200, 200, 429, 429]
+        # Another client still has its own bucket
+        assert await call(middleware, "/api/admin/auth/login", ip="10.0.0.2") == 200
+
+    asyncio.run(scenario())
+
+
+def test_rejected_requests_count_against_no_limit():
+    async def scenario():
+        counters = BatchedCounters(MemoryCounterBackend())
+        middleware = RateLimitMiddleware(
+            ok_app, calls=100, route_limits={"/api/admin/auth/login": (1, 60)}, counters=counters
+        )
+        assert await call(middleware, "/api/admin/auth/login") == 200
+        for _ in range(5):
+            assert await call(middleware, "/api/admin/auth/login") == 429
+        # Only the allowed request reached the per-IP limit
+        ip_counts = [counters.value(key) for key in counters._pending if key.startswith("rl:ip:")]
+        assert ip_counts == [1]
+
+    asyncio.run(scenario())
@@ -0,0 +1,54 @@
+"""
+ResponseCache tests: cache keys and invalidation generations across workers
+"""
+import asyncio
+
+from starlette.requests import Request
+
+from app.core.counter_backends import MemoryCounterBackend
+from app.core.counters import BatchedCounters
+from app.core.response_cache import ResponseCache, cache_key
+
+
+def make_request(path: str, query: str = "") -> Request:
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [],
+    })
+
+
+def test_cache_key_ignores_query_string():
+    assert cache_key(make_request("/api/mobile/categories", "x=1")) == "/api/mobile/categories"
+    assert cache_key(make_request("/api/mobile/categories")) == "/api/mobile/categories"
+
+
+def test_generation_never_goes_backwards_after_sync():
+    async def scenario():
+        backend = MemoryCounterBackend()
+        first = ResponseCache(ttl=60, counters=BatchedCounters(backend))
+        second = ResponseCache(ttl=60, counters=BatchedCounters(backend))
+        first.watch("prompts")
+        second.watch("prompts")
+
+        for _ in range(3):
+            first.invalidate("prompts")
+        await first.counters.flush()
+        await second.sync()
+        assert second.generation("prompts") == 3
+
+        # second's counters never saw the backend total, only sync() did
+        second.set("prompts", "/api/mobile/prompts", [], '"v1"')
+        second.invalidate("prompts")
+        assert second.generation("prompts") == 4
+        await second.counters.flush()
+        await second.sync()
+        assert second.generation("prompts") == 4
+        # The local invalidation is not mistaken for a remote one
+        second.set("prompts", "/api/mobile/prompts", [], '"v2"')
+        await second.sync()
+        assert second.get("prompts", "/api/mobile/prompts") is not None
+
+    asyncio.run(scenario())
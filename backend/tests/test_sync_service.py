@@ -0,0 +1,110 @@
+"""
+SyncService tests: paging through full and delta syncs
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.sync_service import SyncService, decode_sync_token, encode_sync_token
+
+
+class FakeRepository:
+    """In-memory stand-in for MongoRepository.find_raw over a handful of documents"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def find_raw(self, filters, fields=None, skip=0, limit=None, sort=None):
+        rows = [doc for doc in self.docs if self._matches(doc, filters)]
+        for field, direction in reversed(sort or []):
+            rows.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        rows = rows[skip:skip + limit if limit else None]
+        return [{"id": doc["_id"], **{k: v for k, v in doc.items() if k != "_id"}} for doc in rows]
+
+    def _matches(self, doc, filters):
+        for field, condition in filters.items():
+            if field == "$or":
+                if not any(self._matches(doc, option) for option in condition):
+                    return False
+            elif isinstance(condition, dict):
+                value = doc.get(field)
+                if "$gt" in condition and not value > condition["$gt"]:
+                    return False
+                if "$gte" in condition and not value >= condition["$gte"]:
+                    return False
+            elif doc.get(field, True if field == "is_active" else None) != condition:
+                return False
+        return True
+
+
+def make_service(prompts, categories=(), tombstones=()):
+    service = SyncService()
+    service.prompts = FakeRepository(list(prompts))
+    service.categories = FakeRepository(list(categories))
+    service.tombstones = FakeRepository(list(tombstones))
+    return service
+
+
+def prompt(updated_at, status="published"):
+    return {"_id": ObjectId(), "title": "p", "status": status, "is_active": True, "updated_at": updated_at}
+
+
+def sync_all(service, token=None):
+    """Follow has_more to the end; returns the pages"""
+    pages = []
+    while True:
+        since, after_id = decode_sync_token(token) if token else (None, None)
+        page = asyncio.run(service.get_changes(since, after_id))
+        pages.append(page)
+        token = page["token"]
+        if not page["has_more"] or len(pages) > 20:
+            return pages
+
+
+def test_full_sync_pages_through_prompts_older_than_retention(monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_PAGE_SIZE", 2)
+    old = datetime.utcnow().replace(microsecond=0) - timedelta(days=90)
+    # Several prompts share a timestamp, so paging relies on the id cursor
+    prompts = [prompt(old), prompt(old), prompt(old), prompt(old + timedelta(days=1)), prompt(old + timedelta(days=80))]
+    prompts.append(prompt(old, status="draft"))
+    service = make_service(prompts)
+
+    pages = sync_all(service)
+
+    assert len(pages) == 3
+    assert pages[0]["reset"] is True
+    assert all(page["reset"] is False for page in pages[1:])
+    synced = [row["id"] for page in pages for row in page["prompts"]]
+    published = [doc["_id"] for doc in prompts if doc["status"] == "published"]
+    assert sorted(synced) == sorted(published)
+    assert len(synced) == len(set(synced))
+
+
+def test_delta_sync_older_than_retention_resets():
+    service = make_service([prompt(datetime.utcnow())])
+    since = datetime.utcnow() - timedelta(days=60)
+
+    page = asyncio.run(service.get_changes(since))
+
+    assert page["reset"] is True
+    assert len(page["prompts"]) == 1
+
+
+def test_delta_sync_reports_unpublished_and_deleted_prompts(monkeypatch):
+    monkeypatch.setattr(settings, "SYNC_PAGE_SIZE", 2)
+    now = datetime.utcnow().replace(microsecond=0)
+    since = now - timedelta(days=1)
+    unpublished = prompt(now - timedelta(hours=2), status="draft")
+    changed = [prompt(now - timedelta(hours=3)), prompt(now - timedelta(hours=1)), unpublished]
+    tombstone = {"_id": ObjectId(), "kind": "prompt", "item_id": "deleted-id", "deleted_at": now - timedelta(hours=1)}
+    service = make_service([prompt(now - timedelta(days=2))] + changed, tombstones=[tombstone])
+
+    pages = sync_all(service, encode_sync_token(since))
+
+    assert [page["reset"] for page in pages] == [False, False]
+    synced = [row["id"] for page in pages for row in page["prompts"]]
+    assert sorted(synced) == sorted(doc["_id"] for doc in changed[:2])
+    removed = {prompt_id for page in pages for prompt_id in page["removed_prompt_ids"]}
+    assert removed == {str(unpublished["_id"]), "deleted-id"}
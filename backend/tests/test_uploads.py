@@ -0,0 +1,19 @@
+"""
+Upload route helpers: rounding requested sizes to resize buckets
+"""
+from app.api.uploads import RESIZE_BUCKETS, resize_bucket
+from app.core.config import settings
+
+
+def test_sizes_round_up_to_a_bucket():
+    assert resize_bucket(None) is None
+    assert resize_bucket(1) == RESIZE_BUCKETS[0]
+    assert resize_bucket(320) == 320
+    assert resize_bucket(321) == 480
+    assert resize_bucket(settings.IMAGE_RESIZE_MAX_DIMENSION) == settings.IMAGE_RESIZE_MAX_DIMENSION
+
+
+def test_every_accepted_size_has_a_bucket():
+    assert RESIZE_BUCKETS[-1] == settings.IMAGE_RESIZE_MAX_DIMENSION
+    buckets = {resize_bucket(size) for size in range(1, settings.IMAGE_RESIZE_MAX_DIMENSION + 1)}
+    assert buckets == set(RESIZE_BUCKETS)